@@ -3,35 +3,38 @@
 
 import os
 import psycopg2
+from psycopg2.extras import execute_values
 import json
 import requests
 import io
+import time
 import click
 import traceback
 import bleach
-from typing import Union
-from flask import Flask, request, jsonify, send_file, Response
+from typing import Optional, Union
+from flask import Flask, request, jsonify, send_file, Response, g, has_app_context, stream_with_context
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 #from flask_wtf.csrf import CSRFProtect
 from werkzeug.security import generate_password_hash, check_password_hash
-from sentence_transformers import SentenceTransformer
-import nltk
 # FIXED: Added Union for type hinting
 from typing import Union
 
-from scoring_logic import calculate_weighted_match_score
-from llm_integration import improve_resume_bullet, find_duplicate_entries, get_available_models, analyze_job_description_with_llm
+from scoring_logic import score_match, calculate_batch_match_scores, SCORING_MODES
+from llm_integration import improve_resume_bullet, find_duplicate_entries, get_available_models, analyze_job_description_with_llm, find_missing_keywords, get_llm_client_stats, get_llm_cache_stats
+from llm_integration import LLMBusyError, get_llm_gate_stats, DUPLICATE_THRESHOLD
+from llm_integration import stream_improved_bullet, stream_job_description_analysis, improve_resume_bullets
 from resume_generator import generate_ats_resume_text
-
-# Download required NLTK data for text processing
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-except Exception as e:
-    print(f"Warning: Could not download NLTK data: {e}")
+import db_pool
+import embedding_store
+import semantic_search
+import embedding_index
+import model_registry
+import job_queue
+import jd_cache
+import job_postings
 
 # --- Initialization ---
 app = Flask(__name__)
@@ -70,26 +73,60 @@ limiter = Limiter(
 #def load_user(user_id):
 #    return User.get(user_id)
 
-# Load the pre-trained Sentence Transformer model.
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# The Sentence Transformer model and NLTK data load on first use (see model_registry);
+# MODEL_WARMUP=background starts loading them in a thread at startup instead.
+model = model_registry.encoder
+if model_registry.MODEL_WARMUP == "background":
+    model_registry.warm_up(background=True)
+# Default and maximum number of ranked items returned by /api/match.
+MATCH_TOP_K = int(os.environ.get("MATCH_TOP_K", "20"))
+MATCH_MAX_TOP_K = 200
+# Bulk import limits: items per request and texts per model.encode() batch.
+BULK_MAX_ITEMS = int(os.environ.get("BULK_MAX_ITEMS", "1000"))
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "64"))
+# Most bullets accepted by one /improve-bullets request.
+IMPROVE_BULLETS_MAX = int(os.environ.get("IMPROVE_BULLETS_MAX", "20"))
+# Most documents on the "many" side of one /calculate-score/batch request.
+SCORE_BATCH_MAX = int(os.environ.get("SCORE_BATCH_MAX", "500"))
+# Seconds between job status checks for /api/jobs/<id>/events, and how long a stream may stay open.
+# Each open stream holds a gunicorn thread, so streams are kept short and clients reconnect.
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "0.5"))
+JOB_EVENTS_TIMEOUT = float(os.environ.get("JOB_EVENTS_TIMEOUT", "30"))
 # Define a type alias for response values
 ResponseValue = Union[Response, tuple[Response, int]]
 
 
 # --- Database Functions ---
 def get_db_connection():
-    """Establishes a connection to the PostgreSQL database."""
+    """
+    Checks out a pooled connection to the PostgreSQL database.
+    Inside a request the same connection is reused for the whole app context
+    and handed back to the pool on teardown.
+    """
+    if has_app_context() and 'db_conn' in g:
+        return g.db_conn
     try:
-        conn = psycopg2.connect(
-            host="postgres",
-            database=os.environ.get('POSTGRES_DB'),
-            user=os.environ.get('POSTGRES_USER'),
-            password=os.environ.get('POSTGRES_PASSWORD')
-        )
-        return conn
+        conn = db_pool.get_pool().getconn()
     except Exception as e:
         print(f"Error connecting to database: {e}")
         return None
+    if has_app_context():
+        g.db_conn = conn
+    return conn
+
+
+def release_db_connection(conn) -> None:
+    """Returns a connection obtained outside an app context to the pool."""
+    if conn is not None:
+        db_pool.get_pool().putconn(conn)
+
+
+@app.teardown_appcontext
+def return_db_connection(exception=None):
+    """Hands the request's connection back to the pool, discarding it if the request failed mid-query."""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        db_pool.get_pool().putconn(conn, discard=isinstance(exception, psycopg2.OperationalError))
 
 
 def setup_database():
@@ -102,6 +139,10 @@ def setup_database():
     try:
         with conn:
             with conn.cursor() as cur:
+                # Embedding columns are float32 BYTEA, or vector(384) when pgvector is installed.
+                embedding_backend = embedding_store.ensure_storage(cur)
+                embedding_type = embedding_store.column_type(embedding_backend)
+
                 # --- Resume Table ---
                 cur.execute('''
                     CREATE TABLE IF NOT EXISTS resume (
@@ -114,16 +155,16 @@ def setup_database():
                     cur.execute('INSERT INTO resume (id, content) VALUES (1, %s);', ('{}',))
 
                 # --- Skills Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS skills (
                         id SERIAL PRIMARY KEY,
                         skill_text TEXT NOT NULL UNIQUE,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
                 # --- Work Experience Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS work_experience (
                         id SERIAL PRIMARY KEY,
                         job_title TEXT NOT NULL,
@@ -131,16 +172,16 @@ def setup_database():
                         location TEXT,
                         dates TEXT,
                         description TEXT,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
                 # --- Accomplishments Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS accomplishments (
                         id SERIAL PRIMARY KEY,
                         accomplishment_text TEXT NOT NULL UNIQUE,
-                        embedding TEXT,
+                        embedding {embedding_type},
                         work_experience_id INTEGER REFERENCES work_experience(id)
                     );
                 ''')
@@ -158,42 +199,42 @@ def setup_database():
                     """)
 
                 # --- Professional Summaries Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS professional_summaries (
                         id SERIAL PRIMARY KEY,
                         summary_text TEXT NOT NULL UNIQUE,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
                 # --- Education Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS education (
                         id SERIAL PRIMARY KEY,
                         degree TEXT NOT NULL,
                         institution TEXT NOT NULL,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
                 # --- Certificate Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS cert (
                         id SERIAL PRIMARY KEY,
                         degree TEXT NOT NULL,
                         institution TEXT NOT NULL,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
                 # --- Technical Projects Table ---
-                cur.execute('''
+                cur.execute(f'''
                     CREATE TABLE IF NOT EXISTS technical_projects (
                         id SERIAL PRIMARY KEY,
                         project_name TEXT NOT NULL,
                         description TEXT,
                         tools TEXT,
-                        embedding TEXT
+                        embedding {embedding_type}
                     );
                 ''')
 
@@ -206,9 +247,24 @@ def setup_database():
                     );
                 ''')
 
+                # --- Background Jobs Table ---
+                job_queue.ensure_schema(cur)
+
+                # --- Job Postings Table ---
+                job_postings.ensure_schema(cur, embedding_type)
+
+                # --- Embedding storage migration ---
+                # Converts legacy JSON-in-TEXT embedding columns in bulk.
+                embedding_store.migrate_text_columns(cur, embedding_backend)
+
+        # Column types may have changed; cached matrices are rebuilt on next use.
+        embedding_index.reset()
         print("Database setup completed successfully.")
     except Exception as e:
         print(f"Error during database setup: {e}")
+    finally:
+        if not has_app_context():
+            release_db_connection(conn)
 
 
 @click.command('init-db')
@@ -220,6 +276,68 @@ def init_db_command():
 
 app.cli.add_command(init_db_command)
 
+
+@app.route('/healthz/db', methods=['GET'])
+@limiter.exempt
+def db_health() -> ResponseValue:
+    """Reports connection-pool metrics and whether a round trip to Postgres succeeds."""
+    stats = db_pool.get_pool().stats()
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"status": "unavailable", "pool": stats}), 503
+    try:
+        with conn.cursor() as cur:
+            cur.execute('SELECT 1;')
+            cur.fetchone()
+        conn.rollback()
+    except Exception as e:
+        print(f"Database health check failed: {e}")
+        return jsonify({"status": "unavailable", "pool": stats}), 503
+    return jsonify({"status": "ok", "pool": db_pool.get_pool().stats()})
+
+
+@app.route('/healthz/ready', methods=['GET'])
+@limiter.exempt
+def readiness() -> ResponseValue:
+    """Reports whether the encoder and NLTK data are loaded; the first probe starts warming them."""
+    if not model_registry.is_ready():
+        model_registry.warm_up(background=True)
+        return jsonify(model_registry.status()), 503
+    return jsonify(model_registry.status())
+
+
+@app.route('/api/stats/embedding-index', methods=['GET'])
+def embedding_index_stats() -> ResponseValue:
+    """Hit/miss/rebuild counters and sizes for the in-memory embedding indexes."""
+    return jsonify(embedding_index.stats())
+
+@app.route('/api/stats/llm', methods=['GET'])
+def llm_client_stats() -> ResponseValue:
+    """Per-call latency and retry counters for requests to the LLM server."""
+    return jsonify(get_llm_client_stats())
+
+@app.route('/api/stats/llm-gate', methods=['GET'])
+def llm_gate_stats() -> ResponseValue:
+    """In-flight and queued LLM requests, rejections, and coalesced duplicate prompts."""
+    return jsonify(get_llm_gate_stats())
+
+@app.errorhandler(LLMBusyError)
+def llm_busy(e: LLMBusyError) -> ResponseValue:
+    """The LLM queue is full: fail fast and tell the client when to retry."""
+    response = jsonify({"error": str(e)})
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 503
+
+@app.route('/api/stats/llm-cache', methods=['GET'])
+def llm_cache_stats() -> ResponseValue:
+    """Hit/miss/eviction counters and size of the LLM response cache."""
+    return jsonify(get_llm_cache_stats())
+
+@app.route('/api/stats/jd-cache', methods=['GET'])
+def jd_cache_stats() -> ResponseValue:
+    """Hit/miss/eviction counters and size of this worker's job description cache."""
+    return jsonify(jd_cache.cache.stats())
+
 #@app.route('/api/register', methods=['POST'])
 #def register():
  #   data = request.get_json()
@@ -336,7 +454,7 @@ def add_skill() -> ResponseValue: # FIXED: Added return type hint
         return jsonify({"error": "Skill text is required"}), 400
     
     sanitized_skill_text = bleach.clean(skill_text)
-    embedding = model.encode(sanitized_skill_text).tolist()
+    embedding = model.encode(sanitized_skill_text)
 
     conn = get_db_connection()
     if not conn:
@@ -347,7 +465,7 @@ def add_skill() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO skills (skill_text, embedding) VALUES (%s, %s) RETURNING id;',
-                    (sanitized_skill_text, json.dumps(embedding))
+                    (sanitized_skill_text, embedding_store.to_db(cur, 'skills', embedding))
                 )
 
                 # Check if fetchone() returns None before subscripting
@@ -355,6 +473,7 @@ def add_skill() -> ResponseValue: # FIXED: Added return type hint
                 if result is None:
                     return jsonify({"error": "Failed to create new skill."}), 500
                 new_id = result[0]
+        embedding_index.record_insert('skills', new_id, sanitized_skill_text, embedding)
         return jsonify({"message": "Skill added successfully", "id": new_id}), 201
     except psycopg2.IntegrityError:
         return jsonify({"error": "This skill already exists"}), 409
@@ -392,6 +511,7 @@ def delete_skill(skill_id: int) -> ResponseValue: # Added return type hint
         with conn:
             with conn.cursor() as cur:
                 cur.execute('DELETE FROM skills WHERE id = %s;', (skill_id,))
+        embedding_index.record_delete('skills', skill_id)
         return jsonify({"message": "Skill deleted successfully"})
     except Exception as e:
         print(f"Error deleting skill: {e}")
@@ -414,7 +534,7 @@ def add_accomplishment() -> ResponseValue: # Added return type hint
         return jsonify({"error": "Accomplishment text is required"}), 400
 
     sanitized_accomplishment_text = bleach.clean(accomplishment_text)
-    embedding = model.encode(sanitized_accomplishment_text).tolist()
+    embedding = model.encode(sanitized_accomplishment_text)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -424,13 +544,14 @@ def add_accomplishment() -> ResponseValue: # Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO accomplishments (accomplishment_text, embedding, work_experience_id) VALUES (%s, %s, %s) RETURNING id;',
-                    (sanitized_accomplishment_text, json.dumps(embedding), work_experience_id)
+                    (sanitized_accomplishment_text, embedding_store.to_db(cur, 'accomplishments', embedding), work_experience_id)
                 )
                 # Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
                 if result is None:
                     return jsonify({"error": "Failed to create new accomplishment."}), 500
                 new_id = result[0]
+        embedding_index.record_insert('accomplishments', new_id, sanitized_accomplishment_text, embedding)
         return jsonify({"message": "Accomplishment added successfully", "id": new_id}), 201
     except psycopg2.IntegrityError:
         return jsonify({"error": "This accomplishment already exists"}), 409
@@ -471,12 +592,133 @@ def delete_accomplishment(accomplishment_id: int) -> ResponseValue: # FIXED: Add
         with conn:
             with conn.cursor() as cur:
                 cur.execute('DELETE FROM accomplishments WHERE id = %s;', (accomplishment_id,))
+        embedding_index.record_delete('accomplishments', accomplishment_id)
         return jsonify({"message": "Accomplishment deleted successfully"})
     except Exception as e:
         print(f"Error deleting accomplishment: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+# --- Bulk Import for Skills & Accomplishments ---
+
+def _bulk_insert_library_items(table: str, text_column: str, items: list, extra_column: Optional[str] = None) -> ResponseValue:
+    """
+    Sanitizes `items` (dicts holding `text_column` and optionally `extra_column`),
+    embeds them in one batched model.encode() call and inserts them with a single
+    multi-row INSERT ... ON CONFLICT DO NOTHING. Returns a per-item status list.
+    """
+    results = [None] * len(items)
+    pending = []  # (index, sanitized text, extra value)
+    seen = set()
+    for index, item in enumerate(items):
+        text = item.get(text_column) if isinstance(item, dict) else None
+        if not isinstance(text, str) or not text.strip():
+            results[index] = {"index": index, "status": "invalid", "error": f"{text_column} is required"}
+            continue
+        sanitized_text = bleach.clean(text.strip())
+        if sanitized_text in seen:
+            results[index] = {"index": index, "text": sanitized_text, "status": "duplicate"}
+            continue
+        extra = item.get(extra_column) if extra_column else None
+        if extra is not None:
+            try:
+                extra = int(extra)
+            except (TypeError, ValueError):
+                results[index] = {"index": index, "text": sanitized_text, "status": "invalid",
+                                  "error": f"{extra_column} must be an integer"}
+                continue
+        seen.add(sanitized_text)
+        pending.append((index, sanitized_text, extra))
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    inserted = []
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                if extra_column and pending:
+                    # A single bad foreign key would abort the whole batch, so check them up front.
+                    requested_ids = list({extra for _, _, extra in pending if extra is not None})
+                    cur.execute('SELECT id FROM work_experience WHERE id = ANY(%s);', (requested_ids,))
+                    known_ids = {row[0] for row in cur.fetchall()}
+                    valid = []
+                    for index, text, extra in pending:
+                        if extra is not None and extra not in known_ids:
+                            results[index] = {"index": index, "text": text, "status": "invalid",
+                                              "error": f"Unknown {extra_column} {extra}"}
+                        else:
+                            valid.append((index, text, extra))
+                    pending = valid
+
+                if pending:
+                    embeddings = model.encode([text for _, text, _ in pending], batch_size=EMBED_BATCH_SIZE)
+                    backend = embedding_store.column_backend(cur, table)
+                    columns = [text_column, "embedding"] + ([extra_column] if extra_column else [])
+                    rows = []
+                    for (_, text, extra), embedding in zip(pending, embeddings):
+                        row = [text, embedding_store.to_db_value(embedding, backend)]
+                        if extra_column:
+                            row.append(extra)
+                        rows.append(tuple(row))
+                    returned = execute_values(
+                        cur,
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+                        f"ON CONFLICT ({text_column}) DO NOTHING RETURNING id, {text_column};",
+                        rows,
+                        page_size=len(rows),
+                        fetch=True
+                    )
+                    new_ids = {text: new_id for new_id, text in returned}
+                    for (index, text, _), embedding in zip(pending, embeddings):
+                        if text in new_ids:
+                            results[index] = {"index": index, "text": text, "status": "created", "id": new_ids[text]}
+                            inserted.append((new_ids[text], text, embedding))
+                        else:
+                            results[index] = {"index": index, "text": text, "status": "duplicate"}
+    except Exception as e:
+        print(f"Error bulk inserting into {table}: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+    for new_id, text, embedding in inserted:
+        embedding_index.record_insert(table, new_id, text, embedding)
+
+    summary = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "duplicate", "invalid")}
+    return jsonify({"results": results, **summary}), 201 if summary["created"] else 200
+
+
+def _bulk_items_from_request(text_column: str) -> Optional[list]:
+    """Accepts {"items": [...]} where each item is a string or an object holding `text_column`."""
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return None
+    return [{text_column: item} if isinstance(item, str) else item for item in items]
+
+
+@app.route('/api/skills/bulk', methods=['POST'])
+#@login_required
+def add_skills_bulk() -> ResponseValue:
+    items = _bulk_items_from_request('skill_text')
+    if items is None:
+        return jsonify({"error": "Expected a JSON body with an 'items' list"}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} items per request"}), 413
+    return _bulk_insert_library_items('skills', 'skill_text', items)
+
+
+@app.route('/api/accomplishments/bulk', methods=['POST'])
+#@login_required
+def add_accomplishments_bulk() -> ResponseValue:
+    items = _bulk_items_from_request('accomplishment_text')
+    if items is None:
+        return jsonify({"error": "Expected a JSON body with an 'items' list"}), 400
+    if len(items) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {BULK_MAX_ITEMS} items per request"}), 413
+    return _bulk_insert_library_items('accomplishments', 'accomplishment_text', items, extra_column='work_experience_id')
+
+
 # --- API for Professional Summaries ---
 
 @app.route('/api/professional_summaries', methods=['POST'])
@@ -491,7 +733,7 @@ def add_professional_summary() -> ResponseValue: # FIXED: Added return type hint
         return jsonify({"error": "Summary text is required"}), 400
 
     sanitized_summary_text = bleach.clean(summary_text)
-    embedding = model.encode(sanitized_summary_text).tolist()
+    embedding = model.encode(sanitized_summary_text)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -501,7 +743,7 @@ def add_professional_summary() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO professional_summaries (summary_text, embedding) VALUES (%s, %s) RETURNING id;',
-                    (sanitized_summary_text, json.dumps(embedding))
+                    (sanitized_summary_text, embedding_store.to_db(cur, 'professional_summaries', embedding))
                 )
                 # Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
@@ -576,7 +818,7 @@ def add_work_experience() -> ResponseValue: # FIXED: Added return type hint
     sanitized_dates = bleach.clean(dates) if dates else None
     
     text_to_embed = f"{sanitized_job_title} {sanitized_description}"
-    embedding = model.encode(text_to_embed).tolist()
+    embedding = model.encode(text_to_embed)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -586,13 +828,14 @@ def add_work_experience() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO work_experience (job_title, company, location, dates, description, embedding) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id;',
-                    (sanitized_job_title, sanitized_company, sanitized_location, sanitized_dates, sanitized_description, json.dumps(embedding))
+                    (sanitized_job_title, sanitized_company, sanitized_location, sanitized_dates, sanitized_description, embedding_store.to_db(cur, 'work_experience', embedding))
                 )
                 # Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
                 if result is None:
                     return jsonify({"error": "Failed to create new work experience."}), 500
                 new_id = result[0]
+        embedding_index.record_insert('work_experience', new_id, sanitized_job_title, embedding)
         return jsonify({"message": "Work experience added successfully", "id": new_id}), 201
     except psycopg2.IntegrityError:
         return jsonify({"error": "This work experience already exists"}), 409
@@ -639,8 +882,12 @@ def delete_work_experience(experience_id: int) -> ResponseValue: # FIXED: Added
     try:
         with conn:
             with conn.cursor() as cur:
-                cur.execute('DELETE FROM accomplishments WHERE work_experience_id = %s;', (experience_id,))
+                cur.execute('DELETE FROM accomplishments WHERE work_experience_id = %s RETURNING id;', (experience_id,))
+                deleted_accomplishment_ids = [row[0] for row in cur.fetchall()]
                 cur.execute('DELETE FROM work_experience WHERE id = %s;', (experience_id,))
+        for accomplishment_id in deleted_accomplishment_ids:
+            embedding_index.record_delete('accomplishments', accomplishment_id)
+        embedding_index.record_delete('work_experience', experience_id)
         return jsonify({"message": "Work experience deleted successfully"})
     except Exception as e:
         print(f"Error deleting work experience: {e}")
@@ -665,7 +912,7 @@ def add_education() -> ResponseValue: # FIXED: Added return type hint
     sanitized_degree = bleach.clean(degree)
     sanitized_institution = bleach.clean(institution)
     text_to_embed = f"{sanitized_degree} {sanitized_institution}" 
-    embedding = model.encode(text_to_embed).tolist()
+    embedding = model.encode(text_to_embed)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -675,7 +922,7 @@ def add_education() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO education (degree, institution, embedding) VALUES (%s, %s, %s) RETURNING id;',
-                    (sanitized_degree, sanitized_institution, json.dumps(embedding))
+                    (sanitized_degree, sanitized_institution, embedding_store.to_db(cur, 'education', embedding))
                 )
                 # FIXED: Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
@@ -706,7 +953,7 @@ def add_cert() -> ResponseValue: # FIXED: Added return type hint
 
     sanitized_cert = bleach.clean(cert)
     text_to_embed = f"{sanitized_cert} {sanitized_cert}" 
-    embedding = model.encode(text_to_embed).tolist()
+    embedding = model.encode(text_to_embed)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -716,7 +963,7 @@ def add_cert() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO cert (cert, embedding) VALUES (%s, %s, %s) RETURNING id;',
-                    (sanitized_cert, json.dumps(embedding))
+                    (sanitized_cert, embedding_store.to_db(cur, 'cert', embedding))
                 )
                 # FIXED: Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
@@ -817,7 +1064,7 @@ def add_technical_project() -> ResponseValue: # FIXED: Added return type hint
     sanitized_tools = bleach.clean(tools)
 
     text_to_embed = f"{sanitized_project_name} {sanitized_description} {sanitized_tools}"
-    embedding = model.encode(text_to_embed).tolist()
+    embedding = model.encode(text_to_embed)
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -827,13 +1074,14 @@ def add_technical_project() -> ResponseValue: # FIXED: Added return type hint
             with conn.cursor() as cur:
                 cur.execute(
                     'INSERT INTO technical_projects (project_name, description, tools, embedding) VALUES (%s, %s, %s, %s) RETURNING id;',
-                    (sanitized_project_name, sanitized_description, sanitized_tools, json.dumps(embedding))
+                    (sanitized_project_name, sanitized_description, sanitized_tools, embedding_store.to_db(cur, 'technical_projects', embedding))
                 )
                 # Check if fetchone() returns None before subscripting
                 result = cur.fetchone()
                 if result is None:
                     return jsonify({"error": "Failed to create new technical project."}), 500
                 new_id = result[0]
+        embedding_index.record_insert('technical_projects', new_id, sanitized_project_name, embedding)
         return jsonify({"message": "Technical project added successfully", "id": new_id}), 201
     except psycopg2.IntegrityError:
         return jsonify({"error": "This technical project already exists"}), 409
@@ -879,75 +1127,215 @@ def delete_technical_project(project_id: int) -> ResponseValue: # FIXED: Added r
         with conn:
             with conn.cursor() as cur:
                 cur.execute('DELETE FROM technical_projects WHERE id = %s;', (project_id,))
+        embedding_index.record_delete('technical_projects', project_id)
         return jsonify({"message": "Technical project deleted successfully"})
     except Exception as e:
         print(f"Error deleting technical project: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
-# --- MODIFIED: API for AI Matching ---
+# --- Server-Sent Events ---
+def _sse_event(event: str, data) -> str:
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_stream(events) -> Response:
+    """Wraps a generator of formatted events in an unbuffered text/event-stream response."""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        # Stop nginx (and browsers) from holding chunks back.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _llm_stream_error(e: Exception) -> str:
+    if isinstance(e, LLMBusyError):
+        return str(e)
+    if isinstance(e, requests.exceptions.Timeout):
+        return "Request timed out. The LLM took too long to respond."
+    if isinstance(e, requests.exceptions.ConnectionError):
+        return "Cannot connect to LLM server."
+    return f"LLM request failed: {e}"
+
+
+# --- Job Postings ---
+# Saved under /api/job-postings because /api/jobs/<id> already serves background jobs.
+@app.route('/api/job-postings', methods=['POST'])
+#@login_required
+def add_job_posting() -> ResponseValue:
+    """Saves a job posting and precomputes its matching and scoring features in the background."""
+    data = request.get_json()
+    if not data or not data.get('description'):
+        return jsonify({"error": "Job description is required"}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                posting, created = job_postings.create(
+                    cur,
+                    bleach.clean(data['description']),
+                    title=bleach.clean(data['title']) if data.get('title') else None,
+                    company=bleach.clean(data['company']) if data.get('company') else None
+                )
+    except Exception as e:
+        print(f"Error saving job posting: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+    if created or posting["status"] == job_postings.FAILED:
+        try:
+            features_job = job_queue.jobs.submit('job-posting', job_postings.precompute, posting["id"], model)
+            posting["features_status_url"] = f"/api/jobs/{features_job}"
+        except Exception as e:
+            # Features are then computed on first use instead.
+            print(f"Error queueing features for job posting {posting['id']}: {e}")
+    return jsonify(posting), 201 if created else 200
+
+
+@app.route('/api/job-postings', methods=['GET'])
+#@login_required
+def get_job_postings() -> ResponseValue:
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                postings = job_postings.list_postings(cur)
+        return jsonify(postings)
+    except Exception as e:
+        print(f"Error fetching job postings: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route('/api/job-postings/<int:posting_id>', methods=['GET'])
+#@login_required
+def get_job_posting(posting_id: int) -> ResponseValue:
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                posting = job_postings.get(cur, posting_id)
+    except Exception as e:
+        print(f"Error fetching job posting: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+    if posting is None:
+        return jsonify({"error": "Job posting not found"}), 404
+    return jsonify(posting)
+
+
+def _job_description(data: dict, field: str):
+    """
+    The job description a request refers to: a saved posting's `job_id`, the
+    `jd_id` an earlier response returned, or its text in `field`, which is
+    sanitized and cached. A posting whose features are still pending (or
+    failed) is scored from its text, like a new description. Returns
+    (entry, None); (None, None) if none was sent; or (None, error response)
+    for an unknown posting or jd_id, or a database failure.
+    """
+    if data.get('job_id') is not None:
+        try:
+            posting_id = int(data['job_id'])
+        except (TypeError, ValueError):
+            return None, (jsonify({"error": "job_id must be an integer"}), 400)
+        conn = get_db_connection()
+        if not conn:
+            return None, (jsonify({"error": "Database connection failed"}), 500)
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    # Saved postings come with their embedding, keywords and requirements precomputed.
+                    entry = job_postings.load(cur, posting_id, model)
+        except psycopg2.Error as e:
+            print(f"Error loading job posting {posting_id}: {e}")
+            return None, (jsonify({"error": "Could not load job posting"}), 503)
+        if entry is None:
+            return None, (jsonify({"error": "Job posting not found"}), 404)
+        return entry, None
+
+    jd_id = data.get('jd_id')
+    if jd_id:
+        entry = jd_cache.cache.get(str(jd_id))
+        if entry is None:
+            return None, (jsonify({"error": "Unknown or expired jd_id; send the job description text again"}), 404)
+        return entry, None
+    text = data.get(field)
+    if not text:
+        return None, None
+    return jd_cache.cache.add(bleach.clean(text)), None
+
+
+# --- API for AI Matching ---
 
 @app.route('/api/match', methods=['POST'])
 ##@login_required
 def match_skills() -> ResponseValue: # Added return type hint
+    """
+    Ranks the user's skills and accomplishments against a job description by
+    embedding cosine similarity. With `use_llm`, only the top-k shortlist is
+    sent to the LLM for a final relevance pass.
+    """
     try:
         data = request.get_json()
         if not data:
             return jsonify({"error": "Invalid request: No JSON body provided."}), 400
 
-        job_description = data.get('job_description')
+        job_description, error = _job_description(data, 'job_description')
         model_name = data.get('model_name')
+        use_llm = bool(data.get('use_llm', False))
 
-        if not job_description:
+        if error:
+            return error
+        if job_description is None:
             return jsonify({"error": "Job description is required"}), 400
-        sanitized_job_description = bleach.clean(job_description)
-        if not model_name:
+        sanitized_job_description = job_description.text
+        if use_llm and not model_name:
             return jsonify({"error": "Model name is required"}), 400
-        
+        try:
+            top_k = max(1, min(int(data.get('top_k', MATCH_TOP_K)), MATCH_MAX_TOP_K))
+        except (TypeError, ValueError):
+            return jsonify({"error": "top_k must be an integer"}), 400
+
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
         with conn:
             with conn.cursor() as cur:
-                # MODIFIED: Fetch IDs along with text
-                cur.execute('SELECT id, skill_text FROM skills;')
-                skills = [{"id": row[0], "text": row[1]} for row in cur.fetchall()]
-                cur.execute('SELECT id, accomplishment_text FROM accomplishments;')
-                accomplishments = [{"id": row[0], "text": row[1]} for row in cur.fetchall()]
-
-        user_data = {
-            # MODIFIED: Pass only the text to the LLM
-            "skills": [s['text'] for s in skills],
-            "accomplishments": [a['text'] for a in accomplishments]
+                # Served from the in-process index; Postgres only answers a cheap freshness check.
+                sources = {
+                    item_type: embedding_index.load(cur, table)
+                    for item_type, (table, _) in semantic_search.MATCH_SOURCES.items()
+                }
+
+        # The job description is embedded once per posting, not once per request.
+        query_embedding = job_description.embedding(model)
+        ranked = semantic_search.rank_items(query_embedding, sources, top_k)
+
+        all_texts = [text for _, texts, _ in sources.values() for text in texts]
+        response = {
+            "jd_id": job_description.jd_id,
+            "suggestions": ranked,
+            "missing_keywords": find_missing_keywords(sanitized_job_description, all_texts)
         }
 
-        analysis_result = analyze_job_description_with_llm(sanitized_job_description, user_data, model_name)
+        if data.get('stream'):
+            return _event_stream(_match_events(response, sanitized_job_description, use_llm, model_name))
 
+        if data.get('async'):
+            return _submit_job('match', _refine_matches_with_llm, response, sanitized_job_description, use_llm, model_name)
 
-        if "error" in analysis_result:
-            return jsonify(analysis_result), 500
-
-        # âœ… MODIFIED: Create a map of text to the full object (with numeric ID)
-        all_items_map = {}
-        for skill in skills:
-            all_items_map[skill['text']] = {"id": f"skill-{skill['id']}", "text": skill['text'], "type": "skill"}
-        for acc in accomplishments:
-            all_items_map[acc['text']] = {"id": f"accomplishment-{acc['id']}", "text": acc['text'], "type": "accomplishment"}
-
-        suggestions_with_details = []
-        if "suggestions" in analysis_result:
-            for suggestion_text in analysis_result["suggestions"]:
-                if suggestion_text in all_items_map:
-                    item_details = all_items_map[suggestion_text]
-                    # This score is a placeholder; you might replace with actual scoring later
-                    item_details['score'] = 0.8 
-                    suggestions_with_details.append(item_details)
-
-        return jsonify({
-            "suggestions": suggestions_with_details,
-            "missing_keywords": analysis_result.get("missing_keywords", [])
-        })
+        response = _refine_matches_with_llm(response, sanitized_job_description, use_llm, model_name)
+        return jsonify(response)
     except Exception as e:
         error_message = traceback.format_exc()
         print(f"FORCE-LOGGING ERROR: {error_message}")
@@ -957,6 +1345,56 @@ def match_skills() -> ResponseValue: # Added return type hint
         }), 500
 
 
+def _refine_matches_with_llm(response: dict, job_description: str, use_llm: bool, model_name: Optional[str]) -> dict:
+    """With `use_llm`, keeps only the ranked items the LLM picks from the shortlist."""
+    ranked = response["suggestions"]
+    if not (use_llm and ranked):
+        return response
+    # The LLM only sees the shortlist, so prompt size no longer grows with the library.
+    shortlist = {
+        "skills": semantic_search.shortlist_texts(ranked, "skill"),
+        "accomplishments": semantic_search.shortlist_texts(ranked, "accomplishment")
+    }
+    analysis_result = analyze_job_description_with_llm(job_description, shortlist, model_name)
+    if "error" in analysis_result:
+        # Fall back to the semantic ranking rather than failing the whole match.
+        return dict(response, llm_error=analysis_result["error"])
+    picked = set(analysis_result.get("suggestions", []))
+    return dict(response, suggestions=[item for item in ranked if item["text"] in picked])
+
+
+def _match_events(response: dict, job_description: str, use_llm: bool, model_name: Optional[str]):
+    """
+    Event stream for /api/match: the semantic ranking goes out immediately,
+    then (with `use_llm`) each item the LLM picks as soon as it is generated,
+    and finally a `done` event carrying the same body as the JSON response.
+    """
+    ranked = response["suggestions"]
+    yield _sse_event("suggestions", {"suggestions": ranked})
+    yield _sse_event("missing_keywords", {"missing_keywords": response["missing_keywords"]})
+
+    if use_llm and ranked:
+        by_text = {item["text"]: item for item in ranked}
+        shortlist = {
+            "skills": semantic_search.shortlist_texts(ranked, "skill"),
+            "accomplishments": semantic_search.shortlist_texts(ranked, "accomplishment")
+        }
+        picked = []
+        try:
+            for text in stream_job_description_analysis(job_description, shortlist, model_name):
+                item = by_text.get(text)
+                if item is not None:
+                    picked.append(item)
+                    yield _sse_event("suggestion", item)
+            response = dict(response, suggestions=picked)
+        except Exception as e:
+            # Same fallback as the JSON route: keep the semantic ranking.
+            response = dict(response, llm_error=_llm_stream_error(e))
+            yield _sse_event("llm_error", {"error": response["llm_error"]})
+
+    yield _sse_event("done", response)
+
+
 @app.route('/calculate-score', methods=['POST'])
 #@login_required
 def get_score() -> ResponseValue: # FIXED: Added return type hint
@@ -965,17 +1403,79 @@ def get_score() -> ResponseValue: # FIXED: Added return type hint
         return jsonify({"error": "Invalid request: No JSON body provided."}), 400
 
     resume_text = data.get('resumeText')
-    jd_text = data.get('jobDescriptionText')
+    job_description, error = _job_description(data, 'jobDescriptionText')
 
-    if not resume_text or not jd_text:
+    if error:
+        return error
+    if not resume_text or job_description is None:
         return jsonify({"error": "Missing resume or job description text"}), 400
     
+    mode = data.get('mode', 'lexical')
+    if mode not in SCORING_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(SCORING_MODES)}"}), 400
+
     sanitized_resume_text = bleach.clean(resume_text)
-    sanitized_jd_text = bleach.clean(jd_text)
-    
-    score_data_json = calculate_weighted_match_score(sanitized_resume_text, sanitized_jd_text)
-    return jsonify(json.loads(score_data_json))
 
+    model_registry.ensure_nltk_data()
+    # The cached entry keeps the job description's tokens, keyword hits and requirement embeddings.
+    result = score_match(
+        sanitized_resume_text, job_description, mode=mode, encoder=model if mode != 'lexical' else None,
+        explain=bool(data.get('explain'))
+    )
+    return jsonify(dict(result.to_dict(), jd_id=job_description.jd_id))
+
+
+
+@app.route('/calculate-score/batch', methods=['POST'])
+#@login_required
+def get_batch_scores() -> ResponseValue:
+    """
+    Scores one resume against many job descriptions ("jobDescriptionTexts"),
+    or one job description against many resumes ("resumeTexts"). The single
+    job description can also be a `jd_id` or saved `job_id`, as for
+    /calculate-score. Results come back in input order with the same shape
+    as /calculate-score.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Invalid request: No JSON body provided."}), 400
+
+    resume_text = data.get('resumeText')
+    resume_texts = data.get('resumeTexts')
+    jd_texts = data.get('jobDescriptionTexts')
+    one_jd = any(data.get(key) is not None for key in ('jobDescriptionText', 'jd_id', 'job_id'))
+
+    if resume_text and jd_texts is not None and not one_jd and resume_texts is None:
+        many = jd_texts
+    elif one_jd and resume_texts is not None and resume_text is None and jd_texts is None:
+        many = resume_texts
+    else:
+        return jsonify({"error": "Provide resumeText with jobDescriptionTexts, or a job description "
+                                 "(jobDescriptionText, jd_id or job_id) with resumeTexts"}), 400
+
+    if not isinstance(many, list) or not many or not all(isinstance(text, str) and text for text in many):
+        return jsonify({"error": "Expected a non-empty list of texts"}), 400
+    if len(many) > SCORE_BATCH_MAX:
+        return jsonify({"error": f"At most {SCORE_BATCH_MAX} texts per request"}), 413
+
+    sanitized_many = [bleach.clean(text) for text in many]
+    model_registry.ensure_nltk_data()
+    # Tokenized in-process: forking a pool from a threaded gunicorn worker that holds
+    # torch, the DB pool and LLM sessions is unsafe (parallel=True is for offline use).
+    if resume_text:
+        results = calculate_batch_match_scores(
+            [bleach.clean(resume_text)], sanitized_many
+        )
+        return jsonify({"results": [result.to_dict() for result in results]})
+
+    job_description, error = _job_description(data, 'jobDescriptionText')
+    if error:
+        return error
+    if job_description is None:
+        return jsonify({"error": "Missing job description text"}), 400
+    # The cached profile's keyword hits are reused rather than recomputed for each batch.
+    results = calculate_batch_match_scores(sanitized_many, [job_description])
+    return jsonify({"results": [result.to_dict() for result in results], "jd_id": job_description.jd_id})
 
 @app.route('/api/export-pdf', methods=['POST'])
 #@login_required
@@ -1072,18 +1572,15 @@ def export_pdf() -> ResponseValue: # FIXED: Added return type hint
         </body></html>
         """
 
-        # --- Call Stirling-PDF ---
-        stirling_url = 'http://stirling-pdf:8080/api/v1/convert/html/pdf'
-        files = {'fileInput': ('resume.html', html_content, 'text/html')}
-
-        response = requests.post(stirling_url, files=files)
-        response.raise_for_status()
+        if resume_data.get('async'):
+            return _submit_job('export-pdf', _render_pdf, html_content)
 
+        pdf = _render_pdf(html_content)
         return send_file(
-            io.BytesIO(response.content),
-            mimetype='application/pdf',
+            io.BytesIO(pdf.data),
+            mimetype=pdf.mimetype,
             as_attachment=True,
-            download_name='resume.pdf'
+            download_name=pdf.filename
         )
     except requests.exceptions.RequestException as e:
         print(f"Error calling Stirling-PDF: {e}")
@@ -1093,6 +1590,131 @@ def export_pdf() -> ResponseValue: # FIXED: Added return type hint
         return jsonify({"error": "Internal server error"}), 500
 
 
+def _render_pdf(html_content: str) -> job_queue.FileResult:
+    """Converts the resume HTML to PDF with Stirling-PDF."""
+    stirling_url = 'http://stirling-pdf:8080/api/v1/convert/html/pdf'
+    files = {'fileInput': ('resume.html', html_content, 'text/html')}
+
+    response = requests.post(stirling_url, files=files)
+    response.raise_for_status()
+    return job_queue.FileResult(response.content, 'application/pdf', 'resume.pdf')
+
+
+# --- API for Background Jobs ---
+def _submit_job(job_type: str, fn, *args) -> ResponseValue:
+    """Queues slow work and answers 202 with where to follow it."""
+    try:
+        job_id = job_queue.jobs.submit(job_type, fn, *args)
+    except Exception as e:
+        print(f"Error queueing {job_type} job: {e}")
+        return jsonify({"error": "Could not queue job"}), 500
+    return jsonify({
+        "job_id": job_id,
+        "status": job_queue.QUEUED,
+        "status_url": f"/api/jobs/{job_id}",
+        "events_url": f"/api/jobs/{job_id}/events"
+    }), 202
+
+
+def _job_view(job: dict) -> dict:
+    view = {key: value for key, value in job.items() if key != "has_file"}
+    if job.get("has_file"):
+        view["result"] = {"download_url": f"/api/jobs/{job['id']}/result"}
+    return view
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+#@login_required
+@limiter.exempt
+def get_job(job_id: str) -> ResponseValue:
+    """Status of a background job, with its result once it has succeeded."""
+    try:
+        job = job_queue.jobs.get(job_id)
+    except Exception as e:
+        print(f"Error reading job {job_id}: {e}")
+        return jsonify({"error": "Could not read job status"}), 500
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(_job_view(job))
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+#@login_required
+def get_job_result(job_id: str) -> ResponseValue:
+    """Downloads a finished job's result (the PDF for export-pdf jobs)."""
+    try:
+        job = job_queue.jobs.get(job_id)
+    except Exception as e:
+        print(f"Error reading job {job_id}: {e}")
+        return jsonify({"error": "Could not read job status"}), 500
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] not in job_queue.FINISHED:
+        return jsonify({"error": "Job has not finished", "status": job["status"]}), 409
+    if job["status"] == job_queue.FAILED:
+        return jsonify({"error": job["error"]}), 500
+    if not job.get("has_file"):
+        return jsonify(job["result"])
+    try:
+        file = job_queue.jobs.get_file(job_id)
+    except Exception as e:
+        print(f"Error reading result of job {job_id}: {e}")
+        return jsonify({"error": "Could not read job result"}), 500
+    if file is None:
+        return jsonify({"error": "Job result not found"}), 404
+    return send_file(io.BytesIO(file.data), mimetype=file.mimetype, as_attachment=True, download_name=file.filename)
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+#@login_required
+@limiter.exempt
+def job_events(job_id: str) -> ResponseValue:
+    """
+    Server-sent `status` events as the job moves along, then `done` with the
+    final record. Streams close with a `timeout` event after JOB_EVENTS_TIMEOUT;
+    clients reconnect or poll the status URL.
+    """
+    try:
+        job = job_queue.jobs.get(job_id)
+    except Exception as e:
+        print(f"Error reading job {job_id}: {e}")
+        return jsonify({"error": "Could not read job status"}), 500
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def events():
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT
+        last_status = None
+        while True:
+            try:
+                job = job_queue.jobs.get(job_id)
+            except Exception as e:
+                print(f"Error reading job {job_id}: {e}")
+                yield _sse_event("error", {"error": "Could not read job status"})
+                return
+            if job is None:
+                yield _sse_event("error", {"error": "Job not found"})
+                return
+            if job["status"] in job_queue.FINISHED:
+                yield _sse_event("done", _job_view(job))
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield _sse_event("status", {"id": job_id, "status": last_status})
+            if time.monotonic() >= deadline:
+                yield _sse_event("timeout", {"id": job_id, "status": last_status})
+                return
+            job_queue.jobs.wait(job_id, JOB_POLL_INTERVAL)
+
+    return _event_stream(events())
+
+
+@app.route('/api/stats/jobs', methods=['GET'])
+def job_stats() -> ResponseValue:
+    """Queued/running/finished counts and concurrency limits per job type in this worker."""
+    return jsonify(job_queue.jobs.stats())
+
+
 @app.route('/api/models', methods=['GET'])
 #@login_required
 def get_llm_models() -> ResponseValue: # FIXED: Added return type hint
@@ -1129,9 +1751,13 @@ def get_improved_bullet() -> ResponseValue: # Added return type hint
     bullet = data.get('bulletPoint')
     job_title = data.get('jobTitle')
     industry = data.get('industry')
-    job_description = data.get('jobDescription')
+    job_description, error = _job_description(data, 'jobDescription')
     model_name = data.get('modelName')
+    # Asks for a fresh rewrite instead of the cached one ("try again").
+    regenerate = bool(data.get('regenerate', False))
 
+    if error:
+        return error
     if not all([bullet, job_title, industry, job_description]):
         return jsonify({"error": "Missing required fields"}), 400
 
@@ -1139,14 +1765,85 @@ def get_improved_bullet() -> ResponseValue: # Added return type hint
     sanitized_bullet = bleach.clean(bullet)
     sanitized_job_title = bleach.clean(job_title)
     sanitized_industry = bleach.clean(industry)
-    sanitized_job_description = bleach.clean(job_description)
+    sanitized_job_description = job_description.text
+
+    if data.get('stream'):
+        def events():
+            parts = []
+            try:
+                for token in stream_improved_bullet(sanitized_bullet, sanitized_job_title, sanitized_industry, sanitized_job_description, model_name,
+                                                    regenerate=regenerate):
+                    parts.append(token)
+                    yield _sse_event("token", {"text": token})
+            except Exception as e:
+                yield _sse_event("error", {"error": _llm_stream_error(e)})
+                return
+            yield _sse_event("done", {
+                "improved_bullet": "".join(parts).strip(),
+                "model_used": model_name or "default",
+                "llm_mode": os.environ.get("LLM_MODE", "production"),
+                "jd_id": job_description.jd_id
+            })
+        return _event_stream(events())
 
-    improved_bullet = improve_resume_bullet(sanitized_bullet, sanitized_job_title, sanitized_industry, sanitized_job_description, model_name)
+    if data.get('async'):
+        return _submit_job('improve-bullet', _improved_bullet_result, sanitized_bullet, sanitized_job_title,
+                           sanitized_industry, sanitized_job_description, model_name, job_description.jd_id, regenerate)
 
-    return jsonify({
+    return jsonify(_improved_bullet_result(sanitized_bullet, sanitized_job_title, sanitized_industry, sanitized_job_description,
+                                           model_name, job_description.jd_id, regenerate))
+
+
+def _improved_bullet_result(bullet: str, job_title: str, industry: str, job_description: str,
+                            model_name: Optional[str], jd_id: Optional[str] = None, regenerate: bool = False) -> dict:
+    improved_bullet = improve_resume_bullet(bullet, job_title, industry, job_description, model_name, regenerate=regenerate)
+    return {
         "improved_bullet": improved_bullet,
         "model_used": model_name or "default",
-        "llm_mode": os.environ.get("LLM_MODE", "production")
+        "llm_mode": os.environ.get("LLM_MODE", "production"),
+        "jd_id": jd_id
+    }
+
+
+@app.route('/improve-bullets', methods=['POST'])
+#@login_required
+@limiter.limit("10 per minute")
+def get_improved_bullets() -> ResponseValue:
+    """Improves a list of bullets against one job context; the LLM calls run concurrently."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Invalid request: No JSON body provided."}), 400
+
+    bullets = data.get('bulletPoints')
+    job_title = data.get('jobTitle')
+    industry = data.get('industry')
+    model_name = data.get('modelName')
+    regenerate = bool(data.get('regenerate', False))
+
+    if not isinstance(bullets, list) or not bullets or not all(isinstance(b, str) and b for b in bullets):
+        return jsonify({"error": "Expected a non-empty list of bullet points"}), 400
+    if len(bullets) > IMPROVE_BULLETS_MAX:
+        return jsonify({"error": f"At most {IMPROVE_BULLETS_MAX} bullet points per request"}), 413
+    job_description, error = _job_description(data, 'jobDescription')
+    if error:
+        return error
+    if not all([job_title, industry, job_description]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    sanitized_bullets = [bleach.clean(bullet) for bullet in bullets]
+    improved = improve_resume_bullets(
+        sanitized_bullets, bleach.clean(job_title), bleach.clean(industry), job_description.text, model_name,
+        regenerate=regenerate
+    )
+
+    return jsonify({
+        "results": [
+            {"bulletPoint": original, "improved_bullet": result}
+            for original, result in zip(sanitized_bullets, improved)
+        ],
+        "model_used": model_name or "default",
+        "llm_mode": os.environ.get("LLM_MODE", "production"),
+        "jd_id": job_description.jd_id
     })
 
 
@@ -1161,10 +1858,31 @@ def check_for_duplicates() -> ResponseValue: # FIXED: Added return type hint
     if not isinstance(bullet_points, list):
         return jsonify({"error": "Expected a list of bullet points"}), 400
 
+    try:
+        threshold = float(data.get('threshold', DUPLICATE_THRESHOLD))
+    except (TypeError, ValueError):
+        return jsonify({"error": "threshold must be a number"}), 400
+    if not 0 <= threshold <= 100:
+        return jsonify({"error": "threshold must be between 0 and 100"}), 400
+    # The LLM is only an optional second opinion on the embedding matches.
+    confirm_with_llm = bool(data.get('confirmWithLlm', False))
+    model_name = data.get('modelName')
+
     sanitized_bullet_points = [bleach.clean(bullet) for bullet in bullet_points]
 
-    duplicate_data = find_duplicate_entries(sanitized_bullet_points)
-    return jsonify({"duplicates": duplicate_data})
+    if data.get('async'):
+        return _submit_job('check-duplicates', _duplicates_result, sanitized_bullet_points, threshold,
+                           confirm_with_llm, model_name)
+
+    return jsonify(_duplicates_result(sanitized_bullet_points, threshold, confirm_with_llm, model_name))
+
+
+def _duplicates_result(bullet_points: list, threshold: float = DUPLICATE_THRESHOLD, confirm_with_llm: bool = False,
+                       model_name: Optional[str] = None) -> dict:
+    duplicates = find_duplicate_entries(
+        bullet_points, threshold=threshold, encoder=model, confirm_with_llm=confirm_with_llm, model_name=model_name
+    )
+    return {"duplicates": duplicates, "threshold": threshold}
 
 
 @app.route('/generate-ats-resume', methods=['POST'])
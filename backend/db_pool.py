@@ -0,0 +1,250 @@
+# resume-builder/backend/db_pool.py
+# Bounded PostgreSQL connection pool shared by every request in a worker process.
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+# --- Configuration ---
+DB_HOST = os.environ.get("POSTGRES_HOST", "postgres")
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+# Seconds a request will wait for a free connection before giving up.
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "5"))
+# Idle connections older than this are pinged with SELECT 1 before reuse.
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.environ.get("DB_POOL_HEALTHCHECK_INTERVAL", "30"))
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the wait timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of psycopg2 connections.
+
+    Connections are opened lazily up to `maxconn`; once the bound is reached,
+    callers block for up to `timeout` seconds waiting for one to be returned.
+    """
+
+    def __init__(self, connect_kwargs: Dict, minconn: int = 1, maxconn: int = 10,
+                 timeout: float = 5.0, healthcheck_interval: float = 30.0):
+        if maxconn < 1:
+            raise ValueError("maxconn must be at least 1")
+        self.connect_kwargs = connect_kwargs
+        self.minconn = max(0, min(minconn, maxconn))
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, last_returned_at)
+        self._in_use = set()
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._healthcheck_failures = 0
+        self._connections_opened = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _open(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        with self._lock:
+            self._connections_opened += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for: float) -> bool:
+        """Cheap liveness check; only pings connections that sat idle for a while."""
+        if getattr(conn, "closed", 0):
+            return False
+        if idle_for < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        """Checks out a connection, waiting up to `timeout` seconds for one to free up."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        # Counted as in use while it is checked outside the lock.
+                        self._in_use.add(conn)
+                        break
+
+                    if len(self._in_use) < self.maxconn:
+                        # Reserve the slot before releasing the lock to connect.
+                        conn = None
+                        placeholder = object()
+                        self._in_use.add(placeholder)
+                        break
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout:.1f}s "
+                            f"(pool max {self.maxconn})"
+                        )
+                    self._lock.wait(remaining)
+
+            if conn is None:
+                break
+            # The ping is a network round trip; other threads keep using the pool meanwhile.
+            if self._is_healthy(conn, time.monotonic() - returned_at):
+                with self._lock:
+                    return self._checkout(conn, started)
+            self._discard(conn)
+            with self._lock:
+                self._in_use.discard(conn)
+                self._healthcheck_failures += 1
+                self._lock.notify()
+
+        try:
+            conn = self._open()
+        except Exception:
+            with self._lock:
+                self._in_use.discard(placeholder)
+                self._lock.notify()
+            raise
+
+        with self._lock:
+            self._in_use.discard(placeholder)
+            return self._checkout(conn, started)
+
+    def _checkout(self, conn, started: float):
+        waited = time.monotonic() - started
+        self._in_use.add(conn)
+        self._checkouts += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Returns a connection to the pool, rolling back any open transaction."""
+        if not discard and not getattr(conn, "closed", 0):
+            try:
+                status = conn.get_transaction_status()
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._lock:
+            self._in_use.discard(conn)
+            if discard or self._closed or len(self._idle) >= self.maxconn:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    def prefill(self):
+        """Opens `minconn` connections up front so the first requests skip the handshake."""
+        with self._lock:
+            missing = self.minconn - len(self._idle) - len(self._in_use)
+        for _ in range(max(0, missing)):
+            self.putconn(self._open_reserved())
+
+    def _open_reserved(self):
+        conn = self._open()
+        with self._lock:
+            self._in_use.add(conn)
+        return conn
+
+    def closeall(self):
+        """Closes every idle connection and refuses further checkouts."""
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            self._lock.notify_all()
+
+    def stats(self) -> Dict:
+        """Returns pool size and wait-time metrics."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "connections_opened": self._connections_opened,
+                "healthcheck_failures": self._healthcheck_failures,
+                "avg_wait_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+# --- Process-wide pool ---
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the pool for this process, creating it on first use.
+    A forked worker never reuses its parent's sockets; it builds a fresh pool.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ConnectionPool(
+                connect_kwargs={
+                    "host": DB_HOST,
+                    "database": os.environ.get('POSTGRES_DB'),
+                    "user": os.environ.get('POSTGRES_USER'),
+                    "password": os.environ.get('POSTGRES_PASSWORD'),
+                },
+                minconn=DB_POOL_MIN,
+                maxconn=DB_POOL_MAX,
+                timeout=DB_POOL_TIMEOUT,
+                healthcheck_interval=DB_POOL_HEALTHCHECK_INTERVAL,
+            )
+            _pool_pid = pid
+    return _pool
+
+
+def reset_pool():
+    """Closes and forgets the current pool (used on shutdown and in tests)."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
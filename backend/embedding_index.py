@@ -0,0 +1,223 @@
+# resume-builder/backend/embedding_index.py
+# In-memory, per-table embedding matrices kept in sync with the write routes.
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import embedding_store
+import semantic_search
+
+INITIAL_CAPACITY = 64
+
+
+class EmbeddingIndex:
+    """
+    Contiguous float32 matrix of unit-normalized embeddings plus parallel id
+    and text arrays for one library table.
+
+    The index is built lazily from Postgres on first use. Afterwards inserts
+    append a row and deletes tombstone one; tombstones are compacted away the
+    next time a snapshot is taken. A (row count, max id) stamp read from
+    Postgres on each sync catches writes made by other worker processes.
+    """
+
+    def __init__(self, table: str, text_column: str, dim: int = embedding_store.EMBEDDING_DIM):
+        self.table = table
+        self.text_column = text_column
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._reset_storage(INITIAL_CAPACITY)
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.appends = 0
+        self.tombstones = 0
+        self.compactions = 0
+
+    def _reset_storage(self, capacity: int):
+        self._matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._texts: List[str] = []
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        self._dead = 0
+
+    # --- Loading ---
+    def _read_stamp(self, cur) -> Tuple[int, int]:
+        cur.execute(
+            f"SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {self.table} WHERE embedding IS NOT NULL;"
+        )
+        count, max_id = cur.fetchone()
+        return int(count), int(max_id)
+
+    def _rebuild(self, cur, stamp: Tuple[int, int]):
+        ids, texts, matrix = semantic_search.load_table_embeddings(cur, self.table, self.text_column)
+        n = len(ids)
+        self.dim = matrix.shape[1] if n else self.dim
+        self._reset_storage(max(INITIAL_CAPACITY, n * 2))
+        self._matrix[:n] = matrix
+        self._ids[:n] = ids
+        self._alive[:n] = True
+        self._texts = list(texts)
+        self._positions = {item_id: pos for pos, item_id in enumerate(ids)}
+        self._size = n
+        self._stamp = stamp
+        self._loaded = True
+        self.rebuilds += 1
+
+    def sync(self, cur) -> None:
+        """Builds the index on first use, or rebuilds it if another process changed the table."""
+        stamp = self._read_stamp(cur)
+        with self._lock:
+            if self._loaded and stamp == self._stamp:
+                self.hits += 1
+                return
+            self.misses += 1
+            self._rebuild(cur, stamp)
+
+    def invalidate(self) -> None:
+        """Drops the cached matrix; the next sync reloads it."""
+        with self._lock:
+            self._loaded = False
+            self._reset_storage(INITIAL_CAPACITY)
+
+    # --- Write-through updates ---
+    def append(self, item_id: int, text: str, vector) -> None:
+        """Adds a freshly inserted row. A no-op until the index has been built."""
+        row = semantic_search.normalize_rows(np.asarray(vector, dtype=np.float32).reshape(-1))
+        with self._lock:
+            if not self._loaded or row.shape[0] != self.dim or item_id in self._positions:
+                return
+            if self._size == self._matrix.shape[0]:
+                self._grow()
+            pos = self._size
+            self._matrix[pos] = row
+            self._ids[pos] = item_id
+            self._alive[pos] = True
+            self._texts.append(text)
+            self._positions[item_id] = pos
+            self._size += 1
+            if self._stamp is not None:
+                count, max_id = self._stamp
+                self._stamp = (count + 1, max(max_id, item_id))
+            self.appends += 1
+
+    def remove(self, item_id: int) -> None:
+        """Tombstones a deleted row."""
+        with self._lock:
+            if not self._loaded:
+                return
+            pos = self._positions.pop(item_id, None)
+            if pos is None:
+                return
+            self._alive[pos] = False
+            self._dead += 1
+            if self._stamp is not None:
+                count, max_id = self._stamp
+                # A deleted max id can't be re-derived cheaply; force a resync in that case.
+                self._stamp = (count - 1, max_id) if item_id != max_id else None
+            self.tombstones += 1
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] * 2
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+        alive = np.zeros(capacity, dtype=bool)
+        matrix[:self._size] = self._matrix[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+        alive[:self._size] = self._alive[:self._size]
+        self._matrix, self._ids, self._alive = matrix, ids, alive
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        n = keep.shape[0]
+        capacity = max(INITIAL_CAPACITY, n * 2)
+        # New arrays, so snapshots handed out earlier stay valid.
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+        alive = np.zeros(capacity, dtype=bool)
+        matrix[:n] = self._matrix[keep]
+        ids[:n] = self._ids[keep]
+        alive[:n] = True
+        self._texts = [self._texts[i] for i in keep]
+        self._matrix, self._ids, self._alive = matrix, ids, alive
+        self._positions = {int(item_id): pos for pos, item_id in enumerate(ids[:n])}
+        self._size = n
+        self._dead = 0
+        self.compactions += 1
+
+    # --- Reads ---
+    def snapshot(self) -> Tuple[List[int], List[str], np.ndarray]:
+        """Returns (ids, texts, matrix) for the live rows; the matrix is a view, not a copy."""
+        with self._lock:
+            if self._dead:
+                self._compact()
+            n = self._size
+            return self._ids[:n].tolist(), self._texts[:n], self._matrix[:n]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "rows": self._size - self._dead,
+                "tombstoned": self._dead,
+                "capacity": self._matrix.shape[0],
+                "hits": self.hits,
+                "misses": self.misses,
+                "rebuilds": self.rebuilds,
+                "appends": self.appends,
+                "tombstones": self.tombstones,
+                "compactions": self.compactions,
+            }
+
+
+# --- Registry ---
+# Tables with an index, and the column shown as each item's text.
+INDEXED_TABLES = {
+    "skills": "skill_text",
+    "accomplishments": "accomplishment_text",
+    "work_experience": "job_title",
+    "technical_projects": "project_name",
+}
+
+_indexes: Dict[str, EmbeddingIndex] = {
+    table: EmbeddingIndex(table, text_column) for table, text_column in INDEXED_TABLES.items()
+}
+
+
+def get_index(table: str) -> EmbeddingIndex:
+    return _indexes[table]
+
+
+def load(cur, table: str) -> Tuple[List[int], List[str], np.ndarray]:
+    """Syncs the table's index with Postgres and returns a snapshot of it."""
+    index = _indexes[table]
+    index.sync(cur)
+    return index.snapshot()
+
+
+def record_insert(table: str, item_id: int, text: str, vector) -> None:
+    if table in _indexes:
+        _indexes[table].append(item_id, text, vector)
+
+
+def record_delete(table: str, item_id: int) -> None:
+    if table in _indexes:
+        _indexes[table].remove(item_id)
+
+
+def reset() -> None:
+    """Invalidates every index (after schema changes, and in tests)."""
+    for index in _indexes.values():
+        index.invalidate()
+
+
+def stats() -> Dict[str, Dict]:
+    return {table: index.stats() for table, index in _indexes.items()}
@@ -0,0 +1,202 @@
+# resume-builder/backend/embedding_store.py
+# Compact storage for sentence embeddings: float32 BYTEA, or pgvector when the extension is available.
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+
+# --- Configuration ---
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+# "auto" uses pgvector when CREATE EXTENSION succeeds, otherwise BYTEA; "bytea" forces BYTEA.
+EMBEDDING_STORAGE = os.environ.get("EMBEDDING_STORAGE", "auto").lower()
+MIGRATION_PAGE_SIZE = 500
+
+# Every table that carries an `embedding` column.
+EMBEDDING_TABLES = (
+    "skills",
+    "work_experience",
+    "accomplishments",
+    "professional_summaries",
+    "education",
+    "cert",
+    "technical_projects",
+    "job_postings",
+)
+
+# Little-endian float32 is the on-disk BYTEA layout, so reads are a zero-copy view on x86/ARM.
+_DTYPE = np.dtype("<f4")
+# pgvector's binary send format: uint16 dim, uint16 unused, then big-endian float4s.
+_PGVECTOR_HEADER = 4
+_PGVECTOR_DTYPE = np.dtype(">f4")
+
+BACKEND_BYTEA = "bytea"
+BACKEND_PGVECTOR = "pgvector"
+BACKEND_TEXT = "text"  # legacy JSON column, only seen before the migration has run
+
+_backend_cache: Dict[str, str] = {}
+_backend_lock = threading.Lock()
+
+
+# --- Backend detection ---
+def column_backend(cur, table: str) -> str:
+    """Returns how `table.embedding` is stored, caching the answer for this process."""
+    backend = _backend_cache.get(table)
+    if backend is not None:
+        return backend
+    cur.execute(
+        """
+        SELECT udt_name FROM information_schema.columns
+        WHERE table_name = %s AND column_name = 'embedding';
+        """,
+        (table,),
+    )
+    row = cur.fetchone()
+    udt = row[0] if row else BACKEND_BYTEA
+    backend = {"vector": BACKEND_PGVECTOR, "text": BACKEND_TEXT}.get(udt, BACKEND_BYTEA)
+    with _backend_lock:
+        _backend_cache[table] = backend
+    return backend
+
+
+def reset_backend_cache() -> None:
+    """Forgets detected column types (called after the schema changes)."""
+    with _backend_lock:
+        _backend_cache.clear()
+
+
+# --- Encoding ---
+def to_db_value(vector, backend: str):
+    """Converts an embedding into the parameter psycopg2 should bind for `backend`."""
+    arr = np.asarray(vector, dtype=_DTYPE).reshape(-1)
+    if backend == BACKEND_PGVECTOR:
+        # An untyped text literal is coerced to vector(n) by Postgres on insert.
+        return "[" + ",".join(repr(float(x)) for x in arr) + "]"
+    if backend == BACKEND_TEXT:
+        return json.dumps(arr.tolist())
+    return psycopg2.Binary(arr.tobytes())
+
+
+def to_db(cur, table: str, vector):
+    """Shorthand for `to_db_value` using the detected backend of `table`."""
+    return to_db_value(vector, column_backend(cur, table))
+
+
+# --- Decoding ---
+def select_expr(backend: str, column: str = "embedding") -> str:
+    """SQL expression that reads `column` as raw bytes for `backend`."""
+    if backend == BACKEND_PGVECTOR:
+        return f"vector_send({column})"
+    return column
+
+
+def from_db_value(value, backend: str) -> Optional[np.ndarray]:
+    """
+    Decodes one stored embedding. BYTEA values come back as a read-only
+    float32 view over the driver's buffer, without copying.
+    """
+    if value is None:
+        return None
+    if backend == BACKEND_TEXT or isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=_DTYPE)
+    if backend == BACKEND_PGVECTOR:
+        return np.frombuffer(value, dtype=_PGVECTOR_DTYPE, offset=_PGVECTOR_HEADER).astype(_DTYPE)
+    return np.frombuffer(value, dtype=_DTYPE)
+
+
+def stack_db_values(values: Sequence, backend: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    Decodes many stored embeddings into one contiguous (n, dim) float32 matrix.
+    The BYTEA path concatenates the raw buffers once and views the result.
+    """
+    if not values:
+        return np.empty((0, dim), dtype=_DTYPE)
+    if backend == BACKEND_BYTEA and all(not isinstance(v, str) for v in values):
+        matrix = np.frombuffer(b"".join(values), dtype=_DTYPE)
+        return matrix.reshape(len(values), -1)
+    return np.vstack([from_db_value(v, backend) for v in values])
+
+
+# --- Schema setup & migration ---
+def ensure_storage(cur) -> str:
+    """
+    Picks the storage type for new embedding columns, enabling pgvector when
+    allowed and available. Runs inside the caller's transaction.
+    """
+    if EMBEDDING_STORAGE == BACKEND_BYTEA:
+        return BACKEND_BYTEA
+    cur.execute("SAVEPOINT enable_pgvector;")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        cur.execute("RELEASE SAVEPOINT enable_pgvector;")
+        return BACKEND_PGVECTOR
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT enable_pgvector;")
+        if EMBEDDING_STORAGE == BACKEND_PGVECTOR:
+            raise
+        print(f"pgvector unavailable, storing embeddings as BYTEA: {e}")
+        return BACKEND_BYTEA
+
+
+def column_type(backend: str) -> str:
+    """DDL type for an embedding column stored with `backend`."""
+    return f"vector({EMBEDDING_DIM})" if backend == BACKEND_PGVECTOR else "BYTEA"
+
+
+def migrate_text_columns(cur, backend: str, tables: Iterable[str] = EMBEDDING_TABLES) -> List[str]:
+    """
+    Converts legacy JSON-in-TEXT embedding columns to `backend` storage.
+    pgvector parses the JSON array literal server-side in a single ALTER;
+    BYTEA rows are re-encoded client-side and written back in pages.
+    Returns the tables that were migrated.
+    """
+    migrated = []
+    for table in tables:
+        cur.execute(
+            """
+            SELECT udt_name FROM information_schema.columns
+            WHERE table_name = %s AND column_name = 'embedding';
+            """,
+            (table,),
+        )
+        row = cur.fetchone()
+        if not row or row[0] != "text":
+            continue
+
+        if backend == BACKEND_PGVECTOR:
+            cur.execute(
+                f"ALTER TABLE {table} ALTER COLUMN embedding TYPE {column_type(backend)} "
+                f"USING NULLIF(embedding, '')::{column_type(backend)};"
+            )
+        else:
+            _migrate_text_to_bytea(cur, table)
+        migrated.append(table)
+        print(f"Migrated {table}.embedding from TEXT to {column_type(backend)}.")
+
+    reset_backend_cache()
+    return migrated
+
+
+def _migrate_text_to_bytea(cur, table: str) -> None:
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN embedding_bin BYTEA;")
+    cur.execute(f"SELECT id, embedding FROM {table} WHERE embedding IS NOT NULL AND embedding <> '';")
+    rows = cur.fetchall()
+    for start in range(0, len(rows), MIGRATION_PAGE_SIZE):
+        page = [
+            (row_id, to_db_value(json.loads(text), BACKEND_BYTEA))
+            for row_id, text in rows[start:start + MIGRATION_PAGE_SIZE]
+        ]
+        execute_values(
+            cur,
+            f"UPDATE {table} SET embedding_bin = data.v FROM (VALUES %s) AS data(id, v) "
+            f"WHERE {table}.id = data.id;",
+            page,
+            template="(%s, %s::bytea)",
+            page_size=MIGRATION_PAGE_SIZE,
+        )
+    cur.execute(f"ALTER TABLE {table} DROP COLUMN embedding;")
+    cur.execute(f"ALTER TABLE {table} RENAME COLUMN embedding_bin TO embedding;")
@@ -0,0 +1,70 @@
+# resume-builder/backend/gunicorn.conf.py
+# Production serving profile: gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master (preload_app) and the sentence
+# encoder and NLTK corpora are loaded there before any worker is forked, so
+# every worker shares the same model pages copy-on-write instead of holding
+# its own copy.
+
+import gc
+import multiprocessing
+import os
+
+# --- Configuration ---
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+# LLM calls can legitimately take a minute; leave headroom over LLM_READ_TIMEOUT.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+accesslog = "-"
+errorlog = "-"
+
+# Intra-op threads per worker for torch; by default the cores are split between workers.
+TORCH_NUM_THREADS = int(
+    os.environ.get("TORCH_NUM_THREADS", str(max(1, multiprocessing.cpu_count() // max(1, workers))))
+)
+
+if preload_app:
+    # Models are loaded synchronously in the master below; a warm-up thread
+    # alive at fork time could leave its locks held in the children.
+    os.environ["MODEL_WARMUP"] = "lazy"
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers are forked."""
+    if not preload_app:
+        return
+    import model_registry
+    model_registry.warm_up(background=False)
+    server.log.info(f"Models loaded in master: {model_registry.status()}")
+    # Move everything allocated so far out of the GC's reach, so collections
+    # in the workers don't write to (and un-share) the inherited pages.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    try:
+        import torch
+        torch.set_num_threads(TORCH_NUM_THREADS)
+    except ImportError:
+        pass
+
+
+def post_worker_init(worker):
+    """Warm-up hook: first inference and first DB connection happen before traffic arrives."""
+    import model_registry
+    import db_pool
+    try:
+        model_registry.get_encoder().encode("warm-up")
+        model_registry.ensure_nltk_data()
+    except Exception as e:
+        worker.log.warning(f"Model warm-up failed: {e}")
+    try:
+        db_pool.get_pool().prefill()
+    except Exception as e:
+        worker.log.warning(f"Database pool prefill failed: {e}")
@@ -0,0 +1,115 @@
+# resume-builder/backend/jd_cache.py
+# Per-process LRU of analyzed job descriptions, keyed by a hash of the sanitized text.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from scoring_logic import JobDescriptionProfile
+
+# --- Configuration ---
+JD_CACHE_MAX_ENTRIES = int(os.environ.get("JD_CACHE_MAX_ENTRIES", "256"))
+# Seconds a jd_id stays valid after its last use.
+JD_CACHE_TTL = int(os.environ.get("JD_CACHE_TTL", "3600"))
+
+
+def make_jd_id(sanitized_text: str) -> str:
+    """SHA-256 of the sanitized job description; identical postings share one id."""
+    return hashlib.sha256(sanitized_text.encode("utf-8")).hexdigest()
+
+
+class CachedJobDescription(JobDescriptionProfile):
+    """A job description's scoring artifacts plus its whole-text embedding for /api/match."""
+
+    def __init__(self, jd_id: str, text: str):
+        super().__init__(text)
+        self.jd_id = jd_id
+        self._embedding = (None, None)
+
+    def embedding(self, encoder) -> np.ndarray:
+        """encoder.encode(text), computed once per encoder."""
+        with self._lock:
+            if self._embedding[0] is not encoder:
+                self._embedding = (encoder, encoder.encode(self.text))
+            return self._embedding[1]
+
+    def seed_embedding(self, embedding: np.ndarray, encoder) -> None:
+        """Loads a whole-text embedding computed earlier by `encoder`."""
+        with self._lock:
+            self._embedding = (encoder, embedding)
+
+
+class JDCache:
+    """LRU with expiry refreshed on every use. Thread-safe; private to one worker process."""
+
+    def __init__(self, max_entries: int = JD_CACHE_MAX_ENTRIES, ttl: int = JD_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, CachedJobDescription]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def _touch(self, jd_id: str, entry: CachedJobDescription) -> None:
+        # Caller holds the lock.
+        self._entries[jd_id] = (time.time() + self.ttl, entry)
+        self._entries.move_to_end(jd_id)
+
+    def get(self, jd_id: str) -> Optional[CachedJobDescription]:
+        """The cached job description for `jd_id`, or None if unknown or expired."""
+        with self._lock:
+            item = self._entries.get(jd_id)
+            if item is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, entry = item
+            if expires_at < time.time():
+                del self._entries[jd_id]
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._touch(jd_id, entry)
+            self._counters["hits"] += 1
+            return entry
+
+    def add(self, sanitized_text: str) -> CachedJobDescription:
+        """The cached entry for this text, creating it if needed."""
+        jd_id = make_jd_id(sanitized_text)
+        entry = self.get(jd_id)
+        if entry is not None:
+            return entry
+        return self.put(CachedJobDescription(jd_id, sanitized_text))
+
+    def put(self, entry: CachedJobDescription) -> CachedJobDescription:
+        """Caches `entry` unless its jd_id is already cached; returns whichever entry is kept."""
+        with self._lock:
+            item = self._entries.get(entry.jd_id)
+            # Another request may have added it since the caller's lookup.
+            if item is not None:
+                entry = item[1]
+            self._touch(entry.jd_id, entry)
+            if item is None:
+                self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return dict(counters, entries=entries, max_entries=self.max_entries, ttl_seconds=self.ttl)
+
+
+cache = JDCache()
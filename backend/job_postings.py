@@ -0,0 +1,175 @@
+# resume-builder/backend/job_postings.py
+# Saved job postings, with matching and scoring features precomputed in the background.
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import psycopg2
+from psycopg2.extras import Json
+
+import db_pool
+import embedding_store
+import jd_cache
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+_SUMMARY_COLUMNS = "id, title, company, content_hash, status, created_at, features_updated_at"
+
+
+def ensure_schema(cur, embedding_type: str) -> None:
+    # content_hash is the posting's jd_id, so saving the same description twice returns one row.
+    cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS job_postings (
+            id SERIAL PRIMARY KEY,
+            title TEXT,
+            company TEXT,
+            description TEXT NOT NULL,
+            content_hash TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL DEFAULT '{PENDING}',
+            embedding {embedding_type},
+            keywords JSONB,
+            requirements JSONB,
+            requirement_embeddings BYTEA,
+            features_error TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            features_updated_at TIMESTAMPTZ
+        );
+    ''')
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _summary(row: tuple) -> Dict:
+    return {
+        "id": row[0], "title": row[1], "company": row[2], "jd_id": row[3], "status": row[4],
+        "created_at": _iso(row[5]), "features_updated_at": _iso(row[6]),
+    }
+
+
+# --- Reads and writes (the caller owns the transaction) ---
+def create(cur, description: str, title: Optional[str] = None, company: Optional[str] = None) -> Tuple[Dict, bool]:
+    """Saves a sanitized posting. Returns (summary, created); a repeated description returns the existing row."""
+    cur.execute(
+        "INSERT INTO job_postings (title, company, description, content_hash) VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT (content_hash) DO NOTHING RETURNING {_SUMMARY_COLUMNS};",
+        (title, company, description, jd_cache.make_jd_id(description))
+    )
+    row = cur.fetchone()
+    if row is not None:
+        return _summary(row), True
+    cur.execute(
+        f"SELECT {_SUMMARY_COLUMNS} FROM job_postings WHERE content_hash = %s;",
+        (jd_cache.make_jd_id(description),)
+    )
+    return _summary(cur.fetchone()), False
+
+
+def list_postings(cur) -> List[Dict]:
+    cur.execute(f"SELECT {_SUMMARY_COLUMNS} FROM job_postings ORDER BY id DESC;")
+    return [_summary(row) for row in cur.fetchall()]
+
+
+def get(cur, posting_id: int) -> Optional[Dict]:
+    """A posting with its description and, once precomputed, its keywords and requirements."""
+    cur.execute(
+        f"SELECT {_SUMMARY_COLUMNS}, description, keywords, requirements, features_error "
+        "FROM job_postings WHERE id = %s;",
+        (posting_id,)
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return dict(_summary(row), description=row[7], keywords=row[8], requirements=row[9], features_error=row[10])
+
+
+def load(cur, posting_id: int, encoder) -> Optional[jd_cache.CachedJobDescription]:
+    """
+    The posting as a cached job description, seeded from its stored features
+    when they are ready (and computed on demand while they are not).
+    None if there is no such posting.
+    """
+    backend = embedding_store.column_backend(cur, "job_postings")
+    cur.execute(
+        f"SELECT description, content_hash, status, {embedding_store.select_expr(backend)}, keywords, "
+        "requirements, requirement_embeddings FROM job_postings WHERE id = %s;",
+        (posting_id,)
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    description, jd_id, status, embedding, keywords, requirements, requirement_embeddings = row
+
+    entry = jd_cache.cache.get(jd_id)
+    if entry is not None:
+        return entry
+    if status != READY:
+        return jd_cache.cache.add(description)
+
+    entry = jd_cache.CachedJobDescription(jd_id, description)
+    if requirements:
+        # Stored as one float32 (requirement x dim) buffer.
+        requirement_embeddings = np.frombuffer(requirement_embeddings, dtype=np.float32).reshape(len(requirements), -1)
+    else:
+        requirement_embeddings = None
+    entry.seed(keywords=keywords, requirements=requirements, requirement_embeddings=requirement_embeddings, encoder=encoder)
+    entry.seed_embedding(embedding_store.from_db_value(embedding, backend), encoder)
+    return jd_cache.cache.put(entry)
+
+
+# --- Background precompute ---
+def compute_features(entry: jd_cache.CachedJobDescription, encoder) -> Dict:
+    """Everything matching and scoring need from a posting, as stored in its row."""
+    return {
+        "embedding": entry.embedding(encoder),
+        "keywords": entry.keyword_vector(),
+        "requirements": entry.requirements(),
+        "requirement_embeddings": np.ascontiguousarray(entry.requirement_embeddings(encoder), dtype=np.float32),
+    }
+
+
+def precompute(posting_id: int, encoder) -> Dict:
+    """Job body: computes a posting's features and stores them, marking the row ready or failed."""
+    pool = db_pool.get_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT description FROM job_postings WHERE id = %s;", (posting_id,))
+                row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"Job posting {posting_id} not found")
+
+        try:
+            # Going through the cache also warms it for this worker.
+            features = compute_features(jd_cache.cache.add(row[0]), encoder)
+        except Exception as e:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "UPDATE job_postings SET status = %s, features_error = %s, features_updated_at = NOW() "
+                        "WHERE id = %s;",
+                        (FAILED, str(e) or e.__class__.__name__, posting_id)
+                    )
+            raise
+
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE job_postings SET status = %s, embedding = %s, keywords = %s, requirements = %s, "
+                    "requirement_embeddings = %s, features_error = NULL, features_updated_at = NOW() WHERE id = %s;",
+                    (
+                        READY,
+                        embedding_store.to_db(cur, "job_postings", features["embedding"]),
+                        Json(features["keywords"]),
+                        Json(features["requirements"]),
+                        psycopg2.Binary(features["requirement_embeddings"].tobytes()),
+                        posting_id,
+                    )
+                )
+        return {"id": posting_id, "status": READY, "requirements": len(features["requirements"])}
+    finally:
+        pool.putconn(conn)
@@ -0,0 +1,376 @@
+# resume-builder/backend/job_queue.py
+# Background execution of slow LLM and PDF work, with job status readable from any worker.
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from psycopg2.extras import Json
+
+import db_pool
+
+# --- Configuration ---
+# "postgres" lets any gunicorn worker answer status polls; "memory" is single-process only.
+JOB_STORE = os.environ.get("JOB_STORE", "postgres").lower()
+# Jobs of each type that run at once per worker process, e.g. JOB_CONCURRENCY="match=1,export-pdf=4".
+DEFAULT_CONCURRENCY = {
+    "match": 2,
+    "improve-bullet": 2,
+    "check-duplicates": 1,
+    "export-pdf": 2,
+    "job-posting": 1,
+}
+# Finished jobs are deleted this many seconds after completion.
+JOB_RESULT_TTL = int(os.environ.get("JOB_RESULT_TTL", "3600"))
+# Queued or running jobs older than this many seconds are marked failed; the worker running them has died.
+JOB_STALE_AFTER = int(os.environ.get("JOB_STALE_AFTER", "1800"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+STALE_ERROR = "Job was interrupted before it finished"
+
+
+def parse_concurrency(spec: str, defaults: Dict[str, int] = DEFAULT_CONCURRENCY) -> Dict[str, int]:
+    """Overrides the default per-type limits with "type=n,type=n" pairs."""
+    limits = dict(defaults)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        job_type, _, value = part.partition("=")
+        try:
+            limits[job_type.strip()] = max(1, int(value))
+        except ValueError:
+            print(f"Warning: ignoring invalid JOB_CONCURRENCY entry '{part}'")
+    return limits
+
+
+class FileResult:
+    """A job result that is a file download rather than JSON."""
+
+    def __init__(self, data: bytes, mimetype: str, filename: str):
+        self.data = data
+        self.mimetype = mimetype
+        self.filename = filename
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+# --- Stores ---
+class MemoryJobStore:
+    """Job records in a dict. Only the process that ran a job can report on it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = {}
+        self._files: Dict[str, FileResult] = {}
+
+    def create(self, job_id: str, job_type: str) -> None:
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id, "type": job_type, "status": QUEUED, "result": None, "error": None,
+                "has_file": False, "created_at": _now(), "started_at": None, "finished_at": None,
+            }
+
+    def mark_running(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs[job_id].update(status=RUNNING, started_at=_now())
+
+    def finish(self, job_id: str, result: Optional[Dict] = None, file: Optional[FileResult] = None,
+               error: Optional[str] = None) -> None:
+        with self._lock:
+            if file is not None:
+                self._files[job_id] = file
+            self._jobs[job_id].update(
+                status=FAILED if error else SUCCEEDED, result=result, error=error,
+                has_file=file is not None, finished_at=_now()
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return dict(job, **{key: _iso(job[key]) for key in ("created_at", "started_at", "finished_at")})
+
+    def get_file(self, job_id: str) -> Optional[FileResult]:
+        with self._lock:
+            return self._files.get(job_id)
+
+    def purge(self, older_than: float) -> int:
+        cutoff = _now() - timedelta(seconds=older_than)
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+                self._files.pop(job_id, None)
+            return len(expired)
+
+    def fail_stale(self, older_than: float) -> int:
+        cutoff = _now() - timedelta(seconds=older_than)
+        with self._lock:
+            stale = [job for job in self._jobs.values()
+                     if job["status"] not in FINISHED and (job["started_at"] or job["created_at"]) < cutoff]
+            for job in stale:
+                job.update(status=FAILED, error=STALE_ERROR, finished_at=_now())
+            return len(stale)
+
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS background_jobs (
+        id TEXT PRIMARY KEY,
+        job_type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        result JSONB,
+        error TEXT,
+        file_data BYTEA,
+        file_mimetype TEXT,
+        file_name TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ
+    );
+'''
+
+
+def ensure_schema(cur) -> None:
+    cur.execute(SCHEMA)
+
+
+class PostgresJobStore:
+    """Job records in the background_jobs table, so every worker sees every job."""
+
+    def _execute(self, sql: str, params: tuple, fetch: bool = False):
+        pool = db_pool.get_pool()
+        conn = pool.getconn()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, params)
+                    if fetch:
+                        return cur.fetchone()
+                    return cur.rowcount
+        finally:
+            pool.putconn(conn)
+
+    def create(self, job_id: str, job_type: str) -> None:
+        self._execute(
+            "INSERT INTO background_jobs (id, job_type, status) VALUES (%s, %s, %s);",
+            (job_id, job_type, QUEUED)
+        )
+
+    def mark_running(self, job_id: str) -> None:
+        self._execute(
+            "UPDATE background_jobs SET status = %s, started_at = NOW() WHERE id = %s;",
+            (RUNNING, job_id)
+        )
+
+    def finish(self, job_id: str, result: Optional[Dict] = None, file: Optional[FileResult] = None,
+               error: Optional[str] = None) -> None:
+        self._execute(
+            "UPDATE background_jobs SET status = %s, result = %s, error = %s, file_data = %s, "
+            "file_mimetype = %s, file_name = %s, finished_at = NOW() WHERE id = %s;",
+            (
+                FAILED if error else SUCCEEDED,
+                Json(result) if result is not None else None,
+                error,
+                file.data if file is not None else None,
+                file.mimetype if file is not None else None,
+                file.filename if file is not None else None,
+                job_id,
+            )
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._execute(
+            "SELECT id, job_type, status, result, error, file_data IS NOT NULL, "
+            "created_at, started_at, finished_at FROM background_jobs WHERE id = %s;",
+            (job_id,), fetch=True
+        )
+        if row is None:
+            return None
+        return {
+            "id": row[0], "type": row[1], "status": row[2], "result": row[3], "error": row[4],
+            "has_file": row[5], "created_at": _iso(row[6]), "started_at": _iso(row[7]), "finished_at": _iso(row[8]),
+        }
+
+    def get_file(self, job_id: str) -> Optional[FileResult]:
+        row = self._execute(
+            "SELECT file_data, file_mimetype, file_name FROM background_jobs "
+            "WHERE id = %s AND file_data IS NOT NULL;",
+            (job_id,), fetch=True
+        )
+        return FileResult(bytes(row[0]), row[1], row[2]) if row else None
+
+    def purge(self, older_than: float) -> int:
+        return self._execute(
+            "DELETE FROM background_jobs WHERE finished_at < NOW() - make_interval(secs => %s);",
+            (older_than,)
+        )
+
+    def fail_stale(self, older_than: float) -> int:
+        # Running jobs age from when they started, queued ones from when they were submitted.
+        return self._execute(
+            "UPDATE background_jobs SET status = %s, error = %s, finished_at = NOW() "
+            "WHERE status IN (%s, %s) AND COALESCE(started_at, created_at) < NOW() - make_interval(secs => %s);",
+            (FAILED, STALE_ERROR, QUEUED, RUNNING, older_than)
+        )
+
+
+# --- Queue ---
+class JobQueue:
+    """
+    Runs submitted callables on one bounded thread pool per job type and
+    records their progress in a store. Callables return a JSON-serializable
+    dict or a FileResult; an exception marks the job failed with its message.
+    """
+
+    def __init__(self, store, concurrency: Dict[str, int], result_ttl: int = JOB_RESULT_TTL,
+                 stale_after: int = JOB_STALE_AFTER):
+        self.store = store
+        self.concurrency = dict(concurrency)
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pid = os.getpid()
+        self._done_events: Dict[str, threading.Event] = {}
+        self._counts = {job_type: {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+                        for job_type in self.concurrency}
+        self._last_housekeeping = float("-inf")
+
+    def _executor(self, job_type: str) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads don't survive fork; start over in the child.
+                self._executors = {}
+                self._done_events = {}
+                self._pid = os.getpid()
+            executor = self._executors.get(job_type)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency[job_type], thread_name_prefix=f"job-{job_type}"
+                )
+                self._executors[job_type] = executor
+            return executor
+
+    def _count(self, job_type: str, leaving: Optional[str], entering: str) -> None:
+        with self._lock:
+            counts = self._counts[job_type]
+            if leaving:
+                counts[leaving] -= 1
+            counts[entering] += 1
+
+    def submit(self, job_type: str, fn: Callable, *args, **kwargs) -> str:
+        """Queues fn(*args, **kwargs) and returns the new job's id."""
+        if job_type not in self.concurrency:
+            raise ValueError(f"Unknown job type: {job_type}")
+        self._housekeeping()
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id, job_type)
+        executor = self._executor(job_type)
+        with self._lock:
+            self._done_events[job_id] = threading.Event()
+        self._count(job_type, None, "queued")
+        executor.submit(self._run, job_id, job_type, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, job_type: str, fn: Callable, args: tuple, kwargs: Dict) -> None:
+        outcome = FAILED
+        started = False
+        try:
+            self.store.mark_running(job_id)
+            self._count(job_type, "queued", "running")
+            started = True
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                print(f"Job {job_id} ({job_type}) failed: {e}")
+                self.store.finish(job_id, error=str(e) or e.__class__.__name__)
+            else:
+                if isinstance(result, FileResult):
+                    self.store.finish(job_id, file=result)
+                else:
+                    self.store.finish(job_id, result=result)
+                outcome = SUCCEEDED
+        except Exception as e:
+            # The store itself failed; nothing more can be recorded.
+            print(f"Job {job_id} ({job_type}) could not be recorded: {e}")
+        finally:
+            with self._lock:
+                counts = self._counts[job_type]
+                counts["running" if started else "queued"] -= 1
+                counts[outcome] += 1
+                event = self._done_events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        # Pollers of a job whose worker died get to see it fail.
+        self._housekeeping()
+        return self.store.get(job_id)
+
+    def get_file(self, job_id: str) -> Optional[FileResult]:
+        return self.store.get_file(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> None:
+        """Sleeps until a job run by this process finishes, or for `timeout` seconds."""
+        with self._lock:
+            event = self._done_events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def recover_stale(self) -> int:
+        """Marks jobs left queued or running by a dead worker as failed. Returns how many."""
+        recovered = self.store.fail_stale(self.stale_after)
+        if recovered:
+            print(f"Marked {recovered} interrupted job(s) failed")
+        return recovered
+
+    def _housekeeping(self) -> None:
+        # At most once a minute, piggybacked on submissions and status reads;
+        # the first call in a new worker process runs it straight away.
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_housekeeping < 60:
+                return
+            self._last_housekeeping = now
+        try:
+            self.store.purge(self.result_ttl)
+        except Exception as e:
+            print(f"Purging finished jobs failed: {e}")
+        try:
+            self.recover_stale()
+        except Exception as e:
+            print(f"Recovering interrupted jobs failed: {e}")
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                job_type: dict(self._counts[job_type], concurrency=limit)
+                for job_type, limit in self.concurrency.items()
+            }
+
+
+def create_store(kind: str = JOB_STORE):
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind != "postgres":
+        print(f"Warning: unknown JOB_STORE '{kind}', using postgres")
+    return PostgresJobStore()
+
+
+jobs = JobQueue(create_store(), parse_concurrency(os.environ.get("JOB_CONCURRENCY", "")))
@@ -0,0 +1,230 @@
+# resume-builder/backend/llm_cache.py
+# Content-addressed cache for LLM completions, with in-memory and SQLite backends.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# --- Configuration ---
+# "memory" (per process), "sqlite" (shared by all workers, survives restarts) or "off".
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "memory").lower()
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "/app/cache/llm_cache.sqlite3")
+
+
+def make_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+    """SHA-256 over everything that determines a completion: model, prompts and sampling settings."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- Backends ---
+class MemoryBackend:
+    """LRU dict with per-entry expiry. Thread-safe; private to one worker process."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Tuple[Optional[str], bool]:
+        """Returns (value, expired)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None, True
+            self._entries.move_to_end(key)
+            return value, False
+
+    def set(self, key: str, value: str) -> int:
+        """Stores a value; returns the number of entries evicted to make room."""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    Table in a local SQLite file, shared by every worker on the host and kept
+    across restarts. Least recently used rows are evicted past `max_entries`.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int, ttl: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; sqlite handles cross-process locking on the file.
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL);"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used);")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Tuple[Optional[str], bool]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?;", (key,)).fetchone()
+            if row is None:
+                return None, False
+            value, expires_at = row
+            now = time.time()
+            if expires_at < now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?;", (key,))
+                return None, True
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?;", (now, key))
+            return value, False
+
+    def set(self, key: str, value: str) -> int:
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?);",
+                (key, value, now + self.ttl, now)
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache;").fetchone()
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?);",
+                (excess,)
+            )
+            return excess
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM llm_cache;")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection().execute("SELECT COUNT(*) FROM llm_cache;").fetchone()
+            return count
+
+
+# --- Cache ---
+class LLMCache:
+    """Front end over a backend that keeps hit/miss/eviction counters for this process."""
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            return None
+        try:
+            value, expired = self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never take LLM calls down with it.
+            print(f"LLM cache read failed: {e}")
+            self._count("errors")
+            return None
+        if expired:
+            self._count("expired")
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            evicted = self.backend.set(key, value)
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+            self._count("errors")
+            return
+        self._count("stores")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        if self.backend is None:
+            return dict(counters, backend="off", entries=0)
+        try:
+            entries = len(self.backend)
+        except Exception:
+            entries = None
+        return dict(
+            counters,
+            backend=self.backend.name,
+            entries=entries,
+            max_entries=self.backend.max_entries,
+            ttl_seconds=self.backend.ttl
+        )
+
+
+def create_backend(kind: str = LLM_CACHE_BACKEND):
+    if kind == "off":
+        return None
+    if kind == "sqlite":
+        return SQLiteBackend(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL)
+    if kind != "memory":
+        print(f"Warning: unknown LLM_CACHE_BACKEND '{kind}', using memory")
+    return MemoryBackend(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL)
+
+
+cache = LLMCache(create_backend())
@@ -3,11 +3,18 @@
 import requests
 import os
 import json
+import re
 import time
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+import llm_cache
+import model_registry
+import semantic_search
+
 # --- Configuration ---
 LLM_URL = os.environ.get("LLM_URL", "http://100.98.99.49:8081")
 LLM_API_PATH = "/v1/chat/completions"
@@ -17,32 +24,352 @@ DEFAULT_MODEL = os.environ.get("LM_STUDIO_DEFAULT_MODEL", "qwen2.5-32b-instruct"
 LLM_CONNECT_TIMEOUT = int(os.environ.get("LLM_CONNECT_TIMEOUT", "10"))
 LLM_READ_TIMEOUT = int(os.environ.get("LLM_READ_TIMEOUT", "60"))
 
-# Cache file
+# Maximum simultaneous keep-alive connections to the LLM server per worker process.
+LLM_POOL_MAXSIZE = int(os.environ.get("LLM_POOL_MAXSIZE", "10"))
+# LLM requests a worker process runs at once for batch calls; match llama.cpp's --parallel slots.
+LLM_MAX_PARALLEL = min(int(os.environ.get("LLM_MAX_PARALLEL", "4")), LLM_POOL_MAXSIZE)
+# Admission control in front of llama.cpp: requests in flight, callers allowed to
+# wait for a slot (beyond that they are turned away at once), and how long they wait.
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", "4"))
+LLM_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "16"))
+LLM_QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", "30"))
+
+# /check-duplicates: bullets whose embeddings reach this cosine similarity (in percent) are duplicates.
+DUPLICATE_THRESHOLD = float(os.environ.get("DUPLICATE_THRESHOLD", "85"))
+# Most candidate pairs sent to the LLM when duplicates are confirmed.
+DUPLICATE_CONFIRM_MAX_PAIRS = int(os.environ.get("DUPLICATE_CONFIRM_MAX_PAIRS", "50"))
+
+# Model list cache: served from memory, refreshed in the background once older
+# than CACHE_TIMEOUT; the file only seeds a freshly started process.
 CACHE_DIR = "/app/cache"
 CACHE_FILE = os.path.join(CACHE_DIR, "models.json")
 CACHE_TIMEOUT = 300  # 5 minutes
+# Backoff after a failed refresh: doubles per consecutive failure, capped.
+MODELS_RETRY_BACKOFF = float(os.environ.get("MODELS_RETRY_BACKOFF", "5"))
+MODELS_MAX_BACKOFF = float(os.environ.get("MODELS_MAX_BACKOFF", "300"))
+# Read timeout for the one synchronous fetch made when nothing is cached at all.
+MODELS_COLD_TIMEOUT = int(os.environ.get("MODELS_COLD_TIMEOUT", "5"))
 
 # --- Ensure cache directory exists ---
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 
-def _get_retry_session(retries=3, backoff_factor=0.3):
+class LLMClient:
     """
-    Create a requests session with retry logic for transient failures.
+    Process-wide HTTP client for the llama.cpp server.
+
+    Sessions are shared across threads and keep connections to LLM_URL alive;
+    each retry policy gets its own session with a bounded connection pool
+    (callers wait for a free connection once `pool_maxsize` are in use).
+    Per-call latency and retry counts are recorded under a short call name.
     """
-    session = requests.Session()
-    retry = Retry(
-        total=retries,
-        read=retries,
-        connect=retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=(500, 502, 503, 504),
-        allowed_methods=["GET", "POST"]
+
+    def __init__(self, base_url: str, pool_maxsize: int = 10):
+        self.base_url = base_url
+        self.pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._sessions: Dict[tuple, requests.Session] = {}
+        self._pid = os.getpid()
+        self._metrics: Dict[str, Dict] = {}
+
+    def _session(self, retries: int, backoff_factor: float) -> requests.Session:
+        key = (retries, backoff_factor)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: never share sockets with the parent process.
+                self._sessions = {}
+                self._pid = os.getpid()
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                retry = Retry(
+                    total=retries,
+                    read=retries,
+                    connect=retries,
+                    backoff_factor=backoff_factor,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=["GET", "POST"]
+                )
+                adapter = HTTPAdapter(
+                    max_retries=retry,
+                    pool_connections=1,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=True
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def _record(self, name: str, elapsed: float, retries: int, error: bool) -> None:
+        with self._lock:
+            m = self._metrics.setdefault(name, {
+                "calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0
+            })
+            elapsed_ms = elapsed * 1000
+            m["calls"] += 1
+            m["errors"] += int(error)
+            m["retries"] += retries
+            m["total_ms"] += elapsed_ms
+            m["max_ms"] = max(m["max_ms"], elapsed_ms)
+            m["last_ms"] = elapsed_ms
+
+    def request(self, method: str, path: str, name: str, retries: int = 3,
+                backoff_factor: float = 0.3, **kwargs) -> requests.Response:
+        """Sends a request to LLM_URL + path, recording latency and retries under `name`."""
+        session = self._session(retries, backoff_factor)
+        started = time.monotonic()
+        try:
+            response = session.request(method, f"{self.base_url}{path}", **kwargs)
+        except Exception:
+            self._record(name, time.monotonic() - started, retries, error=True)
+            raise
+        retry_state = getattr(response.raw, "retries", None)
+        retries_used = len(getattr(retry_state, "history", None) or ())
+        self._record(name, time.monotonic() - started, retries_used, error=response.status_code >= 400)
+        return response
+
+    def get(self, path: str, name: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, name, **kwargs)
+
+    def post(self, path: str, name: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, name, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-call-name counters with average and max latency in milliseconds."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": m["calls"],
+                    "errors": m["errors"],
+                    "retries": m["retries"],
+                    "avg_ms": round(m["total_ms"] / m["calls"], 3) if m["calls"] else 0.0,
+                    "max_ms": round(m["max_ms"], 3),
+                    "last_ms": round(m["last_ms"], 3),
+                }
+                for name, m in self._metrics.items()
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+
+
+llm_client = LLMClient(LLM_URL, pool_maxsize=LLM_POOL_MAXSIZE)
+
+
+def get_llm_client_stats() -> Dict[str, Dict]:
+    """Latency/retry metrics for every kind of LLM call made by this process."""
+    return llm_client.stats()
+
+
+# --- Chat Completions ---
+class LLMAPIError(Exception):
+    """The LLM server answered a completion request with a non-200 status."""
+
+    def __init__(self, status_code: int, text: str = ""):
+        super().__init__(f"LLM API failed with status {status_code}")
+        self.status_code = status_code
+        self.text = text
+
+
+class LLMBusyError(Exception):
+    """Too many LLM requests are already waiting; the caller should retry later."""
+
+    def __init__(self, message: str = "LLM server is busy, try again shortly.", retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Flight:
+    """One upstream call that identical concurrent callers wait on together."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMGate:
+    """
+    Bounds in-flight LLM requests and coalesces identical ones.
+
+    At most `max_in_flight` calls reach llama.cpp at once; up to `max_queue`
+    more wait (for at most `queue_timeout` seconds) and anything beyond that
+    fails fast with LLMBusyError. Callers that ask for a key that is already
+    being computed don't queue at all: they wait for that call's result.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = {
+            "admitted": 0, "rejected": 0, "timed_out": 0, "coalesced": 0,
+            "peak_waiting": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0
+        }
+
+    def acquire(self) -> None:
+        started = time.monotonic()
+        with self._cond:
+            if self._in_flight >= self.max_in_flight:
+                if self._waiting >= self.max_queue:
+                    self._stats["rejected"] += 1
+                    raise LLMBusyError()
+                self._waiting += 1
+                self._stats["peak_waiting"] = max(self._stats["peak_waiting"], self._waiting)
+                try:
+                    admitted = self._cond.wait_for(
+                        lambda: self._in_flight < self.max_in_flight, timeout=self.queue_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._stats["timed_out"] += 1
+                    raise LLMBusyError()
+            self._in_flight += 1
+            waited_ms = (time.monotonic() - started) * 1000
+            self._stats["admitted"] += 1
+            self._stats["total_wait_ms"] += waited_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], waited_ms)
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def run(self, key: str, fn):
+        """Returns fn() under the concurrency limit, sharing one call among identical keys."""
+        with self._cond:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            self.acquire()
+            try:
+                flight.result = fn()
+            finally:
+                self.release()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._cond:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.result
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            admitted = stats.pop("total_wait_ms")
+            stats["avg_wait_ms"] = round(admitted / stats["admitted"], 3) if stats["admitted"] else 0.0
+            stats["max_wait_ms"] = round(stats["max_wait_ms"], 3)
+            stats.update(
+                in_flight=self._in_flight,
+                waiting=self._waiting,
+                distinct_prompts_in_flight=len(self._flights),
+                max_in_flight=self.max_in_flight,
+                max_queue=self.max_queue
+            )
+            return stats
+
+
+llm_gate = LLMGate(LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
+
+
+def get_llm_gate_stats() -> Dict:
+    """In-flight/queued counts and coalescing counters for the LLM gate."""
+    return llm_gate.stats()
+
+
+def get_llm_cache_stats() -> Dict:
+    return llm_cache.cache.stats()
+
+
+def _chat_completion(
+    messages: List[Dict],
+    model_name: Optional[str],
+    name: str,
+    temperature: float,
+    max_tokens: int,
+    retries: int = 3,
+    read_timeout: int = LLM_READ_TIMEOUT,
+    regenerate: bool = False
+) -> str:
+    """
+    Returns the completion text for `messages`, from the response cache when
+    the same model, prompts and sampling settings were seen before. Otherwise
+    the request goes through the LLM gate, so identical concurrent calls
+    share one upstream request. With `regenerate`, the cached text is skipped
+    and replaced by a fresh sample; the call still counts against the gate's
+    limit but never shares another caller's result. Raises LLMAPIError on a non-200 reply and
+    LLMBusyError when the gate's queue is full; request errors propagate.
+    """
+    model = model_name or DEFAULT_MODEL
+    key = llm_cache.make_key(model, messages, temperature, max_tokens)
+    cached = None if regenerate else llm_cache.cache.get(key)
+    if cached is not None:
+        return cached
+
+    def fetch() -> str:
+        content = _request_completion(messages, model, name, temperature, max_tokens, retries, read_timeout)
+        if content:
+            llm_cache.cache.set(key, content)
+        return content
+
+    if regenerate:
+        llm_gate.acquire()
+        try:
+            return fetch()
+        finally:
+            llm_gate.release()
+    return llm_gate.run(key, fetch)
+
+
+def _request_completion(
+    messages: List[Dict],
+    model: str,
+    name: str,
+    temperature: float,
+    max_tokens: int,
+    retries: int,
+    read_timeout: int
+) -> str:
+    response = llm_client.post(
+        LLM_API_PATH,
+        name=name,
+        retries=retries,
+        json={
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": False
+        },
+        timeout=(LLM_CONNECT_TIMEOUT, read_timeout)
     )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
+
+    if response.status_code != 200:
+        raise LLMAPIError(response.status_code, response.text)
+
+    return response.json().get("choices", [{}])[0].get("message", {}).get("content", "").strip()
 
 
 def _parse_llm_json_response(content: str) -> List[str]:
@@ -93,73 +420,173 @@ def _parse_llm_json_response(content: str) -> List[str]:
     return items if items else []
 
 
+def find_missing_keywords(job_description: str, user_texts: List[str], limit: int = 20) -> List[str]:
+    """
+    Words from the job description (longer than 3 chars) that appear in none of the user's items.
+    """
+    job_keywords = set(word.lower() for word in job_description.split() if len(word) > 3)
+    user_keywords = set()
+    for text in user_texts:
+        user_keywords.update(word.lower() for word in text.split() if len(word) > 3)
+    return list(job_keywords - user_keywords)[:limit]
+
+
 # --- Helper: Get Available Models from llama.cpp ---
-def get_available_models() -> List[Dict[str, str]]:
+def _fetch_models(retries: int = 1, read_timeout: int = LLM_READ_TIMEOUT) -> List[Dict[str, str]]:
+    """Asks llama.cpp for its models. Raises on any failure."""
+    response = llm_client.get(
+        "/v1/models",
+        name="list_models",
+        retries=retries,
+        timeout=(LLM_CONNECT_TIMEOUT, read_timeout)
+    )
+    if response.status_code != 200:
+        raise LLMAPIError(response.status_code, response.text)
+
+    models = []
+    for model in response.json().get("data", []):
+        model_id = model["id"]
+        size_gb = "N/A"
+        if "7b" in model_id.lower():
+            size_gb = "7"
+        elif "13b" in model_id.lower():
+            size_gb = "13"
+        elif "32b" in model_id.lower():
+            size_gb = "32"
+        models.append({
+            "id": model_id,
+            "size_gb": size_gb
+        })
+    return models
+
+
+class ModelListCache:
     """
-    Returns a list of available models from llama.cpp, cached for 5 minutes.
+    Stale-while-revalidate cache for the model list.
+
+    A list younger than `ttl` is returned as is. An older one is still returned
+    immediately while a background thread refreshes it. Failed refreshes are
+    remembered, and no new attempt is made until an exponential backoff has
+    passed. The file on disk is only read when this process has nothing in memory.
     """
-    # Check cache
-    if os.path.exists(CACHE_FILE):
+
+    def __init__(self, path: str = CACHE_FILE, ttl: float = CACHE_TIMEOUT):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._models: Optional[List[Dict[str, str]]] = None
+        self._fetched_at = 0.0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._last_error: Optional[str] = None
+        self._refresh_thread: Optional[threading.Thread] = None
+        # Held for the cold-start fetch, so concurrent first requests share one call to llama.cpp.
+        self._cold_lock = threading.Lock()
+
+    def get(self) -> List[Dict[str, str]]:
+        with self._lock:
+            if self._models is None:
+                self._load_from_disk()
+            models = self._models
+            stale = time.time() - self._fetched_at >= self.ttl
+            can_retry = time.time() >= self._retry_at
+
+        if models is None:
+            if not can_retry:
+                return []
+            return self._cold_fetch()
+        if stale and can_retry:
+            self._refresh_in_background()
+        return models
+
+    def _cold_fetch(self) -> List[Dict[str, str]]:
+        # Cold start with nothing on disk: one quick attempt, no retries. Requests
+        # that arrive meanwhile wait for it and take its result (or its backoff).
+        with self._cold_lock:
+            with self._lock:
+                models = self._models
+                can_retry = time.time() >= self._retry_at
+            if models is not None:
+                return models
+            if not can_retry:
+                return []
+            return self.refresh(retries=0, read_timeout=MODELS_COLD_TIMEOUT) or []
+
+    def _load_from_disk(self) -> None:
         try:
-            with open(CACHE_FILE, 'r') as f:
+            with open(self.path, 'r') as f:
                 cache_data = json.load(f)
-                if time.time() - cache_data.get("timestamp", 0) < CACHE_TIMEOUT:
-                    return cache_data.get("models", [])
+            self._models = cache_data.get("models", [])
+            self._fetched_at = cache_data.get("timestamp", 0)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Cache read failed: {e}")
 
-    # Fetch fresh models with retry logic
-    session = _get_retry_session()
-    try:
-        response = session.get(
-            f"{LLM_URL}/v1/models",
-            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
-        )
-        if response.status_code == 200:
-            data = response.json()
-            models = []
-            for model in data.get("data", []):
-                model_id = model["id"]
-                size_gb = "N/A"
-                if "7b" in model_id.lower():
-                    size_gb = "7"
-                elif "13b" in model_id.lower():
-                    size_gb = "13"
-                elif "32b" in model_id.lower():
-                    size_gb = "32"
-                models.append({
-                    "id": model_id,
-                    "size_gb": size_gb
-                })
-
-            # Save to cache
-            cache_data = {
-                "timestamp": time.time(),
-                "models": models
+    def _save_to_disk(self, models: List[Dict[str, str]], fetched_at: float) -> None:
+        try:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"timestamp": fetched_at, "models": models}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Cache write failed: {e}")
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, name="models-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def refresh(self, retries: int = 1, read_timeout: int = LLM_READ_TIMEOUT) -> Optional[List[Dict[str, str]]]:
+        """Fetches the list now. Returns it, or None after recording the failure."""
+        try:
+            models = _fetch_models(retries=retries, read_timeout=read_timeout)
+        except Exception as e:
+            print(f"Error fetching models from {LLM_URL}: {e}")
+            with self._lock:
+                self._failures += 1
+                backoff = min(MODELS_MAX_BACKOFF, MODELS_RETRY_BACKOFF * 2 ** (self._failures - 1))
+                self._retry_at = time.time() + backoff
+                self._last_error = str(e)
+            return None
+
+        fetched_at = time.time()
+        with self._lock:
+            self._models = models
+            self._fetched_at = fetched_at
+            self._failures = 0
+            self._retry_at = 0.0
+            self._last_error = None
+        self._save_to_disk(models, fetched_at)
+        return models
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "cached": self._models is not None,
+                "age_seconds": round(time.time() - self._fetched_at, 1) if self._models is not None else None,
+                "failures": self._failures,
+                "retry_in_seconds": max(0.0, round(self._retry_at - time.time(), 1)),
+                "last_error": self._last_error,
             }
-            with open(CACHE_FILE, 'w') as f:
-                json.dump(cache_data, f)
-            return models
-        else:
-            print(f"LLM API error: {response.status_code} - {response.text}")
-    except requests.exceptions.Timeout:
-        print(f"Timeout fetching models from {LLM_URL}")
-    except requests.exceptions.ConnectionError:
-        print(f"Connection error to {LLM_URL}")
-    except Exception as e:
-        print(f"Error fetching models: {e}")
-    finally:
-        session.close()
 
-    return []
 
+model_list_cache = ModelListCache()
 
-# --- LLM Function: Analyze Job Description ---
-def analyze_job_description_with_llm(job_description: str, user_data: Dict, model_name: Optional[str]) -> Dict:
+
+def get_available_models() -> List[Dict[str, str]]:
     """
-    Uses llama.cpp to analyze job description and find relevant skills/accomplishments.
-    Returns: {'suggestions': [...], 'missing_keywords': [...]}
+    Returns a list of available models from llama.cpp without waiting on it
+    once anything is cached (see ModelListCache).
     """
+    return model_list_cache.get()
+
+
+# --- LLM Function: Analyze Job Description ---
+def _analysis_messages(job_description: str, user_data: Dict) -> List[Dict]:
+    """Chat messages asking the LLM to pick the relevant items out of `user_data`."""
     prompt = f"""
 You are an AI assistant helping a job seeker match their resume to a job description.
 
@@ -180,69 +607,46 @@ Output:
 Return a JSON array of strings, e.g., ["Python", "Docker", "Led team of 5"].
 IMPORTANT: Return ONLY the JSON array, no other text.
 """
+    return [
+        {"role": "system", "content": "You are a helpful resume matcher. Always respond with valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
 
-    session = _get_retry_session()
-    try:
-        response = session.post(
-            f"{LLM_URL}{LLM_API_PATH}",
-            json={
-                "model": model_name or DEFAULT_MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a helpful resume matcher. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.3,
-                "max_tokens": 512,
-                "stream": False
-            },
-            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
-        )
 
-        if response.status_code != 200:
-            return {"error": f"LLM API error: {response.status_code} - {response.text}"}
+def analyze_job_description_with_llm(job_description: str, user_data: Dict, model_name: Optional[str]) -> Dict:
+    """
+    Uses llama.cpp to analyze job description and find relevant skills/accomplishments.
+    Returns: {'suggestions': [...], 'missing_keywords': [...]}
+    """
+    messages = _analysis_messages(job_description, user_data)
 
-        result = response.json()
-        content = result.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+    try:
+        content = _chat_completion(messages, model_name, "analyze_job_description", temperature=0.3, max_tokens=512)
 
         # Use robust parsing
         suggestions = _parse_llm_json_response(content)
 
-        # Find missing keywords (simplified)
-        job_keywords = set(word.lower() for word in job_description.split() if len(word) > 3)
         user_texts = user_data.get('skills', []) + user_data.get('accomplishments', [])
-        user_keywords = set()
-        for text in user_texts:
-            user_keywords.update(word.lower() for word in text.split() if len(word) > 3)
-
-        missing_keywords = list(job_keywords - user_keywords)[:20]  # Limit to 20
+        missing_keywords = find_missing_keywords(job_description, user_texts)
 
         return {
             "suggestions": suggestions,
             "missing_keywords": missing_keywords
         }
 
+    except LLMAPIError as e:
+        return {"error": f"LLM API error: {e.status_code} - {e.text}"}
     except requests.exceptions.Timeout:
         return {"error": "LLM request timed out. Try again or check your LLM server."}
     except requests.exceptions.ConnectionError:
         return {"error": "Cannot connect to LLM server. Check if it's running."}
     except Exception as e:
         return {"error": f"LLM analysis failed: {str(e)}"}
-    finally:
-        session.close()
 
 
 # --- LLM Function: Improve Resume Bullet ---
-def improve_resume_bullet(
-    bullet_point: str,
-    job_title: str,
-    industry: str,
-    job_description: str,
-    model_name: Optional[str]
-) -> str:
-    """
-    Uses llama.cpp to rephrase a resume bullet point to better match the job.
-    Returns: improved bullet point as string
-    """
+def _improve_bullet_messages(bullet_point: str, job_title: str, industry: str, job_description: str) -> List[Dict]:
+    """Chat messages asking the LLM to rewrite one bullet for the job."""
     prompt = f"""
 Rewrite the following resume bullet point to better match the job description and industry.
 
@@ -256,84 +660,269 @@ Original bullet:
 
 Rewrite to make it more relevant, concise, and ATS-friendly. Keep the meaning but use keywords from the job description. Return only the rewritten bullet point.
 """
+    return [
+        {"role": "system", "content": "You are a professional resume writer."},
+        {"role": "user", "content": prompt}
+    ]
 
-    session = _get_retry_session()
-    try:
-        response = session.post(
-            f"{LLM_URL}{LLM_API_PATH}",
-            json={
-                "model": model_name or DEFAULT_MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a professional resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.5,
-                "max_tokens": 150,
-                "stream": False
-            },
-            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
-        )
-
-        if response.status_code != 200:
-            return f"Error: LLM API failed with status {response.status_code}"
 
-        content = response.json().get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-        return content
+def improve_resume_bullet(
+    bullet_point: str,
+    job_title: str,
+    industry: str,
+    job_description: str,
+    model_name: Optional[str],
+    regenerate: bool = False
+) -> str:
+    """
+    Uses llama.cpp to rephrase a resume bullet point to better match the job.
+    Repeated requests get the cached rewrite unless `regenerate` asks for a new one.
+    Returns: improved bullet point as string
+    """
+    messages = _improve_bullet_messages(bullet_point, job_title, industry, job_description)
 
+    try:
+        return _chat_completion(messages, model_name, "improve_bullet", temperature=0.5, max_tokens=150,
+                                regenerate=regenerate)
+
+    except LLMBusyError:
+        # Surfaced to the client as a 503 rather than as bullet text.
+        raise
+    except LLMAPIError as e:
+        return f"Error: LLM API failed with status {e.status_code}"
     except requests.exceptions.Timeout:
         return "Error: Request timed out. The LLM took too long to respond."
     except requests.exceptions.ConnectionError:
         return "Error: Cannot connect to LLM server."
     except Exception as e:
         return f"Error: Failed to improve bullet: {str(e)}"
+
+
+# --- LLM Function: Improve Several Bullets ---
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for concurrent LLM calls, shared by every request in this worker."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=LLM_MAX_PARALLEL, thread_name_prefix="llm")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def improve_resume_bullets(
+    bullet_points: List[str],
+    job_title: str,
+    industry: str,
+    job_description: str,
+    model_name: Optional[str],
+    regenerate: bool = False
+) -> List[str]:
+    """
+    Improves several bullets concurrently (at most LLM_MAX_PARALLEL in flight).
+    Returns the results in input order, with the same "Error: ..." strings as
+    improve_resume_bullet for bullets that failed.
+    """
+    executor = _get_executor()
+    futures = [
+        executor.submit(improve_resume_bullet, bullet, job_title, industry, job_description, model_name, regenerate)
+        for bullet in bullet_points
+    ]
+    return [future.result() for future in futures]
+
+
+# --- Streaming Completions ---
+# A complete JSON string literal, used to pick items out of a partially streamed array.
+_JSON_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+def stream_chat_completion(
+    messages: List[Dict],
+    model_name: Optional[str],
+    name: str,
+    temperature: float,
+    max_tokens: int,
+    regenerate: bool = False
+) -> Iterator[str]:
+    """
+    Requests a completion with "stream": True and yields the content deltas as
+    llama.cpp sends them (OpenAI-style `data: {...}` server-sent events).
+    A cached completion is replayed as a single delta unless `regenerate` is
+    set, and a stream read to the end is stored in the cache. Raises
+    LLMAPIError on a non-200 reply, and requests exceptions on connection
+    failures and timeouts.
+    """
+    model = model_name or DEFAULT_MODEL
+    key = llm_cache.make_key(model, messages, temperature, max_tokens)
+    cached = None if regenerate else llm_cache.cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    # Streams hold a gate slot for their whole duration; they can't be coalesced.
+    llm_gate.acquire()
+    try:
+        response = llm_client.post(
+            LLM_API_PATH,
+            name=name,
+            stream=True,
+            json={
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True
+            },
+            timeout=(LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
+        )
+    except Exception:
+        llm_gate.release()
+        raise
+    parts = []
+    try:
+        if response.status_code != 200:
+            raise LLMAPIError(response.status_code)
+        response.encoding = response.encoding or "utf-8"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            try:
+                chunk = json.loads(payload)
+            except ValueError:
+                continue
+            delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if delta:
+                parts.append(delta)
+                yield delta
     finally:
-        session.close()
+        # Hands the connection back to the pool even if the client went away mid-stream.
+        response.close()
+        llm_gate.release()
+
+    # Same text the non-streaming call would have cached.
+    content = "".join(parts).strip()
+    if content:
+        llm_cache.cache.set(key, content)
+
+
+def stream_improved_bullet(
+    bullet_point: str,
+    job_title: str,
+    industry: str,
+    job_description: str,
+    model_name: Optional[str],
+    regenerate: bool = False
+) -> Iterator[str]:
+    """Streaming variant of improve_resume_bullet: yields the rewrite token by token."""
+    messages = _improve_bullet_messages(bullet_point, job_title, industry, job_description)
+    yield from stream_chat_completion(messages, model_name, "improve_bullet_stream", 0.5, 150, regenerate)
+
+
+def stream_job_description_analysis(job_description: str, user_data: Dict, model_name: Optional[str]) -> Iterator[str]:
+    """
+    Streaming variant of analyze_job_description_with_llm: yields each suggested
+    item as soon as its string in the JSON array is complete.
+    """
+    messages = _analysis_messages(job_description, user_data)
+    buffer = ""
+    scanned = 0
+    seen = set()
+    for delta in stream_chat_completion(messages, model_name, "analyze_job_description_stream", 0.3, 512):
+        buffer += delta
+        for match in _JSON_STRING_RE.finditer(buffer, scanned):
+            scanned = match.end()
+            try:
+                item = json.loads(f'"{match.group(1)}"')
+            except ValueError:
+                continue
+            if item and item not in seen:
+                seen.add(item)
+                yield item
+
+    if not seen:
+        # The model didn't answer with quoted strings; fall back to the lenient parser.
+        for item in _parse_llm_json_response(buffer):
+            if item not in seen:
+                seen.add(item)
+                yield item
 
 
 # --- LLM Function: Check for Duplicates ---
-def find_duplicate_entries(bullet_points: List[str]) -> List[str]:
+def find_duplicate_entries(bullet_points: List[str], threshold: float = DUPLICATE_THRESHOLD, encoder=None,
+                           confirm_with_llm: bool = False, model_name: Optional[str] = None) -> List[Dict]:
     """
-    Uses LLM to detect if any bullet points are duplicates or very similar.
-    Returns: list of duplicate/very similar items.
+    Groups bullet points that say the same thing, by cosine similarity of
+    their sentence embeddings. `threshold` and all scores are percentages.
+    With `confirm_with_llm`, the candidate pairs are also put to the LLM and
+    only the pairs it confirms are kept.
+
+    Returns: groups, most similar first, each with the `indices` and `entries`
+    of its bullets, its best pair's `score` and its linked `pairs`.
     """
     if len(bullet_points) < 2:
         return []
 
-    prompt = f"""
-Determine which of the following bullet points are duplicates or very similar in meaning.
+    encoder = encoder or model_registry.encoder
+    # One batched encode call for every bullet.
+    embeddings = semantic_search.normalize_rows(encoder.encode(bullet_points))
+    # The small tolerance keeps identical bullets (cosine 0.99999994 in float32) at threshold=100.
+    pairs = semantic_search.similar_pairs(embeddings, threshold / 100 - 1e-6)
+    if confirm_with_llm and pairs:
+        pairs = _confirm_duplicate_pairs(bullet_points, pairs, model_name)
+
+    return [
+        {
+            "indices": group["indices"],
+            "entries": [bullet_points[i] for i in group["indices"]],
+            "score": _percent(group["score"]),
+            "pairs": [{"indices": [i, j], "score": _percent(score)} for i, j, score in group["pairs"]],
+        }
+        for group in semantic_search.group_pairs(pairs)
+    ]
 
-Bullet points:
-{chr(10).join(bullet_points)}
 
-Return only a JSON array of strings containing the duplicate or very similar ones. If none, return an empty array [].
-"""
+def _percent(similarity: float) -> float:
+    return round(min(similarity, 1.0) * 100, 2)
 
-    session = _get_retry_session(retries=2)
-    try:
-        response = session.post(
-            f"{LLM_URL}{LLM_API_PATH}",
-            json={
-                "model": DEFAULT_MODEL,
-                "messages": [
-                    {"role": "system", "content": "You are a resume consistency checker. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.2,
-                "max_tokens": 200,
-                "stream": False
-            },
-            timeout=(LLM_CONNECT_TIMEOUT, 30)  # Shorter timeout for this function
-        )
 
-        if response.status_code != 200:
-            return []
+def _confirm_duplicate_pairs(bullet_points: List[str], pairs: List, model_name: Optional[str]) -> List:
+    """
+    Keeps the candidate pairs the LLM agrees are duplicates. Only the
+    DUPLICATE_CONFIRM_MAX_PAIRS most similar pairs are asked about; the rest
+    are dropped. If the LLM fails, the embedding result is kept as it is.
+    """
+    candidates = pairs[:DUPLICATE_CONFIRM_MAX_PAIRS]
+    listing = "\n".join(
+        f"{number}. A: {bullet_points[i]}\n   B: {bullet_points[j]}"
+        for number, (i, j, _) in enumerate(candidates, start=1)
+    )
+    prompt = f"""
+For each numbered pair of resume bullet points below, decide whether A and B are duplicates or say the same thing.
+
+{listing}
 
-        content = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
-        duplicates = _parse_llm_json_response(content)
-        return duplicates
+Return only a JSON array of the numbers of the pairs that are duplicates. If none, return an empty array [].
+"""
+
+    messages = [
+        {"role": "system", "content": "You are a resume consistency checker. Always respond with valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
 
+    try:
+        content = _chat_completion(messages, model_name, "confirm_duplicates", temperature=0.0,
+                                   max_tokens=16 + 4 * len(candidates), retries=2, read_timeout=30)
+        confirmed = {int(number) for number in _parse_llm_json_response(content) if str(number).strip().isdigit()}
+    except LLMBusyError:
+        raise
     except Exception as e:
-        print(f"Duplicate check failed: {e}")
-        return []
-    finally:
-        session.close()
\ No newline at end of file
+        print(f"Duplicate confirmation failed, keeping embedding matches: {e}")
+        return pairs
+    return [pair for number, pair in enumerate(candidates, start=1) if number in confirmed]
@@ -0,0 +1,143 @@
+# resume-builder/backend/model_registry.py
+# Lazy, thread-safe loading of the sentence encoder and NLTK corpora, with readiness reporting.
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# --- Configuration ---
+ENCODER_NAME = os.environ.get("ENCODER_NAME", "all-MiniLM-L6-v2")
+# "lazy": load on first use; "background": start loading in a thread at startup.
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "lazy").lower()
+
+# NLTK resources used by scoring_logic (punkt_tab is what word_tokenize loads on NLTK >= 3.9).
+NLTK_RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+}
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class _Resource:
+    """Load-once holder with a status flag that readiness checks can read without blocking."""
+
+    def __init__(self, name: str, loader):
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self.value = None
+        self.status = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+    def get(self):
+        if self.status == READY:
+            return self.value
+        with self._lock:
+            if self.status != READY:
+                self.status = LOADING
+                started = time.monotonic()
+                try:
+                    self.value = self._loader()
+                except Exception as e:
+                    self.status = FAILED
+                    self.error = str(e)
+                    raise
+                self.load_seconds = round(time.monotonic() - started, 3)
+                self.error = None
+                self.status = READY
+        return self.value
+
+    def describe(self) -> Dict:
+        return {"status": self.status, "error": self.error, "load_seconds": self.load_seconds}
+
+
+def _load_encoder():
+    # Imported here so that importing the app (CLI, tests) doesn't pay for torch.
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(ENCODER_NAME)
+
+
+def _load_nltk_data():
+    """Downloads only the NLTK resources that aren't already on disk."""
+    import nltk
+    missing = []
+    for package, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(package)
+    failed = [package for package in missing if not nltk.download(package, quiet=True)]
+    if failed:
+        raise LookupError(f"Could not download NLTK data: {', '.join(failed)}")
+    return missing
+
+
+_encoder = _Resource("encoder", _load_encoder)
+_nltk = _Resource("nltk", _load_nltk_data)
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+
+def get_encoder():
+    """Returns the SentenceTransformer, loading it on first call."""
+    return _encoder.get()
+
+
+def ensure_nltk_data() -> bool:
+    """Makes sure the NLTK corpora are available; cheap after the first successful call."""
+    try:
+        _nltk.get()
+        return True
+    except Exception as e:
+        print(f"Warning: {e}")
+        return False
+
+
+class LazyEncoder:
+    """Stand-in for the SentenceTransformer that loads the real model on first use."""
+
+    def encode(self, *args, **kwargs):
+        return get_encoder().encode(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(get_encoder(), name)
+
+
+encoder = LazyEncoder()
+
+
+def _warm_up():
+    for resource in (_nltk, _encoder):
+        try:
+            resource.get()
+        except Exception as e:
+            print(f"Warning: {resource.name} warm-up failed: {e}")
+
+
+def warm_up(background: bool = True) -> None:
+    """Loads every model, either now or in a daemon thread (started at most once)."""
+    global _warmup_thread
+    if not background:
+        _warm_up()
+        return
+    with _warmup_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            if is_ready():
+                return
+            _warmup_thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+
+
+def is_ready() -> bool:
+    return _encoder.status == READY and _nltk.status == READY
+
+
+def status() -> Dict:
+    return {"ready": is_ready(), "encoder": _encoder.describe(), "nltk": _nltk.describe()}
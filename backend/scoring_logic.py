@@ -1,17 +1,32 @@
+import os
 import re
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from scipy import sparse
+
+import taxonomy
+from text_normalization import normalize_characters, preprocess, tokenize, tokenize_with_offsets, tokenizer_fingerprint
 
 # --- Predefined Keyword Lists & Weights ---
+# Built-in keywords, used only when the taxonomy file (taxonomy.TAXONOMY_PATH) can't be loaded.
 HARD_SKILLS = ['python', 'django', 'react', 'sql', 'agile', 'database management', 'financial modeling']
 TOOLS = ['aws', 'jira', 'git', 'salesforce', 'figma', 'tableau']
 SOFT_SKILLS = ['leadership', 'communication', 'teamwork', 'problem-solving']
 ACTION_VERBS = ['developed', 'managed', 'engineered', 'proven', 'working', 'orchestrated', 'quantified', 'streamlined']
 QUANTIFIABLE_REGEX = r'\b\d+(\.\d+)?%?\b|\$\d+'
 
+# Keyword-scored categories, in the row order of the category mask below.
+KEYWORD_CATEGORIES = {
+    "hard_skills": HARD_SKILLS,
+    "tools": TOOLS,
+    "soft_skills": SOFT_SKILLS,
+    "action_verbs": ACTION_VERBS
+}
+
 CATEGORY_WEIGHTS = {
     "hard_skills": 0.50,
     "tools": 0.20,
@@ -20,96 +35,625 @@ CATEGORY_WEIGHTS = {
     "quantifiable_metrics": 0.05
 }
 
+# Batch scoring tokenizes documents in worker processes only from this many documents up;
+# below it the pool's startup and pickling cost more than tokenizing in-process.
+BATCH_PARALLEL_MIN_DOCUMENTS = int(os.environ.get("SCORING_PARALLEL_MIN_DOCUMENTS", "64"))
+# Worker processes for batch tokenization (0 = os.cpu_count()).
+BATCH_PROCESSES = int(os.environ.get("SCORING_PROCESSES", "0")) or None
+
+# "lexical" scores keyword overlap, "semantic" compares sentence embeddings, "hybrid" blends the two.
+SCORING_MODES = ("lexical", "semantic", "hybrid")
+# A requirement whose best resume sentence has cosine similarity at or below the floor is
+# uncovered, at or above the full mark fully covered, and partly covered in between.
+SEMANTIC_SIMILARITY_FLOOR = float(os.environ.get("SEMANTIC_SIMILARITY_FLOOR", "0.25"))
+SEMANTIC_SIMILARITY_FULL = float(os.environ.get("SEMANTIC_SIMILARITY_FULL", "0.65"))
+# Share of each category score that comes from the semantic side in hybrid mode.
+HYBRID_SEMANTIC_WEIGHT = float(os.environ.get("HYBRID_SEMANTIC_WEIGHT", "0.5"))
+# Sentences embedded per document, and sentences per encoder batch.
+SEMANTIC_MAX_SENTENCES = int(os.environ.get("SEMANTIC_MAX_SENTENCES", "200"))
+SEMANTIC_BATCH_SIZE = 64
+
+_SENTENCE_BREAK = re.compile(r'(?:\r?\n)+|(?<=[.!?;])\s+')
+_BULLET_PREFIX = re.compile(r'^[\s\-*>\u2022\u25aa\u25cf\u2013]+')
+
 def _preprocess_text(text):
     """Internal helper function to clean and preprocess text."""
-    text = text.lower()
-    text = re.sub(r'[^a-z\s]', '', text)
-    tokens = word_tokenize(text)
-    stop_words = set(stopwords.words('english'))
-    filtered_tokens = [word for word in tokens if word not in stop_words]
-    return " ".join(filtered_tokens)
-
-def _extract_keywords_by_category(text, keyword_list):
-    """Internal helper to extract words from text that are in a keyword list."""
-    tokens = word_tokenize(text.lower())
-    found_keywords = [word for word in tokens if word in keyword_list]
-    return " ".join(found_keywords)
-
-def _calculate_category_score(resume_text, jd_text, keyword_list):
-    """Internal helper to calculate cosine similarity for a specific keyword category."""
-    resume_keywords = _extract_keywords_by_category(resume_text, keyword_list)
-    jd_keywords = _extract_keywords_by_category(jd_text, keyword_list)
-
-    if not resume_keywords.strip() or not jd_keywords.strip():
-        return 0.0
-
-    corpus = [resume_keywords, jd_keywords]
-    vectorizer = TfidfVectorizer()
-
-    try:
-        tfidf_matrix = vectorizer.fit_transform(corpus)
-    
-    # Get individual row vectors safely using index 0 and 1
-    # This avoids slicing and is more clearly supported by Pylance
-    
-        doc1_vector = tfidf_matrix[0]  # type:ignore
-        doc2_vector = tfidf_matrix[1]  #type:ignore
-    
-    # Convert to dense arrays if needed for cosine_similarity
-    # But cosine_similarity accepts sparse matrices directly!
-        similarity = cosine_similarity(doc1_vector, doc2_vector)[0][0]
-        return float(similarity)
-    except ValueError as e:
-        if "empty vocabulary" in str(e):
-            return 0.0
-        else:
-            print(f"Unexpected ValueError in TfidfVectorizer: {e}")
-        return 0.0
-    except Exception as e:
-        print(f"Unexpected error in category score calculation: {e}")
-        return 0.0
+    return preprocess(text)
+
+def _build_vocabulary(categories):
+    """
+    Internal helper: maps every keyword to a column and builds a sparse
+    (category x column) 0/1 mask, so all categories can be scored together.
+    """
+    vocabulary = {}
+    rows, cols = [], []
+    for row, keyword_list in enumerate(categories.values()):
+        for keyword in keyword_list:
+            col = vocabulary.setdefault(keyword, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+    mask = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(categories), len(vocabulary))
+    )
+    mask.data[:] = 1.0  # a keyword listed twice in one category still counts once
+    return vocabulary, mask
+
+class KeywordMatcher:
+    """
+    Trie over the token sequences of a keyword vocabulary, so single words and
+    multi-word phrases ("database management") are found in one left-to-right
+    pass over a document's tokens. At each position the longest keyword
+    starting there wins and matching resumes after it, so a phrase's words are
+    not also counted as separate keywords.
+    """
+
+    _END = object()  # trie key holding the column of a keyword ending at that node
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        self._terms = {column: keyword for keyword, column in vocabulary.items()}
+        self._trie = {}
+        for keyword, column in vocabulary.items():
+            tokens = normalize_characters(keyword).split()
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[self._END] = column
+
+    def term(self, column):
+        """The keyword of a column."""
+        return self._terms[column]
+
+    def find(self, tokens):
+        """Yields (column, start, end) token spans for every keyword match in `tokens`."""
+        trie, end_key = self._trie, self._END
+        position, length = 0, len(tokens)
+        while position < length:
+            node = trie.get(tokens[position])
+            match = None
+            cursor = position
+            while node is not None:
+                cursor += 1
+                if end_key in node:
+                    match = (node[end_key], cursor)
+                node = node.get(tokens[cursor]) if cursor < length else None
+            if match is None:
+                position += 1
+            else:
+                yield match[0], position, match[1]
+                position = match[1]
+
+    def count_matrix(self, token_lists):
+        """Sparse (document x keyword) count matrix from pre-tokenized documents."""
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            for column, _, _ in self.find(tokens):
+                rows.append(row)
+                cols.append(column)
+        # Duplicate (row, col) pairs are summed into counts.
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(token_lists), len(self.vocabulary))
+        )
+
+_VOCABULARY, _CATEGORY_MASK = _build_vocabulary(KEYWORD_CATEGORIES)
+_MATCHER = KeywordMatcher(_VOCABULARY)
+
+_TAXONOMY = taxonomy.TaxonomyLoader(
+    taxonomy.TAXONOMY_PATH,
+    taxonomy.TAXONOMY_CACHE_DIR,
+    categories=list(KEYWORD_CATEGORIES),
+    # Terms go through the same tokenizer as the documents they are matched against.
+    tokenize=tokenize,
+    fingerprint=tokenizer_fingerprint
+)
+# Compile (or map the cached arrays) at import, so gunicorn's preload shares them with every worker.
+_TAXONOMY.get()
+
+def _keyword_index():
+    """
+    Internal helper: (matcher, category mask) for the taxonomy file, or for the
+    built-in lists when it can't be loaded. Recompiles when the file changes.
+    """
+    compiled = _TAXONOMY.get()
+    if compiled is None:
+        return _MATCHER, _CATEGORY_MASK
+    return compiled, compiled.category_mask
+
+def _count_matrix(token_lists, vocabulary=None):
+    """
+    Internal helper: sparse (document x keyword) count matrix from pre-tokenized
+    documents, using the keyword index unless a vocabulary is given.
+    """
+    matcher = _keyword_index()[0] if vocabulary is None else KeywordMatcher(vocabulary)
+    return matcher.count_matrix(token_lists)
+
+def _category_similarities(counts, mask=None):
+    """
+    Internal helper: cosine similarity between the resume (row 0) and the job
+    description (row 1) of `counts` for every keyword category at once.
+
+    Weights match what a TfidfVectorizer fitted on the two documents' keywords
+    would produce (raw term counts, smoothed idf, l2 norm per category), so
+    the scores are the same as scoring each category separately.
+    """
+    mask = _keyword_index()[1] if mask is None else mask
+    n_docs = counts.shape[0]
+    document_frequency = np.asarray((counts > 0).sum(axis=0)).ravel()
+    idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+    weighted = sparse.csr_matrix(counts.multiply(idf))
+
+    dots = np.asarray((weighted[0].multiply(weighted[1]) @ mask.T).todense()).ravel()
+    norms = np.sqrt(np.asarray((weighted.multiply(weighted) @ mask.T).todense()))
+    denominators = norms[0] * norms[1]
+    similarities = np.zeros(mask.shape[0])
+    np.divide(dots, denominators, out=similarities, where=denominators > 0)
+    return np.clip(similarities, 0.0, 1.0)
+
+def _category_similarities_one_to_many(query_counts, counts, mask=None):
+    """
+    Internal helper: the same per-category cosine similarity as
+    `_category_similarities`, between one document (1 x keyword row) and each
+    row of `counts`, with every pair weighted as if its two documents were the
+    whole corpus. Returns an (N x category) array.
+
+    With two documents a term's idf is 1 when both contain it and
+    log(3/2) + 1 when only one does, so the per-pair weights reduce to a few
+    sparse products shared by the whole batch.
+    """
+    mask = _keyword_index()[1] if mask is None else mask
+    query = query_counts.toarray().ravel()
+    single_idf_sq = (np.log(3 / 2) + 1) ** 2
+    counts = sparse.csr_matrix(counts)
+
+    # Terms in both documents carry idf 1, so the dot products need no weighting.
+    dots = (counts.multiply(query) @ mask.T).toarray()
+    # Each row's norm: idf 1 for terms it shares with the query, the single-document idf otherwise.
+    row_weights_sq = np.where(query > 0, 1.0, single_idf_sq)
+    row_norms_sq = (counts.multiply(counts).multiply(row_weights_sq) @ mask.T).toarray()
+    # The query's norm: single-document idf everywhere, less the difference for terms each row shares.
+    query_sq = query * query
+    query_norms_sq = (
+        mask @ (query_sq * single_idf_sq)
+        - ((counts > 0).multiply(query_sq * (single_idf_sq - 1)) @ mask.T).toarray()
+    )
+
+    denominators = np.sqrt(row_norms_sq * query_norms_sq)
+    similarities = np.zeros(dots.shape)
+    np.divide(dots, denominators, out=similarities, where=denominators > 0)
+    return np.clip(similarities, 0.0, 1.0)
 
 def _calculate_quantifiable_score(resume_text):
     """Internal helper to score based on the presence of quantifiable metrics."""
     resume_metrics = re.findall(QUANTIFIABLE_REGEX, resume_text)
     return 1.0 if len(resume_metrics) > 0 else 0.0
 
-def calculate_weighted_match_score(resume_text, job_description_text):
-    """
-    Calculates a weighted match score and provides a detailed breakdown.
-    This is the main function to be called from your application.
+# --- Result Types ---
+# __slots__ is declared by hand (dataclass(slots=True) needs Python 3.10), so fields take no defaults.
+@dataclass
+class CategoryScore:
+    """One category's line in the breakdown, as whole percentages."""
+    __slots__ = ("score", "weight", "contribution")
+    score: int
+    weight: int
+    contribution: int
 
-    Returns:
-        str: A JSON string containing the overall score and a detailed breakdown.
+    def to_dict(self) -> Dict[str, int]:
+        return {"score": self.score, "weight": self.weight, "contribution": self.contribution}
+
+@dataclass
+class MatchScore:
     """
-    scores = {}
-    
-    processed_resume = _preprocess_text(resume_text)
-    processed_jd = _preprocess_text(job_description_text)
-
-    scores["hard_skills"] = _calculate_category_score(processed_resume, processed_jd, HARD_SKILLS)
-    scores["tools"] = _calculate_category_score(processed_resume, processed_jd, TOOLS)
-    scores["soft_skills"] = _calculate_category_score(processed_resume, processed_jd, SOFT_SKILLS)
-    scores["action_verbs"] = _calculate_category_score(processed_resume, processed_jd, ACTION_VERBS)
-    scores["quantifiable_metrics"] = _calculate_quantifiable_score(resume_text)
+    A resume/job description match: the overall score and per-category
+    breakdown, plus the per-requirement matches in semantic and hybrid modes
+    and the per-keyword evidence when it was requested.
+    """
+    __slots__ = ("overall_score", "breakdown", "mode", "requirements", "evidence")
+    overall_score: int
+    breakdown: Dict[str, CategoryScore]
+    mode: str
+    requirements: Optional[List[Dict]]
+    evidence: Optional[Dict[str, Dict[str, List[Dict]]]]
+
+    def to_dict(self) -> Dict:
+        """The JSON-ready form the API returns."""
+        result = {
+            "overallScore": self.overall_score,
+            "breakdown": {category: score.to_dict() for category, score in self.breakdown.items()}
+        }
+        if self.mode != "lexical":
+            result["mode"] = self.mode
+            result["requirements"] = self.requirements
+        if self.evidence is not None:
+            result["evidence"] = self.evidence
+        return result
+
+    def to_json(self, indent: Optional[int] = 4) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
 
+def _build_result(scores, mode="lexical", requirements=None, evidence=None):
+    """Internal helper: overall score and breakdown from per-category scores in [0, 1]."""
     overall_score = 0.0
     breakdown = {}
     for category, weight in CATEGORY_WEIGHTS.items():
         score = scores[category]
         weighted_score = score * weight
         overall_score += weighted_score
-        breakdown[category] = {
-            "score": int(round(score * 100)),
-            "weight": int(weight * 100),
-            "contribution": int(round(weighted_score * 100))
-        }
+        breakdown[category] = CategoryScore(
+            score=int(round(score * 100)),
+            weight=int(weight * 100),
+            contribution=int(round(weighted_score * 100))
+        )
 
     final_score_percentage = int(round(overall_score * 100))
 
-    result = {
-        "overallScore": final_score_percentage,
-        "breakdown": breakdown
-    }
+    return MatchScore(
+        overall_score=final_score_percentage,
+        breakdown=breakdown,
+        mode=mode,
+        requirements=requirements,
+        evidence=evidence
+    )
+
+def _tokenize(text):
+    """Internal helper: keyword-ready tokens for one document."""
+    # The preprocessed text is single-space separated, so splitting on whitespace is enough.
+    return _preprocess_text(text).split()
+
+def _tokenize_many(texts, parallel=False, processes=None):
+    """
+    Internal helper: tokenizes a batch of documents, spreading batches of at
+    least BATCH_PARALLEL_MIN_DOCUMENTS over a process pool when `parallel` is set.
+    """
+    if not parallel or len(texts) < BATCH_PARALLEL_MIN_DOCUMENTS:
+        return [_tokenize(text) for text in texts]
+    workers = processes or BATCH_PROCESSES or os.cpu_count() or 1
+    if workers <= 1:
+        return [_tokenize(text) for text in texts]
+    chunksize = max(1, len(texts) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_tokenize, texts, chunksize=chunksize))
+
+def _split_sentences(text):
+    """
+    Internal helper: the sentences and bullet lines of a document, without
+    bullet markers, skipping fragments of fewer than two words.
+    """
+    sentences = []
+    for part in _SENTENCE_BREAK.split(text):
+        part = _BULLET_PREFIX.sub('', part).strip()
+        if len(re.findall(r'[A-Za-z]{2,}', part)) >= 2:
+            sentences.append(part)
+            if len(sentences) == SEMANTIC_MAX_SENTENCES:
+                break
+    return sentences
+
+def _embed_sentences(encoder, sentences):
+    """Internal helper: unit-length embeddings for all sentences from one batched encode call."""
+    embeddings = np.asarray(encoder.encode(sentences, batch_size=SEMANTIC_BATCH_SIZE), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+class JobDescriptionProfile:
+    """
+    The scorer's artifacts for one job description, computed on first use and
+    kept: tokens, keyword hits, requirement sentences with their embeddings
+    and keyword mentions. Passing the same profile to score_match() for many
+    resumes analyzes the job description once. Artifacts stored earlier (a
+    saved job posting's) can be loaded with seed(). Thread-safe.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._lock = threading.RLock()
+        self._tokens = None
+        self._keywords = None
+        self._requirements = None
+        # Artifacts that depend on the keyword index or encoder, keyed by the object that made them.
+        self._columns = (None, None)
+        self._mentions = (None, None)
+        self._requirement_embeddings = (None, None)
+
+    def tokens(self):
+        """Keyword-ready tokens, as _tokenize() gives them."""
+        with self._lock:
+            if self._tokens is None:
+                self._tokens = _tokenize(self.text)
+            return self._tokens
+
+    def keyword_columns(self, matcher):
+        """The column of every keyword hit from `matcher`, once per occurrence; the mask maps columns to categories."""
+        with self._lock:
+            if self._columns[0] is not matcher:
+                if self._keywords is not None:
+                    columns = _keyword_columns(matcher, self._keywords)
+                else:
+                    columns = [column for column, _, _ in matcher.find(self.tokens())]
+                self._columns = (matcher, columns)
+            return self._columns[1]
+
+    def keyword_vector(self, matcher=None):
+        """{keyword: count} for the job description's keyword hits, the form stored with saved postings."""
+        matcher = matcher or _keyword_index()[0]
+        vector = {}
+        for column in self.keyword_columns(matcher):
+            keyword = matcher.term(column)
+            vector[keyword] = vector.get(keyword, 0) + 1
+        return vector
+
+    def requirements(self):
+        """The sentences semantic scoring treats as requirements."""
+        with self._lock:
+            if self._requirements is None:
+                self._requirements = _split_sentences(self.text)
+            return self._requirements
+
+    def requirement_mentions(self, matcher, mask):
+        """(requirement x category) flags for the categories whose keywords each requirement mentions."""
+        with self._lock:
+            if self._mentions[0] is not matcher:
+                tokens = [_tokenize(requirement) for requirement in self.requirements()]
+                self._mentions = (matcher, (matcher.count_matrix(tokens) @ mask.T).toarray() > 0)
+            return self._mentions[1]
+
+    def cached_requirement_embeddings(self, encoder):
+        """Unit-length requirement embeddings from `encoder`, or None if not computed yet."""
+        with self._lock:
+            cached_encoder, embeddings = self._requirement_embeddings
+            return embeddings if cached_encoder is encoder else None
+
+    def store_requirement_embeddings(self, encoder, embeddings):
+        """Keeps requirement embeddings computed alongside a resume's."""
+        with self._lock:
+            self._requirement_embeddings = (encoder, embeddings)
+
+    def requirement_embeddings(self, encoder):
+        """Unit-length requirement embeddings from `encoder`, computing them if needed."""
+        with self._lock:
+            embeddings = self.cached_requirement_embeddings(encoder)
+            if embeddings is None:
+                requirements = self.requirements()
+                embeddings = _embed_sentences(encoder, requirements) if requirements else np.empty((0, 0), dtype=np.float32)
+                self.store_requirement_embeddings(encoder, embeddings)
+            return embeddings
+
+    def seed(self, keywords=None, requirements=None, requirement_embeddings=None, encoder=None):
+        """
+        Loads artifacts computed earlier instead of deriving them from the text:
+        a keyword_vector(), the requirements() and their embeddings from `encoder`.
+        Stored keywords the current keyword index no longer knows are skipped.
+        """
+        with self._lock:
+            if keywords is not None:
+                self._keywords = dict(keywords)
+                self._columns = (None, None)
+            if requirements is not None:
+                self._requirements = list(requirements)
+                self._mentions = (None, None)
+            if requirement_embeddings is not None:
+                self._requirement_embeddings = (encoder, requirement_embeddings)
+
+def _keyword_columns(matcher, keywords):
+    """Internal helper: columns for a stored {keyword: count}, each repeated `count` times."""
+    columns = []
+    for keyword, count in keywords.items():
+        tokens = normalize_characters(keyword).split()
+        # A keyword is its own longest match, so a whole-span hit gives its column.
+        hits = list(matcher.find(tokens))
+        if len(hits) == 1 and hits[0][1:] == (0, len(tokens)):
+            columns.extend([hits[0][0]] * int(count))
+    return columns
+
+def _semantic_scores(resume_text, profile, encoder):
+    """
+    Internal helper: per-category semantic scores and per-requirement matches.
+
+    Every job description sentence is a requirement; its coverage comes from
+    its most similar resume sentence. A category's score is the mean coverage
+    of the requirements that mention one of its keywords, or of all
+    requirements when none do.
+    """
+    resume_sentences = _split_sentences(resume_text)
+    requirements = profile.requirements()
+    if not requirements:
+        return {category: 0.0 for category in KEYWORD_CATEGORIES}, []
+    if not resume_sentences:
+        return {category: 0.0 for category in KEYWORD_CATEGORIES}, [
+            {"requirement": requirement, "bestMatch": None, "similarity": 0.0, "coverage": 0.0}
+            for requirement in requirements
+        ]
+
+    requirement_embeddings = profile.cached_requirement_embeddings(encoder)
+    if requirement_embeddings is None:
+        # First use of this job description: one batched encode call for both documents.
+        embeddings = _embed_sentences(encoder, resume_sentences + requirements)
+        resume_embeddings, requirement_embeddings = embeddings[:len(resume_sentences)], embeddings[len(resume_sentences):]
+        profile.store_requirement_embeddings(encoder, requirement_embeddings)
+    else:
+        resume_embeddings = _embed_sentences(encoder, resume_sentences)
+
+    similarity = requirement_embeddings @ resume_embeddings.T
+    best = similarity.argmax(axis=1)
+    best_similarity = similarity[np.arange(len(requirements)), best]
+    coverage = np.clip(
+        (best_similarity - SEMANTIC_SIMILARITY_FLOOR) / (SEMANTIC_SIMILARITY_FULL - SEMANTIC_SIMILARITY_FLOOR),
+        0.0, 1.0
+    )
+
+    mentions = profile.requirement_mentions(*_keyword_index())
+    mentioned = mentions.sum(axis=0)
+    category_coverage = np.full(len(KEYWORD_CATEGORIES), coverage.mean())
+    np.divide(mentions.T @ coverage, mentioned, out=category_coverage, where=mentioned > 0)
+
+    scores = {category: float(score) for category, score in zip(KEYWORD_CATEGORIES, category_coverage)}
+    matches = [
+        {
+            "requirement": requirement,
+            "bestMatch": resume_sentences[best[index]],
+            "similarity": round(float(best_similarity[index]), 4),
+            "coverage": round(float(coverage[index]), 4),
+        }
+        for index, requirement in enumerate(requirements)
+    ]
+    return scores, matches
+
+def _match_counts(column_lists, n_terms):
+    """Internal helper: sparse (document x keyword) count matrix from each document's hit columns."""
+    rows = [row for row, columns in enumerate(column_lists) for _ in columns]
+    cols = [column for columns in column_lists for column in columns]
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+        shape=(len(column_lists), n_terms)
+    )
+
+def _keyword_evidence(counts, mask, matcher, resume_matches, resume_offsets):
+    """
+    Internal helper: for every category, the job description's keywords split
+    into matched and missing, strongest first. Weights are each keyword's
+    share of the job description's TF-IDF vector for that category (the
+    vector the category score compares against); matched keywords also list
+    their character spans in the resume.
+    """
+    document_frequency = np.asarray((counts > 0).sum(axis=0)).ravel()
+    idf = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+    jd_row = counts.getrow(1)
+    jd_columns = jd_row.indices
+    jd_weights = jd_row.data * idf[jd_columns]
+    in_resume = counts.getrow(0).toarray().ravel()[jd_columns] > 0
+
+    spans = {}
+    for column, start, end in resume_matches:
+        spans.setdefault(column, []).append([resume_offsets[start][0], resume_offsets[end - 1][1]])
+
+    evidence = {}
+    for row, category in enumerate(KEYWORD_CATEGORIES):
+        in_category = mask.getrow(row).toarray().ravel()[jd_columns] > 0
+        columns, weights, found = jd_columns[in_category], jd_weights[in_category], in_resume[in_category]
+        norm = np.sqrt((weights * weights).sum())
+        matched, missing = [], []
+        for index in np.argsort(-weights, kind="stable"):
+            column = int(columns[index])
+            entry = {"keyword": matcher.term(column), "weight": round(float(weights[index] / norm), 4)}
+            if found[index]:
+                entry["offsets"] = spans[column]
+                matched.append(entry)
+            else:
+                missing.append(entry)
+        evidence[category] = {"matched": matched, "missing": missing}
+    return evidence
+
+def score_match(resume_text, job_description_text, mode="lexical", encoder=None, explain=False):
+    """
+    Calculates a weighted match score and provides a detailed breakdown.
+    This is the main function to be called from your application.
+
+    `mode` is "lexical" (keyword TF-IDF), "semantic" (sentence embeddings from
+    `encoder`) or "hybrid" (a blend of both, weighted by HYBRID_SEMANTIC_WEIGHT).
+    `explain` adds matched and missing keywords per category.
+    `job_description_text` may also be a JobDescriptionProfile, whose cached
+    artifacts are then reused instead of analyzing the text again.
+
+    Returns:
+        MatchScore: The overall score and breakdown, plus the best resume match
+        per job requirement in semantic and hybrid modes.
+    """
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode '{mode}', expected one of {SCORING_MODES}")
+    if mode != "lexical" and encoder is None:
+        raise ValueError(f"Scoring mode '{mode}' needs a sentence encoder")
+
+    if isinstance(job_description_text, JobDescriptionProfile):
+        profile = job_description_text
+    else:
+        profile = JobDescriptionProfile(job_description_text)
+    scores = {}
+    requirements = None
+    evidence = None
+
+    if mode != "semantic" or explain:
+        # Each document is tokenized once; with `explain` the resume pass also records offsets.
+        if explain:
+            resume_tokens, resume_offsets = tokenize_with_offsets(resume_text)
+        else:
+            resume_tokens = _tokenize(resume_text)
+
+        matcher, mask = _keyword_index()
+        resume_matches = list(matcher.find(resume_tokens))
+        resume_columns = [column for column, _, _ in resume_matches]
+        counts = _match_counts([resume_columns, profile.keyword_columns(matcher)], mask.shape[1])
+        if mode != "semantic":
+            similarities = _category_similarities(counts, mask)
+            for category, similarity in zip(KEYWORD_CATEGORIES, similarities):
+                scores[category] = float(similarity)
+        if explain:
+            evidence = _keyword_evidence(counts, mask, matcher, resume_matches, resume_offsets)
+
+    if mode != "lexical":
+        semantic_scores, requirements = _semantic_scores(resume_text, profile, encoder)
+        for category, semantic_score in semantic_scores.items():
+            if mode == "hybrid":
+                semantic_score = HYBRID_SEMANTIC_WEIGHT * semantic_score + (1 - HYBRID_SEMANTIC_WEIGHT) * scores[category]
+            scores[category] = semantic_score
+
+    scores["quantifiable_metrics"] = _calculate_quantifiable_score(resume_text)
+
+    return _build_result(scores, mode, requirements, evidence)
+
+def calculate_weighted_match_score(resume_text, job_description_text, mode="lexical", encoder=None, explain=False):
+    """
+    score_match() serialized for callers that want text.
+
+    Returns:
+        str: A JSON string containing the overall score and a detailed breakdown.
+    """
+    return score_match(resume_text, job_description_text, mode, encoder, explain).to_json()
+
+def calculate_batch_match_scores(resume_texts, job_description_texts, parallel=False, processes=None):
+    """
+    Scores one resume against many job descriptions, or many resumes against
+    one job description, giving each pair the same result as score_match.
+
+    The single document is tokenized once and the other side is scored as
+    one sparse matrix. With `parallel`, large batches are tokenized in a
+    process pool of `processes` workers (default SCORING_PROCESSES, else one per CPU).
+    The pool forks this process, so `parallel` is for offline and CLI scoring
+    only, never for a threaded web worker.
+
+    A single job description may be a JobDescriptionProfile, whose keyword
+    hits are reused rather than recomputed.
+
+    Returns:
+        list: One MatchScore per document on the "many" side, in input order.
+    """
+    if len(resume_texts) != 1 and len(job_description_texts) != 1:
+        raise ValueError("Batch scoring needs exactly one resume or exactly one job description.")
+
+    profile = job_description_texts[0] if len(job_description_texts) == 1 else None
+    if not isinstance(profile, JobDescriptionProfile):
+        profile = None
+    one_resume = len(resume_texts) == 1 and profile is None
+    single, many = (resume_texts, job_description_texts) if one_resume else (job_description_texts, resume_texts)
+    if not many:
+        return []
+
+    matcher, mask = _keyword_index()
+    if profile is not None:
+        query_counts = _match_counts([profile.keyword_columns(matcher)], mask.shape[1])
+    else:
+        query_counts = matcher.count_matrix([_tokenize(single[0])])
+    counts = matcher.count_matrix(_tokenize_many(many, parallel, processes))
+    similarities = _category_similarities_one_to_many(query_counts, counts, mask)
 
-    return json.dumps(result, indent=4)
+    resume_quantifiable = _calculate_quantifiable_score(resume_texts[0]) if one_resume else None
+    results = []
+    for index, row in enumerate(similarities):
+        scores = {category: float(similarity) for category, similarity in zip(KEYWORD_CATEGORIES, row)}
+        scores["quantifiable_metrics"] = (
+            resume_quantifiable if one_resume else _calculate_quantifiable_score(resume_texts[index])
+        )
+        results.append(_build_result(scores))
+    return results
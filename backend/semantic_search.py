@@ -0,0 +1,172 @@
+# resume-builder/backend/semantic_search.py
+# Cosine-similarity ranking of stored library items against a query embedding.
+
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import embedding_store
+
+# Library tables that /api/match ranks, keyed by the item type the frontend expects.
+MATCH_SOURCES = {
+    "skill": ("skills", "skill_text"),
+    "accomplishment": ("accomplishments", "accomplishment_text"),
+}
+
+# Above this many rows, similar_pairs() only compares rows that share a
+# random-hyperplane (LSH) bucket instead of computing the full n x n matrix.
+SIMILAR_PAIRS_EXACT_MAX = int(os.environ.get("SIMILAR_PAIRS_EXACT_MAX", "2000"))
+# Hyperplanes per hash table and number of tables; more tables find more of the
+# pairs near the threshold at the cost of more candidate comparisons.
+LSH_BITS = 8
+LSH_TABLES = 16
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scales each row to unit length so a dot product is a cosine similarity."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        norm = np.linalg.norm(matrix)
+        return matrix / norm if norm > 0 else matrix
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_similar(query: np.ndarray, matrix: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """
+    Returns (row index, cosine similarity) for the k rows of `matrix` closest
+    to `query`, best first. `matrix` rows must already be unit length.
+    """
+    if k <= 0 or matrix.shape[0] == 0:
+        return []
+    scores = matrix @ normalize_rows(query)
+    k = min(k, scores.shape[0])
+    # argpartition is O(n); only the k winners get fully sorted.
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(i), float(scores[i])) for i in ordered]
+
+
+def load_table_embeddings(cur, table: str, text_column: str) -> Tuple[List[int], List[str], np.ndarray]:
+    """Reads every embedded row of `table` into (ids, texts, unit-normalized matrix)."""
+    backend = embedding_store.column_backend(cur, table)
+    cur.execute(
+        f"SELECT id, {text_column}, {embedding_store.select_expr(backend)} "
+        f"FROM {table} WHERE embedding IS NOT NULL ORDER BY id;"
+    )
+    rows = cur.fetchall()
+    ids = [row[0] for row in rows]
+    texts = [row[1] for row in rows]
+    matrix = embedding_store.stack_db_values([row[2] for row in rows], backend)
+    return ids, texts, normalize_rows(matrix)
+
+
+def rank_items(query: np.ndarray, sources: Dict[str, Tuple[List[int], List[str], np.ndarray]],
+               top_k: int) -> List[Dict]:
+    """
+    Ranks items from several sources in one matrix product.
+    `sources` maps item type -> (ids, texts, normalized matrix).
+    """
+    labels: List[Tuple[str, int, str]] = []
+    blocks = []
+    for item_type, (ids, texts, matrix) in sources.items():
+        if matrix.shape[0] == 0:
+            continue
+        labels.extend((item_type, item_id, text) for item_id, text in zip(ids, texts))
+        blocks.append(matrix)
+    if not blocks:
+        return []
+
+    combined = blocks[0] if len(blocks) == 1 else np.vstack(blocks)
+    ranked = []
+    for row, score in top_k_similar(query, combined, top_k):
+        item_type, item_id, text = labels[row]
+        ranked.append({
+            "id": f"{item_type}-{item_id}",
+            "text": text,
+            "type": item_type,
+            "score": round(score, 4),
+        })
+    return ranked
+
+
+def shortlist_texts(ranked: Sequence[Dict], item_type: str) -> List[str]:
+    """Texts of the ranked items of one type, in rank order."""
+    return [item["text"] for item in ranked if item["type"] == item_type]
+
+
+# --- Near-duplicates ---
+def similar_pairs(matrix: np.ndarray, threshold: float,
+                  exact_max: int = SIMILAR_PAIRS_EXACT_MAX) -> List[Tuple[int, int, float]]:
+    """
+    (i, j, cosine similarity) for the pairs of rows, i < j, at or above
+    `threshold`, most similar first. `matrix` rows must already be unit
+    length. Up to `exact_max` rows every pair is compared; beyond that the
+    search is approximate and may miss pairs close to the threshold.
+    """
+    n = matrix.shape[0]
+    if n < 2:
+        return []
+    if n <= exact_max:
+        first, second = np.triu_indices(n, k=1)
+        scores = (matrix @ matrix.T)[first, second]
+    else:
+        first, second = _lsh_candidates(matrix)
+        scores = np.einsum("ij,ij->i", matrix[first], matrix[second])
+    keep = scores >= threshold
+    first, second, scores = first[keep], second[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return [(int(first[k]), int(second[k]), float(scores[k])) for k in order]
+
+
+def _lsh_candidates(matrix: np.ndarray, tables: int = LSH_TABLES, bits: int = LSH_BITS) -> Tuple[np.ndarray, np.ndarray]:
+    """Row pairs (i < j) that share a bucket in at least one random-hyperplane hash table."""
+    n = matrix.shape[0]
+    rng = np.random.default_rng(0)  # fixed planes keep results repeatable
+    weights = 1 << np.arange(bits)
+    keys = []
+    for _ in range(tables):
+        planes = rng.standard_normal((matrix.shape[1], bits)).astype(np.float32)
+        codes = ((matrix @ planes) > 0) @ weights
+        order = np.argsort(codes, kind="stable")
+        for bucket in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+            if len(bucket) < 2:
+                continue
+            first, second = np.triu_indices(len(bucket), k=1)
+            low = np.minimum(bucket[first], bucket[second]).astype(np.int64)
+            high = np.maximum(bucket[first], bucket[second]).astype(np.int64)
+            keys.append(low * n + high)
+    if not keys:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    unique = np.unique(np.concatenate(keys))
+    return unique // n, unique % n
+
+
+def group_pairs(pairs: Sequence[Tuple[int, int, float]]) -> List[Dict]:
+    """
+    Joins linked pairs into groups (connected components). Each group lists
+    its sorted `indices`, its `pairs` and its best pair's `score`; groups come
+    in order of that score.
+    """
+    parent: Dict[int, int] = {}
+
+    def root(i: int) -> int:
+        parent.setdefault(i, i)
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        parent[root(i)] = root(j)
+
+    groups: Dict[int, Dict] = {}
+    for i, j, score in pairs:
+        group = groups.setdefault(root(i), {"indices": set(), "pairs": [], "score": score})
+        group["indices"].update((i, j))
+        group["pairs"].append((i, j, score))
+        group["score"] = max(group["score"], score)
+    ordered = sorted(groups.values(), key=lambda group: (-group["score"], min(group["indices"])))
+    return [dict(group, indices=sorted(group["indices"])) for group in ordered]
@@ -0,0 +1,298 @@
+# resume-builder/backend/taxonomy.py
+# Skill/tool taxonomy loaded from a CSV file and compiled into memory-mapped lookup arrays.
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# --- Configuration ---
+TAXONOMY_PATH = os.environ.get(
+    "TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "taxonomy.csv")
+)
+# Compiled arrays are written here once per taxonomy file version and memory-mapped by every worker.
+TAXONOMY_CACHE_DIR = os.environ.get("TAXONOMY_CACHE_DIR", "/app/cache/taxonomy")
+# Terms longer than this many tokens are skipped.
+MAX_PHRASE_TOKENS = 6
+# Bump when the compiled layout or term normalization changes, so stale caches are rebuilt.
+FORMAT_VERSION = 3
+
+_ARRAYS = ("term_hashes", "term_columns", "prefix_hashes", "mask_rows", "mask_cols", "names", "name_offsets")
+
+
+def phrase_hash(tokens: Sequence[str]) -> int:
+    """Stable 64-bit hash of a token sequence (Python's hash() differs between processes)."""
+    digest = hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def read_taxonomy(path: str) -> List[Tuple[str, str, List[str]]]:
+    """
+    Reads (category, term, aliases) rows from a CSV file with a
+    "category,term,aliases" header; aliases are "|"-separated and lines
+    starting with "#" are comments.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = (line for line in f if line.strip() and not line.lstrip().startswith("#"))
+        rows = []
+        for row in csv.DictReader(lines):
+            category = (row.get("category") or "").strip()
+            term = (row.get("term") or "").strip()
+            if not category or not term:
+                continue
+            aliases = [alias.strip() for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+            rows.append((category, term, aliases))
+        return rows
+
+
+def _phrase_tokens(phrase: str, tokenize: Callable[[str], List[str]]) -> Optional[List[str]]:
+    """
+    `phrase` as the document tokenizer sees it, or None (with a warning) when
+    the tokenizer changes any of its words: a dropped stopword, or a digit or
+    symbol stripped from inside a word ("k8s" -> "ks"), would let the phrase
+    match text that never names it.
+    """
+    tokens = tokenize(phrase)
+    if tokens != phrase.lower().split():
+        print(f"Warning: skipping taxonomy phrase '{phrase}' (tokenizes to {tokens})")
+        return None
+    if len(tokens) > MAX_PHRASE_TOKENS:
+        print(f"Warning: skipping taxonomy phrase '{phrase}' (over {MAX_PHRASE_TOKENS} tokens)")
+        return None
+    return tokens
+
+
+def compile_taxonomy(rows: List[Tuple[str, str, List[str]]], categories: Sequence[str],
+                     tokenize: Callable[[str], List[str]]) -> Dict[str, np.ndarray]:
+    """
+    Compiles taxonomy rows into flat arrays: sorted phrase hashes with the
+    column of their canonical term, the hashes of every proper prefix of a
+    multi-word phrase, the (category x term) mask as coordinates, and the
+    canonical names as one UTF-8 blob with offsets. `tokenize` must be the
+    tokenizer documents are matched with, so phrases and text agree.
+    """
+    category_rows = {category: index for index, category in enumerate(categories)}
+    columns: Dict[str, int] = {}
+    names: List[str] = []
+    phrase_columns: Dict[int, int] = {}
+    prefixes = set()
+    mask = set()
+    max_tokens = 1
+    for category, term, aliases in rows:
+        if category not in category_rows:
+            print(f"Warning: taxonomy term '{term}' has unknown category '{category}'")
+            continue
+        term_tokens = _phrase_tokens(term, tokenize)
+        if term_tokens is None:
+            continue
+        canonical = " ".join(term_tokens)
+        column = columns.get(canonical)
+        if column is None:
+            column = columns[canonical] = len(names)
+            names.append(canonical)
+        mask.add((category_rows[category], column))
+        for phrase in [term] + aliases:
+            tokens = _phrase_tokens(phrase, tokenize)
+            if tokens is None:
+                continue
+            key = phrase_hash(tokens)
+            existing = phrase_columns.setdefault(key, column)
+            if existing != column:
+                print(f"Warning: taxonomy phrase '{phrase}' already names '{names[existing]}'")
+                continue
+            max_tokens = max(max_tokens, len(tokens))
+            for length in range(1, len(tokens)):
+                prefixes.add(phrase_hash(tokens[:length]))
+
+    hashes = np.fromiter(phrase_columns.keys(), dtype=np.uint64, count=len(phrase_columns))
+    term_columns = np.fromiter(phrase_columns.values(), dtype=np.int32, count=len(phrase_columns))
+    order = np.argsort(hashes)
+    mask_rows, mask_cols = zip(*sorted(mask)) if mask else ((), ())
+    encoded = [name.encode("utf-8") for name in names]
+    return {
+        "term_hashes": hashes[order],
+        "term_columns": term_columns[order],
+        "prefix_hashes": np.array(sorted(prefixes), dtype=np.uint64),
+        "mask_rows": np.array(mask_rows, dtype=np.int32),
+        "mask_cols": np.array(mask_cols, dtype=np.int32),
+        "names": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "name_offsets": np.cumsum([0] + [len(name) for name in encoded]).astype(np.int64),
+        "max_phrase_tokens": max_tokens,
+    }
+
+
+def _contains(sorted_hashes: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Positions in `sorted_hashes` of each key, or -1 where the key is absent."""
+    if len(sorted_hashes) == 0:
+        return np.full(len(keys), -1)
+    positions = np.searchsorted(sorted_hashes, keys)
+    clipped = np.minimum(positions, len(sorted_hashes) - 1)
+    return np.where(sorted_hashes[clipped] == keys, clipped, -1)
+
+
+class CompiledTaxonomy:
+    """
+    Read-only lookup over compiled taxonomy arrays. Matching checks every
+    token's hash against the terms and phrase prefixes in one vectorized
+    search, then extends only the positions that start a longer phrase, so
+    the work stays close to one lookup per token however large the taxonomy.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], categories: Sequence[str], max_phrase_tokens: int):
+        self.categories = tuple(categories)
+        self.max_phrase_tokens = max_phrase_tokens
+        self._term_hashes = arrays["term_hashes"]
+        self._term_columns = arrays["term_columns"]
+        self._prefix_hashes = arrays["prefix_hashes"]
+        self._names = arrays["names"]
+        self._name_offsets = arrays["name_offsets"]
+        self.n_terms = len(self._name_offsets) - 1
+        self.category_mask = sparse.csr_matrix(
+            (np.ones(len(arrays["mask_rows"])), (arrays["mask_rows"], arrays["mask_cols"])),
+            shape=(len(self.categories), self.n_terms)
+        )
+
+    def term(self, column: int) -> str:
+        """Canonical name of a term column."""
+        start, end = self._name_offsets[column], self._name_offsets[column + 1]
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def find(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, int]]:
+        """Yields (column, start, end) token spans, taking the longest term at each position."""
+        if not tokens:
+            return
+        token_hashes: Dict[str, int] = {}
+        positions = np.arange(len(tokens))
+        keys = np.array([token_hashes.setdefault(t, phrase_hash((t,))) for t in tokens], dtype=np.uint64)
+        longest = np.full(len(tokens), -1)  # column of the longest match per start position
+        longest_end = np.zeros(len(tokens), dtype=np.int64)
+        length = 1
+        while len(positions):
+            hits = _contains(self._term_hashes, keys)
+            found = hits >= 0
+            longest[positions[found]] = self._term_columns[hits[found]]
+            longest_end[positions[found]] = positions[found] + length
+            if length == self.max_phrase_tokens:
+                break
+            extend = (_contains(self._prefix_hashes, keys) >= 0) & (positions + length < len(tokens))
+            positions = positions[extend]
+            length += 1
+            keys = np.array(
+                [phrase_hash(tokens[start:start + length]) for start in positions], dtype=np.uint64
+            )
+
+        position = 0
+        for start in np.flatnonzero(longest >= 0):
+            if start >= position:
+                position = int(longest_end[start])
+                yield int(longest[start]), int(start), position
+
+    def count_matrix(self, token_lists: Sequence[Sequence[str]]):
+        """Sparse (document x term) count matrix from pre-tokenized documents."""
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            for column, _, _ in self.find(tokens):
+                rows.append(row)
+                cols.append(column)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(token_lists), self.n_terms)
+        )
+
+
+class TaxonomyLoader:
+    """
+    Keeps the compiled taxonomy for one file, recompiling when its mtime or
+    size changes. Compiled arrays are cached on disk under a key of the
+    file's path, mtime, size, FORMAT_VERSION and tokenizer fingerprint, so
+    only the first process after a change pays for compilation; the rest
+    memory-map the arrays.
+    """
+
+    def __init__(self, path: str, cache_dir: Optional[str], categories: Sequence[str],
+                 tokenize: Callable[[str], List[str]], fingerprint: Optional[Callable[[], str]] = None):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.categories = tuple(categories)
+        self.tokenize = tokenize
+        # Identifies what `tokenize` produces (e.g. its mode and stopwords), so a
+        # cache compiled under another tokenizer isn't reused.
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[int, int]] = None
+        self._taxonomy: Optional[CompiledTaxonomy] = None
+
+    def get(self) -> Optional[CompiledTaxonomy]:
+        """The current taxonomy, or None when the file can't be read."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if self._version != (-1, -1):
+                print(f"Warning: taxonomy file {self.path} not found")
+                self._version, self._taxonomy = (-1, -1), None
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self._version:
+            return self._taxonomy
+        with self._lock:
+            if version != self._version:
+                try:
+                    self._taxonomy = self._load(version)
+                except LookupError as e:
+                    # The tokenizer's NLTK corpora aren't downloaded yet; try again on the next call.
+                    print(f"Warning: could not compile taxonomy {self.path} yet: {e}")
+                    return None
+                except (OSError, ValueError, csv.Error) as e:
+                    print(f"Warning: could not load taxonomy {self.path}: {e}")
+                    self._taxonomy = None
+                self._version = version
+            return self._taxonomy
+
+    def _cache_key(self, version: Tuple[int, int]) -> str:
+        tokenizer = self.fingerprint() if self.fingerprint else ""
+        source = (f"{os.path.abspath(self.path)}:{version[0]}:{version[1]}:{FORMAT_VERSION}:"
+                  f"{','.join(self.categories)}:{tokenizer}")
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self, version: Tuple[int, int]) -> CompiledTaxonomy:
+        directory = os.path.join(self.cache_dir, self._cache_key(version)) if self.cache_dir else None
+        if directory and os.path.isdir(directory):
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+            return CompiledTaxonomy(arrays, self.categories, meta["max_phrase_tokens"])
+
+        arrays = compile_taxonomy(read_taxonomy(self.path), self.categories, self.tokenize)
+        max_phrase_tokens = arrays.pop("max_phrase_tokens")
+        print(f"Compiled taxonomy {self.path}: {len(arrays['name_offsets']) - 1} terms")
+        if directory:
+            try:
+                self._write_cache(directory, arrays, max_phrase_tokens)
+                return self._load(version)
+            except OSError as e:
+                print(f"Warning: could not cache compiled taxonomy in {directory}: {e}")
+        return CompiledTaxonomy(arrays, self.categories, max_phrase_tokens)
+
+    def _write_cache(self, directory: str, arrays: Dict[str, np.ndarray], max_phrase_tokens: int) -> None:
+        # Written to a private directory and renamed into place, so readers never see a partial cache.
+        staging = f"{directory}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(staging, exist_ok=True)
+        try:
+            for name in _ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), arrays[name])
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"max_phrase_tokens": max_phrase_tokens, "source": self.path}, f)
+            try:
+                os.rename(staging, directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+                # Another worker finished first; its copy is identical.
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
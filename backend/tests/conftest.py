@@ -14,6 +14,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Import after path modification
 from app import app as flask_app
+import db_pool
+import llm_cache
 
 
 @pytest.fixture
@@ -32,6 +34,22 @@ def app():
         yield flask_app
 
 
+@pytest.fixture(autouse=True)
+def reset_db_pool():
+    """Give every test a fresh connection pool so mocked connections never leak between tests."""
+    db_pool.reset_pool()
+    yield
+    db_pool.reset_pool()
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_cache():
+    """Keep cached LLM completions from one test answering another test's call."""
+    llm_cache.cache.clear()
+    yield
+    llm_cache.cache.clear()
+
+
 @pytest.fixture
 def client(app):
     """Create a test client for the Flask app."""
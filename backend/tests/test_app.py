@@ -6,10 +6,36 @@ import json
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import numpy as np
+import requests
 
 # Add the backend directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import jd_cache
+import job_postings
+from scoring_logic import CategoryScore, MatchScore
+
+
+def match_score(overall, mode="lexical", requirements=None, evidence=None):
+    """A MatchScore with a single hard_skills line, as the scorer would return it."""
+    return MatchScore(
+        overall_score=overall,
+        breakdown={"hard_skills": CategoryScore(score=90, weight=50, contribution=45)},
+        mode=mode,
+        requirements=requirements,
+        evidence=evidence
+    )
+
+
+def parse_sse(body):
+    """Splits a text/event-stream body into (event, data) pairs."""
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
 
 class TestResumeEndpoint:
     """Tests for /resume endpoint"""
@@ -173,6 +199,75 @@ class TestAccomplishmentsEndpoint:
         assert "performance" in data[0]['accomplishment_text']
 
 
+class TestBulkImportEndpoints:
+    """Tests for /api/skills/bulk and /api/accomplishments/bulk"""
+
+    @patch('app.execute_values')
+    @patch('app.embedding_store.column_backend', return_value='bytea')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_bulk_skills_single_batch(self, mock_model, mock_get_db, mock_backend,
+                                      mock_execute_values, client):
+        """Test bulk skills are encoded in one batch and inserted in one statement"""
+        mock_get_db.return_value = MagicMock()
+        mock_model.encode.return_value = np.ones((2, 384), dtype=np.float32)
+        # "SQL" already exists, so ON CONFLICT skips it and only Python comes back
+        mock_execute_values.return_value = [(11, "Python")]
+
+        response = client.post('/api/skills/bulk',
+                             data=json.dumps({"items": ["Python", "SQL", "Python", ""]}),
+                             content_type='application/json')
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert [r['status'] for r in data['results']] == ['created', 'duplicate', 'duplicate', 'invalid']
+        assert data['results'][0]['id'] == 11
+        assert (data['created'], data['duplicate'], data['invalid']) == (1, 2, 1)
+
+        mock_model.encode.assert_called_once()
+        assert mock_model.encode.call_args[0][0] == ["Python", "SQL"]
+        mock_execute_values.assert_called_once()
+        sql = mock_execute_values.call_args[0][1]
+        assert "ON CONFLICT (skill_text) DO NOTHING" in sql
+        assert len(mock_execute_values.call_args[0][2]) == 2
+
+    @patch('app.execute_values')
+    @patch('app.embedding_store.column_backend', return_value='bytea')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_bulk_accomplishments_rejects_unknown_work_experience(self, mock_model, mock_get_db,
+                                                                  mock_backend, mock_execute_values, client):
+        """Test items pointing at a missing work experience are reported, not inserted"""
+        mock_conn = MagicMock()
+        mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+        mock_cursor.fetchall.return_value = [(1,)]
+        mock_get_db.return_value = mock_conn
+        mock_model.encode.return_value = np.ones((1, 384), dtype=np.float32)
+        mock_execute_values.return_value = [(3, "Led team")]
+
+        items = [
+            {"accomplishment_text": "Led team", "work_experience_id": 1},
+            {"accomplishment_text": "Cut costs", "work_experience_id": 99},
+        ]
+        response = client.post('/api/accomplishments/bulk',
+                             data=json.dumps({"items": items}),
+                             content_type='application/json')
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['results'][0] == {"index": 0, "text": "Led team", "status": "created", "id": 3}
+        assert data['results'][1]['status'] == 'invalid'
+        assert mock_execute_values.call_args[0][2][0][2] == 1
+
+    def test_bulk_requires_items_list(self, client):
+        """Test a body without an items list is rejected"""
+        response = client.post('/api/skills/bulk',
+                             data=json.dumps({"skill_text": "Python"}),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
+
 class TestMatchEndpoint:
     """Tests for /api/match endpoint"""
 
@@ -206,6 +301,135 @@ class TestMatchEndpoint:
         assert 'relevant_skills' in data
         assert 'relevant_accomplishments' in data
 
+    @patch('app.analyze_job_description_with_llm')
+    @patch('app.embedding_index.load')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_match_ranks_by_embedding_similarity(self, mock_model, mock_get_db, mock_load,
+                                                 mock_llm, client, sample_job_description):
+        """Test POST /api/match ranks items by cosine similarity without calling the LLM"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.side_effect = [
+            ([1, 2], ["Python", "Figma"], np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)),
+            ([5], ["Built scalable apps"], np.array([[0.8, 0.6]], dtype=np.float32)),
+        ]
+        mock_model.encode.return_value = np.array([1.0, 0.0], dtype=np.float32)
+
+        response = client.post('/api/match',
+                             data=json.dumps({"job_description": sample_job_description, "top_k": 2}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [item['id'] for item in data['suggestions']] == ['skill-1', 'accomplishment-5']
+        assert data['suggestions'][0]['score'] == pytest.approx(1.0)
+        assert data['suggestions'][1]['score'] == pytest.approx(0.8)
+        mock_llm.assert_not_called()
+
+    @patch('app.analyze_job_description_with_llm')
+    @patch('app.embedding_index.load')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_match_sends_only_shortlist_to_llm(self, mock_model, mock_get_db, mock_load,
+                                               mock_llm, client, sample_job_description):
+        """Test use_llm passes only the top-k shortlist to the LLM and keeps similarity scores"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.side_effect = [
+            ([1, 2], ["Python", "Figma"], np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)),
+            ([5], ["Built scalable apps"], np.array([[0.8, 0.6]], dtype=np.float32)),
+        ]
+        mock_model.encode.return_value = np.array([1.0, 0.0], dtype=np.float32)
+        mock_llm.return_value = {"suggestions": ["Built scalable apps"], "missing_keywords": []}
+
+        response = client.post('/api/match',
+                             data=json.dumps({"job_description": sample_job_description, "top_k": 2,
+                                              "use_llm": True, "model_name": "test-model"}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        shortlist = mock_llm.call_args[0][1]
+        assert shortlist == {"skills": ["Python"], "accomplishments": ["Built scalable apps"]}
+        data = json.loads(response.data)
+        assert data['suggestions'] == [
+            {"id": "accomplishment-5", "text": "Built scalable apps", "type": "accomplishment",
+             "score": pytest.approx(0.8)}
+        ]
+
+    @patch('app.stream_job_description_analysis')
+    @patch('app.embedding_index.load')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_match_streams_progressive_events(self, mock_model, mock_get_db, mock_load,
+                                              mock_stream, client, sample_job_description):
+        """Test stream=True sends the ranking first, then each LLM pick, then the final result"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.side_effect = [
+            ([1, 2], ["Python", "Figma"], np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)),
+            ([5], ["Built scalable apps"], np.array([[0.8, 0.6]], dtype=np.float32)),
+        ]
+        mock_model.encode.return_value = np.array([1.0, 0.0], dtype=np.float32)
+        mock_stream.return_value = iter(["Built scalable apps", "Not in the shortlist"])
+
+        response = client.post('/api/match',
+                             data=json.dumps({"job_description": sample_job_description, "top_k": 2,
+                                              "use_llm": True, "model_name": "test-model", "stream": True}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = parse_sse(response.data)
+        assert [name for name, _ in events] == ['suggestions', 'missing_keywords', 'suggestion', 'done']
+        assert [item['id'] for item in events[0][1]['suggestions']] == ['skill-1', 'accomplishment-5']
+        assert events[2][1]['id'] == 'accomplishment-5'
+        assert [item['id'] for item in events[3][1]['suggestions']] == ['accomplishment-5']
+
+    @patch('app.stream_job_description_analysis')
+    @patch('app.embedding_index.load')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_match_stream_keeps_ranking_on_llm_error(self, mock_model, mock_get_db, mock_load,
+                                                     mock_stream, client, sample_job_description):
+        """Test a failing LLM stream falls back to the semantic ranking"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.side_effect = [
+            ([1], ["Python"], np.array([[1.0, 0.0]], dtype=np.float32)),
+            ([], [], np.empty((0, 2), dtype=np.float32)),
+        ]
+        mock_model.encode.return_value = np.array([1.0, 0.0], dtype=np.float32)
+        mock_stream.side_effect = requests.exceptions.ConnectionError("down")
+
+        response = client.post('/api/match',
+                             data=json.dumps({"job_description": sample_job_description,
+                                              "use_llm": True, "model_name": "test-model", "stream": True}),
+                             content_type='application/json')
+
+        events = parse_sse(response.data)
+        assert [name for name, _ in events] == ['suggestions', 'missing_keywords', 'llm_error', 'done']
+        assert events[-1][1]['suggestions'][0]['id'] == 'skill-1'
+        assert 'llm_error' in events[-1][1]
+
+    @patch('app.embedding_index.load')
+    @patch('app.get_db_connection')
+    @patch('app.model')
+    def test_match_by_jd_id_reuses_embedding(self, mock_model, mock_get_db, mock_load,
+                                             client, sample_job_description):
+        """Test a follow-up match by jd_id ranks without embedding the job description again"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.return_value = ([1], ["Python"], np.array([[1.0, 0.0]], dtype=np.float32))
+        mock_model.encode.return_value = np.array([1.0, 0.0], dtype=np.float32)
+
+        first = client.post('/api/match',
+                          data=json.dumps({"job_description": sample_job_description}),
+                          content_type='application/json')
+        jd_id = json.loads(first.data)['jd_id']
+        second = client.post('/api/match',
+                           data=json.dumps({"jd_id": jd_id}),
+                           content_type='application/json')
+
+        assert second.status_code == 200
+        assert json.loads(second.data)['suggestions'] == json.loads(first.data)['suggestions']
+        mock_model.encode.assert_called_once()
+
     def test_match_missing_job_description(self, client):
         """Test /api/match with missing job description"""
         match_data = {"limit": 10}
@@ -222,15 +446,10 @@ class TestMatchEndpoint:
 class TestScoringEndpoint:
     """Tests for /calculate-score endpoint"""
 
-    @patch('app.calculate_weighted_match_score')
+    @patch('app.score_match')
     def test_calculate_score_success(self, mock_score_func, client):
         """Test POST /calculate-score returns score successfully"""
-        mock_score_func.return_value = json.dumps({
-            "overallScore": 85,
-            "breakdown": {
-                "hard_skills": {"score": 90, "weight": 50, "contribution": 45}
-            }
-        })
+        mock_score_func.return_value = match_score(85)
 
         score_data = {
             "resumeText": "Python developer with 5 years experience",
@@ -245,6 +464,147 @@ class TestScoringEndpoint:
         data = json.loads(response.data)
         assert data['overallScore'] == 85
 
+    @patch('app.score_match')
+    def test_calculate_score_semantic_mode(self, mock_score_func, client):
+        """Test mode=semantic passes the sentence encoder to the scorer"""
+        mock_score_func.return_value = match_score(70, mode="semantic", requirements=[])
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({
+                                 "resumeText": "Python developer",
+                                 "jobDescriptionText": "Python role",
+                                 "mode": "semantic"
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['mode'] == 'semantic'
+        kwargs = mock_score_func.call_args.kwargs
+        assert kwargs['mode'] == 'semantic'
+        assert kwargs['encoder'] is not None
+
+    @patch('app.score_match')
+    def test_calculate_score_explain(self, mock_score_func, client):
+        """Test explain=true asks the scorer for keyword evidence and returns it"""
+        evidence = {"hard_skills": {"matched": [{"keyword": "python", "weight": 1.0, "offsets": [[0, 6]]}],
+                                    "missing": []}}
+        mock_score_func.return_value = match_score(85, evidence=evidence)
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({
+                                 "resumeText": "Python developer",
+                                 "jobDescriptionText": "Python role",
+                                 "explain": True
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['evidence'] == evidence
+        assert mock_score_func.call_args.kwargs['explain'] is True
+
+    @patch('app.score_match')
+    def test_calculate_score_by_jd_id(self, mock_score_func, client):
+        """Test the returned jd_id scores against the cached job description without resending it"""
+        mock_score_func.return_value = match_score(85)
+
+        first = client.post('/calculate-score',
+                          data=json.dumps({"resumeText": "Python developer", "jobDescriptionText": "Python role"}),
+                          content_type='application/json')
+        jd_id = json.loads(first.data)['jd_id']
+        second = client.post('/calculate-score',
+                           data=json.dumps({"resumeText": "Go developer", "jd_id": jd_id}),
+                           content_type='application/json')
+
+        assert jd_id == jd_cache.make_jd_id("Python role")
+        assert second.status_code == 200
+        assert json.loads(second.data)['jd_id'] == jd_id
+        first_jd, second_jd = (call.args[1] for call in mock_score_func.call_args_list)
+        assert second_jd is first_jd
+        assert second_jd.text == "Python role"
+
+    def test_calculate_score_unknown_jd_id(self, client):
+        """Test an unknown or expired jd_id is reported as 404"""
+        response = client.post('/calculate-score',
+                             data=json.dumps({"resumeText": "Python developer", "jd_id": "missing"}),
+                             content_type='application/json')
+
+        assert response.status_code == 404
+        assert 'jd_id' in json.loads(response.data)['error']
+
+    @patch('app.score_match')
+    @patch('app.job_postings.load')
+    @patch('app.get_db_connection')
+    def test_calculate_score_by_job_id(self, mock_get_db, mock_load, mock_score_func, client):
+        """Test a saved posting's job_id scores against its precomputed features"""
+        mock_get_db.return_value = MagicMock()
+        mock_load.return_value = jd_cache.CachedJobDescription("abc", "Python role")
+        mock_score_func.return_value = match_score(85)
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({"resumeText": "Python developer", "job_id": 7}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['jd_id'] == "abc"
+        assert mock_load.call_args[0][1] == 7
+        assert mock_score_func.call_args[0][1] is mock_load.return_value
+
+    @patch('app.job_postings.load', return_value=None)
+    @patch('app.get_db_connection')
+    def test_calculate_score_unknown_job_id(self, mock_get_db, mock_load, client):
+        """Test an unknown job posting is reported as 404"""
+        mock_get_db.return_value = MagicMock()
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({"resumeText": "Python developer", "job_id": 7}),
+                             content_type='application/json')
+
+        assert response.status_code == 404
+
+    @patch('app.job_postings.load')
+    @patch('app.get_db_connection')
+    def test_calculate_score_job_id_database_error(self, mock_get_db, mock_load, client):
+        """Test a database failure while loading a posting is a JSON 503"""
+        import psycopg2
+        mock_get_db.return_value = MagicMock()
+        mock_load.side_effect = psycopg2.OperationalError("connection reset")
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({"resumeText": "Python developer", "job_id": 7}),
+                             content_type='application/json')
+
+        assert response.status_code == 503
+        assert json.loads(response.data) == {"error": "Could not load job posting"}
+
+    @patch('app.score_match')
+    @patch('app.job_postings.embedding_store.column_backend', return_value='bytea')
+    @patch('app.get_db_connection')
+    def test_calculate_score_pending_job_id_uses_text(self, mock_get_db, mock_backend, mock_score_func, client):
+        """Test a posting whose features aren't ready yet is scored from its description"""
+        cursor = mock_get_db.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = ("Python role", jd_cache.make_jd_id("Python role"), "pending",
+                                        None, None, None, None)
+        mock_score_func.return_value = match_score(85)
+
+        response = client.post('/calculate-score',
+                             data=json.dumps({"resumeText": "Python developer", "job_id": 7}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert mock_score_func.call_args[0][1].text == "Python role"
+
+    def test_calculate_score_unknown_mode(self, client):
+        """Test an unknown scoring mode is rejected"""
+        response = client.post('/calculate-score',
+                             data=json.dumps({
+                                 "resumeText": "Python developer",
+                                 "jobDescriptionText": "Python role",
+                                 "mode": "fuzzy"
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
     def test_calculate_score_missing_data(self, client):
         """Test /calculate-score with missing required data"""
         score_data = {"resumeText": "Python developer"}
@@ -256,6 +616,152 @@ class TestScoringEndpoint:
         assert response.status_code == 400
 
 
+class TestBatchScoringEndpoint:
+    """Tests for /calculate-score/batch endpoint"""
+
+    @patch('app.calculate_batch_match_scores')
+    def test_one_resume_many_job_descriptions(self, mock_batch, client):
+        """Test POST /calculate-score/batch scores one resume against every job description"""
+        mock_batch.return_value = [match_score(85), match_score(10)]
+
+        response = client.post('/calculate-score/batch',
+                             data=json.dumps({
+                                 "resumeText": "Python developer",
+                                 "jobDescriptionTexts": ["Python role", "Sales role"]
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['overallScore'] for r in data['results']] == [85, 10]
+        args, kwargs = mock_batch.call_args
+        assert args == (["Python developer"], ["Python role", "Sales role"])
+        assert kwargs == {}
+
+    @patch('app.calculate_batch_match_scores')
+    def test_one_job_description_many_resumes(self, mock_batch, client):
+        """Test the reverse direction passes the resumes as the batch"""
+        mock_batch.return_value = [match_score(50)] * 2
+
+        response = client.post('/calculate-score/batch',
+                             data=json.dumps({
+                                 "jobDescriptionText": "Python role",
+                                 "resumeTexts": ["Resume A", "Resume B"],
+                                 "parallel": True
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        args, kwargs = mock_batch.call_args
+        assert args[0] == ["Resume A", "Resume B"]
+        assert [profile.text for profile in args[1]] == ["Python role"]
+        assert json.loads(response.data)['jd_id'] == jd_cache.make_jd_id("Python role")
+        # A client can't make the web worker fork a process pool.
+        assert kwargs == {}
+
+    @patch('app.calculate_batch_match_scores')
+    def test_many_resumes_by_jd_id(self, mock_batch, client):
+        """Test the single job description can be the cached profile behind a jd_id"""
+        mock_batch.return_value = [match_score(50)]
+        profile = jd_cache.cache.add("Python role")
+
+        response = client.post('/calculate-score/batch',
+                             data=json.dumps({"jd_id": profile.jd_id, "resumeTexts": ["Resume A"]}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert mock_batch.call_args[0][1] == [profile]
+
+    def test_unknown_jd_id(self, client):
+        """Test an unknown or expired jd_id is reported as 404"""
+        response = client.post('/calculate-score/batch',
+                             data=json.dumps({"jd_id": "missing", "resumeTexts": ["Resume A"]}),
+                             content_type='application/json')
+
+        assert response.status_code == 404
+
+    def test_rejects_ambiguous_input(self, client):
+        """Test a request must name exactly one single side and one batch side"""
+        response = client.post('/calculate-score/batch',
+                             data=json.dumps({
+                                 "resumeTexts": ["Resume A"],
+                                 "jobDescriptionTexts": ["Python role"]
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
+    def test_rejects_oversized_batch(self, client):
+        """Test batches above SCORE_BATCH_MAX are refused with 413"""
+        with patch('app.SCORE_BATCH_MAX', 2):
+            response = client.post('/calculate-score/batch',
+                                 data=json.dumps({
+                                     "resumeText": "Python developer",
+                                     "jobDescriptionTexts": ["a", "b", "c"]
+                                 }),
+                                 content_type='application/json')
+
+        assert response.status_code == 413
+
+
+class TestJobPostingEndpoints:
+    """Tests for /api/job-postings endpoints"""
+
+    SUMMARY = {"id": 7, "title": "SRE", "company": None, "jd_id": "abc", "status": "pending",
+               "created_at": None, "features_updated_at": None}
+
+    @patch('app.job_queue.jobs')
+    @patch('app.job_postings.create')
+    @patch('app.get_db_connection')
+    def test_create_queues_precompute(self, mock_get_db, mock_create, mock_jobs, client):
+        """Test a new posting is saved and its features are queued for background precompute"""
+        mock_get_db.return_value = MagicMock()
+        mock_create.return_value = (dict(self.SUMMARY), True)
+        mock_jobs.submit.return_value = "job123"
+
+        response = client.post('/api/job-postings',
+                             data=json.dumps({"title": "SRE", "description": "<script>x</script>Python role"}),
+                             content_type='application/json')
+
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['id'] == 7
+        assert data['features_status_url'] == "/api/jobs/job123"
+        assert mock_create.call_args[0][1] == "&lt;script&gt;x&lt;/script&gt;Python role"
+        assert mock_jobs.submit.call_args[0][:3] == ('job-posting', job_postings.precompute, 7)
+
+    @patch('app.job_queue.jobs')
+    @patch('app.job_postings.create')
+    @patch('app.get_db_connection')
+    def test_existing_posting_is_not_recomputed(self, mock_get_db, mock_create, mock_jobs, client):
+        """Test saving a known description returns it without queueing work"""
+        mock_get_db.return_value = MagicMock()
+        mock_create.return_value = (dict(self.SUMMARY, status="ready"), False)
+
+        response = client.post('/api/job-postings',
+                             data=json.dumps({"description": "Python role"}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        mock_jobs.submit.assert_not_called()
+
+    def test_create_requires_description(self, client):
+        """Test a posting without a description is rejected"""
+        response = client.post('/api/job-postings',
+                             data=json.dumps({"title": "SRE"}),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
+    @patch('app.job_postings.get', return_value=None)
+    @patch('app.get_db_connection')
+    def test_unknown_posting_is_404(self, mock_get_db, mock_get, client):
+        """Test GET of a missing posting returns 404"""
+        mock_get_db.return_value = MagicMock()
+
+        assert client.get('/api/job-postings/99').status_code == 404
+
+
 class TestImproveBulletEndpoint:
     """Tests for /improve-bullet endpoint"""
 
@@ -279,6 +785,46 @@ class TestImproveBulletEndpoint:
         assert 'improved_bullet' in data
         assert "Engineered" in data['improved_bullet']
 
+    @patch('app.stream_improved_bullet')
+    def test_improve_bullet_streams_tokens(self, mock_stream, client):
+        """Test stream=True relays tokens as server-sent events"""
+        mock_stream.return_value = iter(["Engineered", " scalable", " apps"])
+
+        bullet_data = {
+            "bulletPoint": "Worked on Python apps",
+            "jobTitle": "Software Engineer",
+            "industry": "Technology",
+            "jobDescription": "Python developer",
+            "stream": True
+        }
+
+        response = client.post('/improve-bullet',
+                             data=json.dumps(bullet_data),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = parse_sse(response.data)
+        assert [data['text'] for name, data in events if name == 'token'] == ["Engineered", " scalable", " apps"]
+        assert events[-1] == ('done', {"improved_bullet": "Engineered scalable apps",
+                                       "model_used": "default", "llm_mode": "production",
+                                       "jd_id": jd_cache.make_jd_id("Python developer")})
+
+    @patch('app.improve_resume_bullet')
+    def test_improve_bullet_busy_llm_returns_503(self, mock_improve_func, client):
+        """Test a full LLM queue is reported as 503 with Retry-After"""
+        from llm_integration import LLMBusyError
+        mock_improve_func.side_effect = LLMBusyError()
+
+        response = client.post('/improve-bullet',
+                             data=json.dumps({"bulletPoint": "Worked on apps", "jobTitle": "SE",
+                                              "industry": "Tech", "jobDescription": "JD"}),
+                             content_type='application/json')
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+        assert 'busy' in json.loads(response.data)['error']
+
     def test_improve_bullet_missing_data(self, client):
         """Test /improve-bullet with missing required data"""
         bullet_data = {"bulletPoint": "Worked on apps"}
@@ -290,6 +836,157 @@ class TestImproveBulletEndpoint:
         assert response.status_code == 400
 
 
+class TestImproveBulletsEndpoint:
+    """Tests for /improve-bullets endpoint"""
+
+    @patch('app.improve_resume_bullets')
+    def test_improve_bullets_success(self, mock_improve, client):
+        """Test POST /improve-bullets returns one result per bullet, in order"""
+        mock_improve.return_value = ["Engineered Python apps", "Led a team of 5"]
+
+        response = client.post('/improve-bullets',
+                             data=json.dumps({
+                                 "bulletPoints": ["Worked on Python apps", "Managed people"],
+                                 "jobTitle": "Software Engineer",
+                                 "industry": "Technology",
+                                 "jobDescription": "Python developer"
+                             }),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['results'] == [
+            {"bulletPoint": "Worked on Python apps", "improved_bullet": "Engineered Python apps"},
+            {"bulletPoint": "Managed people", "improved_bullet": "Led a team of 5"},
+        ]
+        assert data['jd_id'] == jd_cache.make_jd_id("Python developer")
+        mock_improve.assert_called_once()
+
+    @patch('app.improve_resume_bullets')
+    def test_improve_bullets_by_jd_id(self, mock_improve, client):
+        """Test a jd_id from an earlier response stands in for the job description text"""
+        mock_improve.return_value = ["Engineered Python apps"]
+        jd_id = jd_cache.cache.add("Python developer").jd_id
+
+        response = client.post('/improve-bullets',
+                             data=json.dumps({"bulletPoints": ["Worked on Python apps"], "jobTitle": "SE",
+                                              "industry": "Tech", "jd_id": jd_id}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['jd_id'] == jd_id
+        assert mock_improve.call_args[0][3] == "Python developer"
+
+    @patch('app.improve_resume_bullets')
+    def test_improve_bullets_regenerate(self, mock_improve, client):
+        """Test regenerate is passed through so the cached rewrites are skipped"""
+        mock_improve.return_value = ["Engineered Python apps"]
+
+        client.post('/improve-bullets',
+                    data=json.dumps({"bulletPoints": ["Worked on Python apps"], "jobTitle": "SE",
+                                     "industry": "Tech", "jobDescription": "JD", "regenerate": True}),
+                    content_type='application/json')
+
+        assert mock_improve.call_args[1]['regenerate'] is True
+
+    def test_improve_bullets_unknown_jd_id(self, client):
+        """Test an unknown or expired jd_id is reported as 404"""
+        response = client.post('/improve-bullets',
+                             data=json.dumps({"bulletPoints": ["a"], "jobTitle": "SE",
+                                              "industry": "Tech", "jd_id": "missing"}),
+                             content_type='application/json')
+
+        assert response.status_code == 404
+
+    def test_improve_bullets_requires_list(self, client):
+        """Test /improve-bullets rejects a missing or empty bullet list"""
+        response = client.post('/improve-bullets',
+                             data=json.dumps({"bulletPoints": [], "jobTitle": "SE",
+                                              "industry": "Tech", "jobDescription": "JD"}),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
+    @patch('app.IMPROVE_BULLETS_MAX', 2)
+    def test_improve_bullets_too_many(self, client):
+        """Test /improve-bullets rejects requests over the bullet limit"""
+        response = client.post('/improve-bullets',
+                             data=json.dumps({"bulletPoints": ["a", "b", "c"], "jobTitle": "SE",
+                                              "industry": "Tech", "jobDescription": "JD"}),
+                             content_type='application/json')
+
+        assert response.status_code == 413
+
+
+class TestBackgroundJobEndpoints:
+    """Tests for async submission and the /api/jobs endpoints"""
+
+    @pytest.fixture
+    def queue(self):
+        import job_queue
+        queue = job_queue.JobQueue(job_queue.MemoryJobStore(), job_queue.DEFAULT_CONCURRENCY)
+        with patch('app.job_queue.jobs', queue):
+            yield queue
+
+    @patch('app.improve_resume_bullet')
+    def test_async_improve_bullet_returns_job(self, mock_improve, queue, client):
+        """Test async=True answers 202 with a job id whose result matches the sync response"""
+        mock_improve.return_value = "Engineered Python apps"
+
+        response = client.post('/improve-bullet',
+                             data=json.dumps({"bulletPoint": "Worked on Python apps", "jobTitle": "SE",
+                                              "industry": "Tech", "jobDescription": "JD", "async": True}),
+                             content_type='application/json')
+
+        assert response.status_code == 202
+        job_id = json.loads(response.data)['job_id']
+        events = parse_sse(client.get(f'/api/jobs/{job_id}/events').data)
+        assert events[-1][0] == 'done'
+
+        data = json.loads(client.get(f'/api/jobs/{job_id}').data)
+        assert data['status'] == 'succeeded'
+        assert data['type'] == 'improve-bullet'
+        assert data['result']['improved_bullet'] == "Engineered Python apps"
+
+    @patch('app.requests.post')
+    @patch('app.get_db_connection')
+    def test_async_pdf_export_is_downloadable(self, mock_get_db, mock_post, queue, client):
+        """Test an export-pdf job exposes the PDF through its result URL"""
+        mock_conn = MagicMock()
+        mock_get_db.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value.fetchall.return_value = []
+        mock_post.return_value = Mock(content=b'%PDF-1.4 test')
+
+        response = client.post('/api/export-pdf',
+                             data=json.dumps({"name": "Jane", "async": True}),
+                             content_type='application/json')
+
+        assert response.status_code == 202
+        job_id = json.loads(response.data)['job_id']
+        parse_sse(client.get(f'/api/jobs/{job_id}/events').data)
+        data = json.loads(client.get(f'/api/jobs/{job_id}').data)
+        assert data['result'] == {"download_url": f"/api/jobs/{job_id}/result"}
+
+        download = client.get(data['result']['download_url'])
+        assert download.status_code == 200
+        assert download.mimetype == 'application/pdf'
+        assert download.data == b'%PDF-1.4 test'
+
+    def test_unknown_job_is_404(self, queue, client):
+        """Test an unknown job id returns 404"""
+        assert client.get('/api/jobs/does-not-exist').status_code == 404
+        assert client.get('/api/jobs/does-not-exist/events').status_code == 404
+
+    def test_store_errors_are_json(self, client):
+        """Test a failing job store gives a JSON 500 on every job endpoint"""
+        with patch('app.job_queue.jobs') as mock_jobs:
+            mock_jobs.get.side_effect = Exception("database is down")
+            for url in ('/api/jobs/abc', '/api/jobs/abc/result', '/api/jobs/abc/events'):
+                response = client.get(url)
+                assert response.status_code == 500
+                assert json.loads(response.data) == {"error": "Could not read job status"}
+
+
 class TestCheckDuplicatesEndpoint:
     """Tests for /check-duplicates endpoint"""
 
@@ -321,6 +1018,31 @@ class TestCheckDuplicatesEndpoint:
         assert 'duplicates' in data
         assert len(data['duplicates']) == 1
 
+    @patch('app.find_duplicate_entries', return_value=[])
+    def test_check_duplicates_options(self, mock_duplicates_func, client):
+        """Test the threshold and LLM confirmation options reach the detector with the encoder"""
+        response = client.post('/check-duplicates',
+                             data=json.dumps({"bulletPoints": ["a b", "c d"], "threshold": 90,
+                                              "confirmWithLlm": True, "modelName": "test-model"}),
+                             content_type='application/json')
+
+        assert response.status_code == 200
+        assert json.loads(response.data)['threshold'] == 90
+        kwargs = mock_duplicates_func.call_args.kwargs
+        assert kwargs['threshold'] == 90
+        assert kwargs['confirm_with_llm'] is True
+        assert kwargs['model_name'] == "test-model"
+        assert kwargs['encoder'] is not None
+
+    @pytest.mark.parametrize("threshold", [150, "high"])
+    def test_check_duplicates_invalid_threshold(self, threshold, client):
+        """Test thresholds outside 0-100 or not numeric are rejected"""
+        response = client.post('/check-duplicates',
+                             data=json.dumps({"bulletPoints": ["a b", "c d"], "threshold": threshold}),
+                             content_type='application/json')
+
+        assert response.status_code == 400
+
 
 class TestATSResumeEndpoint:
     """Tests for /generate-ats-resume endpoint"""
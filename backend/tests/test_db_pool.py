@@ -0,0 +1,145 @@
+"""
+Tests for the PostgreSQL connection pool in db_pool.py
+"""
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock, Mock, patch
+import psycopg2
+import psycopg2.extensions
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from db_pool import ConnectionPool, PoolTimeout, get_pool, reset_pool
+
+
+def _mock_conn():
+    conn = Mock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    return conn
+
+
+class TestConnectionPool:
+    """Tests for ConnectionPool checkout/return behaviour"""
+
+    @patch('db_pool.psycopg2.connect')
+    def test_connection_is_reused_after_return(self, mock_connect):
+        """Test a returned connection is handed out again instead of reconnecting"""
+        mock_connect.side_effect = lambda **kwargs: _mock_conn()
+        pool = ConnectionPool({"host": "postgres"}, maxconn=2)
+
+        first = pool.getconn()
+        pool.putconn(first)
+        second = pool.getconn()
+
+        assert first is second
+        assert mock_connect.call_count == 1
+        assert pool.stats()["checkouts"] == 2
+
+    @patch('db_pool.psycopg2.connect')
+    def test_pool_is_bounded_and_times_out(self, mock_connect):
+        """Test checkout blocks at maxconn and raises PoolTimeout after the wait"""
+        mock_connect.side_effect = lambda **kwargs: _mock_conn()
+        pool = ConnectionPool({"host": "postgres"}, maxconn=1, timeout=0.05)
+
+        pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+
+        stats = pool.stats()
+        assert stats["in_use"] == 1
+        assert stats["timeouts"] == 1
+        assert mock_connect.call_count == 1
+
+    @patch('db_pool.psycopg2.connect')
+    def test_waiting_caller_gets_returned_connection(self, mock_connect):
+        """Test a blocked checkout succeeds once another thread returns its connection"""
+        mock_connect.side_effect = lambda **kwargs: _mock_conn()
+        pool = ConnectionPool({"host": "postgres"}, maxconn=1, timeout=2)
+        held = pool.getconn()
+
+        timer = threading.Timer(0.05, pool.putconn, args=(held,))
+        timer.start()
+        conn = pool.getconn()
+        timer.join()
+
+        assert conn is held
+        assert pool.stats()["max_wait_ms"] > 0
+
+    @patch('db_pool.psycopg2.connect')
+    def test_open_transaction_is_rolled_back_on_return(self, mock_connect):
+        """Test a connection returned mid-transaction is rolled back before reuse"""
+        conn = _mock_conn()
+        conn.get_transaction_status.return_value = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+        mock_connect.return_value = conn
+        pool = ConnectionPool({"host": "postgres"}, maxconn=1)
+
+        pool.putconn(pool.getconn())
+
+        conn.rollback.assert_called_once()
+        assert pool.stats()["idle"] == 1
+
+    @patch('db_pool.psycopg2.connect')
+    def test_stale_connection_fails_health_check(self, mock_connect):
+        """Test an idle connection that fails SELECT 1 is replaced with a new one"""
+        dead, fresh = _mock_conn(), _mock_conn()
+        dead.cursor.side_effect = psycopg2.OperationalError("server closed the connection")
+        mock_connect.side_effect = [dead, fresh]
+        pool = ConnectionPool({"host": "postgres"}, maxconn=1, healthcheck_interval=0)
+
+        pool.putconn(pool.getconn())
+        conn = pool.getconn()
+
+        assert conn is fresh
+        dead.close.assert_called_once()
+        assert pool.stats()["healthcheck_failures"] == 1
+
+    @patch('db_pool.psycopg2.connect')
+    def test_health_check_runs_outside_lock(self, mock_connect):
+        """Test other threads can use the pool while an idle connection is being pinged"""
+        conn = _mock_conn()
+        mock_connect.return_value = conn
+        pool = ConnectionPool({"host": "postgres"}, maxconn=2, healthcheck_interval=0)
+        pool.putconn(pool.getconn())
+        stats_during_ping = []
+
+        def ping(sql):
+            thread = threading.Thread(target=lambda: stats_during_ping.append(pool.stats()))
+            thread.start()
+            thread.join(timeout=1)
+
+        cursor = MagicMock()
+        cursor.__enter__.return_value.execute.side_effect = ping
+        conn.cursor.return_value = cursor
+
+        assert pool.getconn() is conn
+        assert len(stats_during_ping) == 1
+        # The connection being checked is reserved, so it can't be handed out twice.
+        assert stats_during_ping[0]["in_use"] == 1
+        assert stats_during_ping[0]["idle"] == 0
+
+    @patch('db_pool.psycopg2.connect')
+    def test_failed_connect_releases_slot(self, mock_connect):
+        """Test a connection error does not permanently consume pool capacity"""
+        mock_connect.side_effect = [psycopg2.OperationalError("refused"), _mock_conn()]
+        pool = ConnectionPool({"host": "postgres"}, maxconn=1, timeout=0.05)
+
+        with pytest.raises(psycopg2.OperationalError):
+            pool.getconn()
+
+        assert pool.getconn() is not None
+
+
+class TestProcessPool:
+    """Tests for the process-wide pool accessor"""
+
+    def test_get_pool_returns_singleton(self):
+        """Test get_pool returns the same pool until it is reset"""
+        pool = get_pool()
+        assert get_pool() is pool
+        reset_pool()
+        assert get_pool() is not pool
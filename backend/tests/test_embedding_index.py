@@ -0,0 +1,113 @@
+"""
+Tests for the in-memory embedding index in embedding_index.py
+"""
+import pytest
+from unittest.mock import Mock, patch
+import numpy as np
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from embedding_index import EmbeddingIndex
+
+
+def _loaded_index(ids, texts, rows, stamp=None):
+    """Build an index whose first sync loads the given rows."""
+    index = EmbeddingIndex("skills", "skill_text", dim=2)
+    cursor = Mock()
+    cursor.fetchone.return_value = stamp or (len(ids), max(ids, default=0))
+    matrix = np.array(rows, dtype=np.float32).reshape(len(ids), 2)
+    with patch('embedding_index.semantic_search.load_table_embeddings',
+               return_value=(ids, texts, matrix)):
+        index.sync(cursor)
+    return index, cursor
+
+
+class TestEmbeddingIndexLoading:
+    """Tests for lazy loading and freshness checks"""
+
+    def test_first_sync_is_a_miss_then_hits(self):
+        """Test the index is built once and later syncs are served from memory"""
+        index, cursor = _loaded_index([1, 2], ["Python", "SQL"], [[1, 0], [0, 1]])
+
+        with patch('embedding_index.semantic_search.load_table_embeddings') as mock_load:
+            index.sync(cursor)
+            index.sync(cursor)
+            mock_load.assert_not_called()
+
+        stats = index.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+        assert stats["rebuilds"] == 1
+        assert stats["rows"] == 2
+
+    def test_external_change_triggers_rebuild(self):
+        """Test a changed (count, max id) stamp from another process forces a reload"""
+        index, cursor = _loaded_index([1], ["Python"], [[1, 0]])
+        cursor.fetchone.return_value = (2, 9)
+
+        with patch('embedding_index.semantic_search.load_table_embeddings',
+                   return_value=([1, 9], ["Python", "Go"], np.eye(2, dtype=np.float32))):
+            index.sync(cursor)
+
+        ids, texts, _ = index.snapshot()
+        assert ids == [1, 9]
+        assert index.stats()["rebuilds"] == 2
+
+
+class TestEmbeddingIndexWriteThrough:
+    """Tests for incremental append/tombstone updates"""
+
+    def test_append_is_visible_without_rebuild(self):
+        """Test an inserted row is appended and keeps the index in sync with its own write"""
+        index, cursor = _loaded_index([1], ["Python"], [[1, 0]])
+
+        index.append(5, "Docker", [0, 3])
+        cursor.fetchone.return_value = (2, 5)
+        index.sync(cursor)
+
+        ids, texts, matrix = index.snapshot()
+        assert ids == [1, 5]
+        assert texts == ["Python", "Docker"]
+        np.testing.assert_allclose(matrix[1], [0, 1])
+        assert index.stats()["rebuilds"] == 1
+
+    def test_remove_tombstones_then_compacts(self):
+        """Test a deleted row disappears from the next snapshot"""
+        index, cursor = _loaded_index([1, 2, 3], ["a", "b", "c"], [[1, 0], [0, 1], [1, 1]])
+
+        index.remove(2)
+        ids, texts, matrix = index.snapshot()
+
+        assert ids == [1, 3]
+        assert texts == ["a", "c"]
+        assert matrix.shape == (2, 2)
+        assert index.stats()["compactions"] == 1
+
+    def test_append_before_load_is_ignored(self):
+        """Test writes before the first sync do nothing (the load will include them)"""
+        index = EmbeddingIndex("skills", "skill_text", dim=2)
+        index.append(1, "Python", [1, 0])
+        assert index.stats()["appends"] == 0
+
+    def test_growth_preserves_rows(self):
+        """Test appending past capacity keeps existing rows intact"""
+        index, _ = _loaded_index([1], ["r1"], [[1, 0]])
+        for item_id in range(2, 200):
+            index.append(item_id, f"r{item_id}", [1, 0])
+
+        ids, _, matrix = index.snapshot()
+        assert len(ids) == 199
+        assert matrix.flags['C_CONTIGUOUS']
+
+    def test_snapshot_survives_later_compaction(self):
+        """Test a snapshot taken before a delete is not mutated by compaction"""
+        index, _ = _loaded_index([1, 2], ["a", "b"], [[1, 0], [0, 1]])
+        _, _, before = index.snapshot()
+
+        index.remove(1)
+        index.snapshot()
+
+        np.testing.assert_allclose(before, [[1, 0], [0, 1]])
@@ -0,0 +1,161 @@
+"""
+Tests for embedding storage helpers in embedding_store.py
+"""
+import pytest
+import json
+import struct
+from unittest.mock import Mock, patch
+import numpy as np
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import embedding_store
+from embedding_store import (
+    to_db_value,
+    from_db_value,
+    stack_db_values,
+    select_expr,
+    column_backend,
+    migrate_text_columns,
+    BACKEND_BYTEA,
+    BACKEND_PGVECTOR,
+    BACKEND_TEXT,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_backend_cache():
+    embedding_store.reset_backend_cache()
+    yield
+    embedding_store.reset_backend_cache()
+
+
+class TestEncodeDecode:
+    """Tests for converting embeddings to and from database values"""
+
+    def test_bytea_round_trip_is_float32(self):
+        """Test BYTEA storage is 4 bytes per dimension and decodes losslessly"""
+        vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+
+        stored = bytes(to_db_value(vector, BACKEND_BYTEA).adapted)
+        decoded = from_db_value(memoryview(stored), BACKEND_BYTEA)
+
+        assert len(stored) == 384 * 4
+        assert decoded.dtype == np.float32
+        np.testing.assert_array_equal(decoded, vector)
+
+    def test_bytea_decode_is_zero_copy(self):
+        """Test decoding a BYTEA buffer returns a view instead of a copy"""
+        buffer = np.arange(4, dtype='<f4').tobytes()
+        view = memoryview(buffer)
+
+        decoded = from_db_value(view, BACKEND_BYTEA)
+
+        assert np.shares_memory(decoded, np.frombuffer(view, dtype='<f4'))
+
+    def test_pgvector_value_is_array_literal(self):
+        """Test pgvector values are sent as '[x,y,...]' text literals"""
+        assert to_db_value([0.5, -1.0], BACKEND_PGVECTOR) == "[0.5,-1.0]"
+
+    def test_pgvector_decode_from_send_format(self):
+        """Test decoding vector_send() output (header + big-endian float4)"""
+        raw = struct.pack('>HH', 3, 0) + struct.pack('>3f', 1.0, 2.5, -3.0)
+
+        decoded = from_db_value(memoryview(raw), BACKEND_PGVECTOR)
+
+        np.testing.assert_array_equal(decoded, np.array([1.0, 2.5, -3.0], dtype=np.float32))
+
+    def test_legacy_text_decode(self):
+        """Test JSON text embeddings from before the migration still decode"""
+        decoded = from_db_value("[0.1, 0.2, 0.3]", BACKEND_TEXT)
+        np.testing.assert_allclose(decoded, [0.1, 0.2, 0.3], rtol=1e-6)
+
+    def test_none_decodes_to_none(self):
+        """Test a NULL embedding decodes to None"""
+        assert from_db_value(None, BACKEND_BYTEA) is None
+
+    def test_stack_bytea_values(self):
+        """Test stacking many BYTEA values yields a contiguous (n, dim) matrix"""
+        rows = [np.full(4, i, dtype='<f4').tobytes() for i in range(3)]
+
+        matrix = stack_db_values([memoryview(r) for r in rows], BACKEND_BYTEA, dim=4)
+
+        assert matrix.shape == (3, 4)
+        assert matrix.flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(matrix[:, 0], [0, 1, 2])
+
+    def test_stack_empty(self):
+        """Test stacking no values yields an empty matrix with the right width"""
+        assert stack_db_values([], BACKEND_BYTEA, dim=8).shape == (0, 8)
+
+    def test_select_expr(self):
+        """Test pgvector columns are read through vector_send()"""
+        assert select_expr(BACKEND_BYTEA) == "embedding"
+        assert select_expr(BACKEND_PGVECTOR) == "vector_send(embedding)"
+
+
+class TestColumnBackend:
+    """Tests for storage type detection"""
+
+    @pytest.mark.parametrize("udt_name,expected", [
+        ("bytea", BACKEND_BYTEA),
+        ("vector", BACKEND_PGVECTOR),
+        ("text", BACKEND_TEXT),
+    ])
+    def test_column_backend_detection(self, udt_name, expected):
+        """Test the column's udt_name maps to the right backend"""
+        cursor = Mock()
+        cursor.fetchone.return_value = (udt_name,)
+
+        assert column_backend(cursor, 'skills') == expected
+
+    def test_column_backend_is_cached(self):
+        """Test the catalog is only queried once per table"""
+        cursor = Mock()
+        cursor.fetchone.return_value = ("bytea",)
+
+        column_backend(cursor, 'skills')
+        column_backend(cursor, 'skills')
+
+        assert cursor.execute.call_count == 1
+
+
+class TestMigrateTextColumns:
+    """Tests for the TEXT -> binary embedding migration"""
+
+    def test_migrate_to_pgvector_uses_single_alter(self):
+        """Test pgvector migration casts the JSON text server-side"""
+        cursor = Mock()
+        cursor.fetchone.return_value = ("text",)
+
+        migrated = migrate_text_columns(cursor, BACKEND_PGVECTOR, tables=['skills'])
+
+        assert migrated == ['skills']
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        assert any("ALTER COLUMN embedding TYPE vector(384)" in sql for sql in statements)
+
+    @patch('embedding_store.execute_values')
+    def test_migrate_to_bytea_rewrites_rows_in_bulk(self, mock_execute_values):
+        """Test BYTEA migration re-encodes every row with one bulk update"""
+        cursor = Mock()
+        cursor.fetchone.return_value = ("text",)
+        cursor.fetchall.return_value = [(1, json.dumps([0.5, 1.5])), (2, json.dumps([2.0, 3.0]))]
+
+        migrate_text_columns(cursor, BACKEND_BYTEA, tables=['skills'])
+
+        mock_execute_values.assert_called_once()
+        page = mock_execute_values.call_args[0][2]
+        assert [row_id for row_id, _ in page] == [1, 2]
+        assert bytes(page[0][1].adapted) == np.array([0.5, 1.5], dtype='<f4').tobytes()
+        statements = [c[0][0] for c in cursor.execute.call_args_list]
+        assert any("RENAME COLUMN embedding_bin TO embedding" in sql for sql in statements)
+
+    def test_migrate_skips_converted_tables(self):
+        """Test tables already stored as BYTEA are left alone"""
+        cursor = Mock()
+        cursor.fetchone.return_value = ("bytea",)
+
+        assert migrate_text_columns(cursor, BACKEND_BYTEA, tables=['skills']) == []
@@ -0,0 +1,61 @@
+"""
+Tests for the production gunicorn profile in gunicorn.conf.py
+"""
+import pytest
+import importlib.util
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+CONF_PATH = os.path.join(os.path.dirname(__file__), '..', 'gunicorn.conf.py')
+
+
+def _load_conf(env):
+    with patch.dict(os.environ, env):
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", CONF_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module, dict(os.environ)
+
+
+class TestGunicornConfig:
+    """Tests for gunicorn settings and hooks"""
+
+    def test_worker_and_thread_counts_are_configurable(self):
+        """Test GUNICORN_WORKERS / GUNICORN_THREADS drive the worker model"""
+        conf, _ = _load_conf({"GUNICORN_WORKERS": "3", "GUNICORN_THREADS": "8"})
+
+        assert conf.workers == 3
+        assert conf.threads == 8
+        assert conf.worker_class == "gthread"
+        assert conf.preload_app is True
+
+    def test_preload_disables_background_warmup(self):
+        """Test no warm-up thread is started in the master before forking"""
+        _, env = _load_conf({"MODEL_WARMUP": "background"})
+        assert env["MODEL_WARMUP"] == "lazy"
+
+    @patch('gc.freeze')
+    @patch('model_registry.warm_up')
+    def test_when_ready_loads_models_in_master(self, mock_warm_up, mock_freeze):
+        """Test models are loaded synchronously and the heap frozen before fork"""
+        conf, _ = _load_conf({"GUNICORN_PRELOAD": "1"})
+
+        conf.when_ready(Mock())
+
+        mock_warm_up.assert_called_once_with(background=False)
+        mock_freeze.assert_called_once()
+
+    @patch('gc.freeze')
+    @patch('model_registry.warm_up')
+    def test_when_ready_without_preload_does_nothing(self, mock_warm_up, mock_freeze):
+        """Test workers load their own models when preload is off"""
+        conf, _ = _load_conf({"GUNICORN_PRELOAD": "0"})
+
+        conf.when_ready(Mock())
+
+        mock_warm_up.assert_not_called()
+        mock_freeze.assert_not_called()
@@ -0,0 +1,72 @@
+"""
+Tests for the job description cache in jd_cache.py
+"""
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from jd_cache import JDCache, make_jd_id
+
+
+class TestJDCache:
+    """Tests for JDCache"""
+
+    def test_same_text_same_entry(self):
+        """Test identical job descriptions share one id and one entry"""
+        cache = JDCache(max_entries=4, ttl=60)
+        first = cache.add("Python developer")
+        second = cache.add("Python developer")
+
+        assert first is second
+        assert first.jd_id == make_jd_id("Python developer")
+        assert cache.get(first.jd_id) is first
+        assert cache.stats()["stores"] == 1
+
+    def test_unknown_id(self):
+        """Test an id that was never added is a miss"""
+        cache = JDCache(max_entries=4, ttl=60)
+
+        assert cache.get(make_jd_id("never added")) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry goes first when the cache is full"""
+        cache = JDCache(max_entries=2, ttl=60)
+        a = cache.add("a")
+        b = cache.add("b")
+        cache.get(a.jd_id)
+        cache.add("c")
+
+        assert cache.get(b.jd_id) is None
+        assert cache.get(a.jd_id) is a
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entry(self):
+        """Test an entry unused for longer than the ttl is dropped"""
+        cache = JDCache(max_entries=4, ttl=60)
+        with patch('jd_cache.time.time', return_value=1000.0):
+            entry = cache.add("Python developer")
+        with patch('jd_cache.time.time', return_value=1061.0):
+            assert cache.get(entry.jd_id) is None
+
+        assert cache.stats()["expired"] == 1
+
+
+class TestCachedJobDescription:
+    """Tests for the artifacts kept on a cached job description"""
+
+    def test_embedding_computed_once_per_encoder(self):
+        """Test the whole-text embedding is encoded once and redone for another encoder"""
+        entry = JDCache(max_entries=4, ttl=60).add("Python developer")
+        encoder, other = Mock(), Mock()
+        encoder.encode.return_value = np.array([1.0, 0.0])
+        other.encode.return_value = np.array([0.0, 1.0])
+
+        assert entry.embedding(encoder) is entry.embedding(encoder)
+        assert list(entry.embedding(other)) == [0.0, 1.0]
+        encoder.encode.assert_called_once_with("Python developer")
@@ -0,0 +1,160 @@
+"""
+Tests for saved job postings in job_postings.py
+"""
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import job_postings
+import scoring_logic
+from jd_cache import JDCache, make_jd_id
+from scoring_logic import score_match
+
+DESCRIPTION = "Strong Python background needed.\nExperience with Kubernetes clusters."
+RESUME = "Built Python services on AWS.\nMentored junior engineers."
+
+
+class FakeEncoder:
+    """Deterministic 3-d embeddings from a few keywords, counting encode() calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, sentences, batch_size=32):
+        self.calls += 1
+        vectors = [[float("Python" in s), float("Kubernetes" in s), 1.0] for s in np.atleast_1d(sentences)]
+        return np.array(vectors if not isinstance(sentences, str) else vectors[0], dtype=np.float32)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Give each test an empty job description cache."""
+    with patch('jd_cache.cache', JDCache(max_entries=8, ttl=60)):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def bytea_storage():
+    with patch('job_postings.embedding_store.column_backend', return_value='bytea'):
+        yield
+
+
+def stored_row(encoder, status=job_postings.READY):
+    """The SELECT row load() reads, with features as precompute() would store them."""
+    features = job_postings.compute_features(
+        job_postings.jd_cache.CachedJobDescription(make_jd_id(DESCRIPTION), DESCRIPTION), encoder
+    )
+    return (
+        DESCRIPTION, make_jd_id(DESCRIPTION), status,
+        features["embedding"].astype(np.float32).tobytes(), features["keywords"],
+        features["requirements"], features["requirement_embeddings"].tobytes(),
+    )
+
+
+class TestCreate:
+    """Tests for create"""
+
+    def test_new_posting(self):
+        """Test a new description is inserted under its content hash"""
+        cur = MagicMock()
+        cur.fetchone.return_value = (7, "SRE", "Acme", make_jd_id(DESCRIPTION), "pending", None, None)
+
+        posting, created = job_postings.create(cur, DESCRIPTION, title="SRE", company="Acme")
+
+        assert created is True
+        assert posting["id"] == 7 and posting["jd_id"] == make_jd_id(DESCRIPTION)
+        assert cur.execute.call_args[0][1] == ("SRE", "Acme", DESCRIPTION, make_jd_id(DESCRIPTION))
+
+    def test_repeated_description_returns_existing_row(self):
+        """Test saving the same description again returns the stored posting"""
+        cur = MagicMock()
+        cur.fetchone.side_effect = [None, (7, None, None, make_jd_id(DESCRIPTION), "ready", None, None)]
+
+        posting, created = job_postings.create(cur, DESCRIPTION)
+
+        assert created is False
+        assert posting["status"] == "ready"
+
+
+class TestLoad:
+    """Tests for load"""
+
+    def test_ready_posting_uses_stored_features(self):
+        """Test a ready posting scores like its text without re-embedding or re-tokenizing it"""
+        encoder = FakeEncoder()
+        cur = MagicMock()
+        cur.fetchone.return_value = stored_row(encoder)
+        encoder.calls = 0
+
+        with patch('scoring_logic._tokenize') as mock_tokenize:
+            entry = job_postings.load(cur, 7, encoder)
+            columns = entry.keyword_columns(scoring_logic._keyword_index()[0])
+            mock_tokenize.assert_not_called()
+
+        assert len(columns) == 2
+        assert list(entry.embedding(encoder)) == [1.0, 1.0, 1.0]
+        assert encoder.calls == 0
+        assert score_match(RESUME, entry, mode="hybrid", encoder=encoder) == \
+            score_match(RESUME, DESCRIPTION, mode="hybrid", encoder=FakeEncoder())
+
+    def test_pending_posting_computes_on_demand(self):
+        """Test a posting without features yet falls back to analyzing its text"""
+        encoder = FakeEncoder()
+        cur = MagicMock()
+        cur.fetchone.return_value = (DESCRIPTION, make_jd_id(DESCRIPTION), job_postings.PENDING,
+                                     None, None, None, None)
+
+        entry = job_postings.load(cur, 7, encoder)
+
+        assert entry.jd_id == make_jd_id(DESCRIPTION)
+        assert entry.requirements() == ["Strong Python background needed.", "Experience with Kubernetes clusters."]
+
+    def test_unknown_posting(self):
+        """Test a missing row gives None"""
+        cur = MagicMock()
+        cur.fetchone.return_value = None
+
+        assert job_postings.load(cur, 7, FakeEncoder()) is None
+
+
+class TestPrecompute:
+    """Tests for precompute"""
+
+    @pytest.fixture
+    def cursor(self):
+        conn, cur = MagicMock(), MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cur
+        pool = MagicMock()
+        pool.getconn.return_value = conn
+        with patch('job_postings.db_pool.get_pool', return_value=pool):
+            yield cur
+        pool.putconn.assert_called_once_with(conn)
+
+    def test_stores_features_and_marks_ready(self, cursor):
+        """Test the posting's features are written and its status set to ready"""
+        cursor.fetchone.return_value = (DESCRIPTION,)
+
+        result = job_postings.precompute(7, FakeEncoder())
+
+        sql, params = cursor.execute.call_args[0]
+        assert sql.startswith("UPDATE job_postings SET status")
+        assert params[0] == job_postings.READY
+        assert params[3].adapted == ["Strong Python background needed.", "Experience with Kubernetes clusters."]
+        assert result == {"id": 7, "status": job_postings.READY, "requirements": 2}
+
+    def test_failure_marks_posting_failed(self, cursor):
+        """Test an encoder error is recorded on the posting and fails the job"""
+        cursor.fetchone.return_value = (DESCRIPTION,)
+        encoder = MagicMock()
+        encoder.encode.side_effect = RuntimeError("model unavailable")
+
+        with pytest.raises(RuntimeError):
+            job_postings.precompute(7, encoder)
+
+        assert cursor.execute.call_args[0][1] == (job_postings.FAILED, "model unavailable", 7)
@@ -0,0 +1,168 @@
+"""
+Tests for the background job queue in job_queue.py
+"""
+import os
+import sys
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import job_queue
+from job_queue import FileResult, JobQueue, MemoryJobStore, PostgresJobStore, parse_concurrency
+
+
+def _wait_until_finished(queue, job_id):
+    for _ in range(100):
+        job = queue.get(job_id)
+        if job["status"] in job_queue.FINISHED:
+            return job
+        queue.wait(job_id, 0.05)
+    raise AssertionError("job did not finish")
+
+
+class TestParseConcurrency:
+    """Tests for JOB_CONCURRENCY parsing"""
+
+    def test_overrides_defaults(self):
+        """Test listed types are overridden and others keep their default"""
+        limits = parse_concurrency("match=1, export-pdf=4", {"match": 2, "export-pdf": 2, "check-duplicates": 1})
+        assert limits == {"match": 1, "export-pdf": 4, "check-duplicates": 1}
+
+    def test_ignores_invalid_entries(self):
+        """Test malformed entries are skipped and limits stay positive"""
+        assert parse_concurrency("match=x,export-pdf=0", {"match": 2, "export-pdf": 2}) == {"match": 2, "export-pdf": 1}
+
+
+class TestJobQueue:
+    """Tests for submitting and following jobs"""
+
+    @pytest.fixture
+    def queue(self):
+        return JobQueue(MemoryJobStore(), {"match": 2, "export-pdf": 1})
+
+    def test_successful_job_records_result(self, queue):
+        """Test a job's return value is stored and its status moves to succeeded"""
+        job_id = queue.submit("match", lambda x: {"value": x * 2}, 21)
+
+        job = _wait_until_finished(queue, job_id)
+        assert job["status"] == job_queue.SUCCEEDED
+        assert job["result"] == {"value": 42}
+        assert job["started_at"] and job["finished_at"]
+        assert queue.stats()["match"]["succeeded"] == 1
+
+    def test_failed_job_records_error(self, queue):
+        """Test an exception marks the job failed with its message"""
+        def boom():
+            raise RuntimeError("Stirling is down")
+        job_id = queue.submit("export-pdf", boom)
+
+        job = _wait_until_finished(queue, job_id)
+        assert job["status"] == job_queue.FAILED
+        assert job["error"] == "Stirling is down"
+
+    def test_file_results_are_stored_separately(self, queue):
+        """Test FileResult payloads are kept out of the JSON record"""
+        job_id = queue.submit("export-pdf", lambda: FileResult(b"%PDF", "application/pdf", "resume.pdf"))
+
+        job = _wait_until_finished(queue, job_id)
+        assert job["has_file"] is True
+        assert job["result"] is None
+        assert queue.get_file(job_id).data == b"%PDF"
+
+    def test_unknown_job_type_is_rejected(self, queue):
+        """Test submitting an unconfigured job type raises ValueError"""
+        with pytest.raises(ValueError):
+            queue.submit("unknown", lambda: {})
+
+    def test_concurrency_is_capped_per_type(self, queue):
+        """Test no more than the configured number of jobs of a type run at once"""
+        release = threading.Event()
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            release.wait(5)
+            with lock:
+                active[0] -= 1
+            return {}
+
+        job_ids = [queue.submit("export-pdf", work) for _ in range(3)]
+        queue.wait(job_ids[0], 0.1)
+        assert queue.stats()["export-pdf"]["queued"] == 2
+        release.set()
+        for job_id in job_ids:
+            _wait_until_finished(queue, job_id)
+        assert peak[0] == 1
+
+    def test_finished_jobs_are_purged(self):
+        """Test jobs are deleted once past the result TTL"""
+        store = MemoryJobStore()
+        queue = JobQueue(store, {"match": 1}, result_ttl=-1)
+        job_id = queue.submit("match", lambda: {})
+        _wait_until_finished(queue, job_id)
+
+        assert store.purge(-1) == 1
+        assert queue.get(job_id) is None
+
+    def test_orphaned_jobs_are_failed(self):
+        """Test jobs left queued or running past the stale limit are marked failed"""
+        store = MemoryJobStore()
+        store.create("orphan", "match")
+        store.mark_running("orphan")
+        queue = JobQueue(store, {"match": 1}, stale_after=-1)
+
+        job = queue.get("orphan")
+
+        assert job["status"] == job_queue.FAILED
+        assert job["error"] == job_queue.STALE_ERROR
+        assert job["finished_at"]
+
+    def test_recent_jobs_are_not_failed(self):
+        """Test a job younger than the stale limit is left alone"""
+        store = MemoryJobStore()
+        store.create("fresh", "match")
+
+        assert JobQueue(store, {"match": 1}, stale_after=3600).recover_stale() == 0
+        assert store.get("fresh")["status"] == job_queue.QUEUED
+
+
+class TestPostgresJobStore:
+    """Tests for the Postgres-backed store"""
+
+    @patch('job_queue.db_pool.get_pool')
+    def test_connections_are_returned_to_pool(self, mock_get_pool):
+        """Test every store call hands its connection back"""
+        pool = MagicMock()
+        mock_get_pool.return_value = pool
+        cursor = pool.getconn.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = None
+
+        store = PostgresJobStore()
+        store.create("abc", "match")
+        assert store.get("abc") is None
+
+        assert pool.putconn.call_count == 2
+        insert_sql, params = cursor.execute.call_args_list[0][0]
+        assert "INSERT INTO background_jobs" in insert_sql
+        assert params == ("abc", "match", job_queue.QUEUED)
+
+    @patch('job_queue.db_pool.get_pool')
+    def test_fail_stale_only_touches_unfinished_jobs(self, mock_get_pool):
+        """Test the stale sweep updates queued and running rows past the limit"""
+        pool = MagicMock()
+        mock_get_pool.return_value = pool
+        cursor = pool.getconn.return_value.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 2
+
+        assert PostgresJobStore().fail_stale(1800) == 2
+
+        sql, params = cursor.execute.call_args[0]
+        assert sql.startswith("UPDATE background_jobs SET status")
+        assert params == (job_queue.FAILED, job_queue.STALE_ERROR, job_queue.QUEUED, job_queue.RUNNING, 1800)
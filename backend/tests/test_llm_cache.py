@@ -0,0 +1,219 @@
+"""
+Tests for the LLM response cache in llm_cache.py
+"""
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import llm_cache
+import llm_integration
+from llm_cache import LLMCache, MemoryBackend, SQLiteBackend, make_key
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "prompt"}]
+
+
+class TestMakeKey:
+    """Tests for cache key derivation"""
+
+    def test_same_inputs_same_key(self):
+        """Test identical requests hash to the same key"""
+        assert make_key("m", MESSAGES, 0.5, 150) == make_key("m", list(MESSAGES), 0.5, 150)
+
+    @pytest.mark.parametrize("change", [
+        ("other-model", MESSAGES, 0.5, 150),
+        ("m", [MESSAGES[0], {"role": "user", "content": "other"}], 0.5, 150),
+        ("m", [{"role": "system", "content": "other"}, MESSAGES[1]], 0.5, 150),
+        ("m", MESSAGES, 0.7, 150),
+        ("m", MESSAGES, 0.5, 200),
+    ])
+    def test_every_input_changes_key(self, change):
+        """Test model, prompts, temperature and max_tokens all feed the key"""
+        assert make_key(*change) != make_key("m", MESSAGES, 0.5, 150)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    def factory(max_entries=10, ttl=60):
+        if request.param == "memory":
+            return MemoryBackend(max_entries, ttl)
+        return SQLiteBackend(str(tmp_path / "cache" / "llm.sqlite3"), max_entries, ttl)
+    return factory
+
+
+class TestBackends:
+    """Tests shared by the in-memory and SQLite backends"""
+
+    def test_set_and_get(self, backend_factory):
+        """Test a stored value is returned"""
+        backend = backend_factory()
+        backend.set("k", "value")
+        assert backend.get("k") == ("value", False)
+        assert backend.get("missing") == (None, False)
+        assert len(backend) == 1
+
+    def test_expired_entries_are_dropped(self, backend_factory):
+        """Test entries past their TTL read as expired misses"""
+        backend = backend_factory(ttl=-1)
+        backend.set("k", "value")
+        assert backend.get("k") == (None, True)
+        assert len(backend) == 0
+
+    def test_least_recently_used_is_evicted(self, backend_factory):
+        """Test the size limit evicts the entry read longest ago"""
+        backend = backend_factory(max_entries=2)
+        backend.set("a", "1")
+        time.sleep(0.01)
+        backend.set("b", "2")
+        time.sleep(0.01)
+        backend.get("a")
+        time.sleep(0.01)
+        assert backend.set("c", "3") == 1
+        assert backend.get("b") == (None, False)
+        assert backend.get("a") == ("1", False)
+        assert backend.get("c") == ("3", False)
+
+    def test_clear(self, backend_factory):
+        """Test clear empties the store"""
+        backend = backend_factory()
+        backend.set("k", "value")
+        backend.clear()
+        assert len(backend) == 0
+
+    def test_sqlite_survives_reopen(self, tmp_path):
+        """Test the SQLite store keeps entries across instances"""
+        path = str(tmp_path / "llm.sqlite3")
+        SQLiteBackend(path, 10, 60).set("k", "value")
+        assert SQLiteBackend(path, 10, 60).get("k") == ("value", False)
+
+
+class TestLLMCache:
+    """Tests for the counting front end"""
+
+    def test_counts_hits_misses_and_evictions(self):
+        """Test stats reflect lookups and evictions"""
+        cache = LLMCache(MemoryBackend(1, 60))
+        cache.get("a")
+        cache.set("a", "1")
+        cache.get("a")
+        cache.set("b", "2")
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["stores"], stats["evictions"]) == (1, 1, 2, 1)
+        assert stats["hit_rate"] == 0.5
+        assert stats["backend"] == "memory"
+        assert stats["entries"] == 1
+
+    def test_disabled_cache(self):
+        """Test a cache without a backend never hits"""
+        cache = LLMCache(None)
+        cache.set("a", "1")
+        assert cache.get("a") is None
+        assert cache.stats()["backend"] == "off"
+
+    def test_backend_errors_are_swallowed(self):
+        """Test a failing backend reads as a miss instead of raising"""
+        backend = Mock()
+        backend.get.side_effect = RuntimeError("disk full")
+        backend.set.side_effect = RuntimeError("disk full")
+        cache = LLMCache(backend)
+
+        assert cache.get("a") is None
+        cache.set("a", "1")
+        assert cache.stats()["errors"] == 2
+
+
+class TestCachedCompletions:
+    """Tests for the cache in front of llama.cpp completions"""
+
+    @patch('llm_integration.llm_client')
+    def test_repeated_bullet_is_served_from_cache(self, mock_client):
+        """Test a second identical improve call doesn't reach the LLM"""
+        response = Mock(status_code=200)
+        response.json.return_value = {"choices": [{"message": {"content": "Led a team of 5"}}]}
+        mock_client.post.return_value = response
+
+        args = ("Managed a team", "Engineering Manager", "Technology", "Lead a team", "test-model")
+        first = llm_integration.improve_resume_bullet(*args)
+        second = llm_integration.improve_resume_bullet(*args)
+
+        assert first == second == "Led a team of 5"
+        assert mock_client.post.call_count == 1
+        assert llm_integration.improve_resume_bullet(*args[:4], "other-model") == "Led a team of 5"
+        assert mock_client.post.call_count == 2
+
+    @patch('llm_integration.llm_client')
+    def test_regenerate_skips_and_replaces_cached_rewrite(self, mock_client):
+        """Test regenerate asks the LLM again and later calls get the new rewrite"""
+        first, second = Mock(status_code=200), Mock(status_code=200)
+        first.json.return_value = {"choices": [{"message": {"content": "Led a team of 5"}}]}
+        second.json.return_value = {"choices": [{"message": {"content": "Managed 5 engineers"}}]}
+        mock_client.post.side_effect = [first, second]
+
+        args = ("Managed a team", "Engineering Manager", "Technology", "Lead a team", "test-model")
+        assert llm_integration.improve_resume_bullet(*args) == "Led a team of 5"
+        assert llm_integration.improve_resume_bullet(*args, regenerate=True) == "Managed 5 engineers"
+        assert llm_integration.improve_resume_bullet(*args) == "Managed 5 engineers"
+        assert mock_client.post.call_count == 2
+
+    @patch('llm_integration.llm_client')
+    def test_regenerate_is_not_coalesced_with_call_in_flight(self, mock_client):
+        """Test regenerate during an identical in-flight call gets its own fresh rewrite"""
+        started, release = threading.Event(), threading.Event()
+        first, second = Mock(status_code=200), Mock(status_code=200)
+        first.json.return_value = {"choices": [{"message": {"content": "Led a team of 5"}}]}
+        second.json.return_value = {"choices": [{"message": {"content": "Managed 5 engineers"}}]}
+
+        def slow_post(*args, **kwargs):
+            if not started.is_set():
+                started.set()
+                release.wait(5)
+                return first
+            return second
+
+        mock_client.post.side_effect = slow_post
+        args = ("Managed a team", "Engineering Manager", "Technology", "Lead a team", "test-model")
+        results = {}
+        normal = threading.Thread(target=lambda: results.update(normal=llm_integration.improve_resume_bullet(*args)))
+        normal.start()
+        started.wait(5)
+
+        results["regenerate"] = llm_integration.improve_resume_bullet(*args, regenerate=True)
+        release.set()
+        normal.join(5)
+
+        assert results == {"normal": "Led a team of 5", "regenerate": "Managed 5 engineers"}
+        assert mock_client.post.call_count == 2
+
+    @patch('llm_integration.llm_client')
+    def test_errors_are_not_cached(self, mock_client):
+        """Test failed completions are retried on the next call"""
+        mock_client.post.return_value = Mock(status_code=503, text="busy")
+
+        args = ("Managed a team", "Engineering Manager", "Technology", "Lead a team", "test-model")
+        assert llm_integration.improve_resume_bullet(*args).startswith("Error:")
+        llm_integration.improve_resume_bullet(*args)
+
+        assert mock_client.post.call_count == 2
+
+    @patch('llm_integration.llm_client')
+    def test_stream_is_cached_and_replayed(self, mock_client):
+        """Test a completed stream is cached, replayed as one delta, and shared with the JSON call"""
+        response = Mock(status_code=200, encoding=None)
+        response.iter_lines.return_value = iter([
+            'data: {"choices": [{"delta": {"content": "Led"}}]}',
+            'data: {"choices": [{"delta": {"content": " a team"}}]}',
+            'data: [DONE]',
+        ])
+        mock_client.post.return_value = response
+
+        assert list(llm_integration.stream_improved_bullet("b", "t", "i", "jd", None)) == ["Led", " a team"]
+        assert list(llm_integration.stream_improved_bullet("b", "t", "i", "jd", None)) == ["Led a team"]
+        assert llm_integration.improve_resume_bullet("b", "t", "i", "jd", None) == "Led a team"
+        assert mock_client.post.call_count == 1
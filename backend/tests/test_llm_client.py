@@ -0,0 +1,271 @@
+"""
+Tests for the shared llama.cpp HTTP client in llm_integration.py
+"""
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import llm_integration
+from llm_integration import LLMClient, LLMGate
+
+
+def _response(status_code=200, history=()):
+    response = Mock()
+    response.status_code = status_code
+    response.raw.retries.history = history
+    return response
+
+
+class TestLLMClientSessions:
+    """Tests for session reuse and pool configuration"""
+
+    def test_session_is_reused_across_calls(self):
+        """Test the same session is returned for the same retry policy"""
+        client = LLMClient("http://llm:8080", pool_maxsize=4)
+        assert client._session(3, 0.3) is client._session(3, 0.3)
+        assert client._session(2, 0.3) is not client._session(3, 0.3)
+
+    def test_adapter_pool_is_bounded(self):
+        """Test the mounted adapter uses the configured, blocking pool size"""
+        client = LLMClient("http://llm:8080", pool_maxsize=4)
+        adapter = client._session(3, 0.3).get_adapter("http://llm:8080/v1/models")
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_block is True
+        assert adapter.max_retries.total == 3
+
+    def test_sessions_are_dropped_after_fork(self):
+        """Test a forked process builds its own sessions"""
+        client = LLMClient("http://llm:8080")
+        session = client._session(3, 0.3)
+        client._pid = -1
+        assert client._session(3, 0.3) is not session
+
+
+class TestLLMClientMetrics:
+    """Tests for per-call latency and retry metrics"""
+
+    def test_records_calls_and_retries(self):
+        """Test successful calls count retries from the urllib3 history"""
+        client = LLMClient("http://llm:8080")
+        session = Mock()
+        session.request.return_value = _response(history=("first", "second"))
+        with patch.object(client, '_session', return_value=session):
+            client.post("/v1/chat/completions", name="improve_bullet", json={})
+
+        session.request.assert_called_once_with("POST", "http://llm:8080/v1/chat/completions", json={})
+        stats = client.stats()["improve_bullet"]
+        assert stats["calls"] == 1
+        assert stats["retries"] == 2
+        assert stats["errors"] == 0
+        assert stats["max_ms"] >= stats["avg_ms"] >= 0
+
+    def test_records_errors(self):
+        """Test failed requests and error statuses are counted as errors"""
+        client = LLMClient("http://llm:8080")
+        session = Mock()
+        session.request.side_effect = [_response(status_code=500), requests.ConnectionError("down")]
+        with patch.object(client, '_session', return_value=session):
+            client.get("/v1/models", name="list_models")
+            with pytest.raises(requests.ConnectionError):
+                client.get("/v1/models", name="list_models")
+
+        stats = client.stats()["list_models"]
+        assert stats["calls"] == 2
+        assert stats["errors"] == 2
+
+
+class TestLLMFunctionsUseSharedClient:
+    """Tests that the LLM helpers go through the module-level client"""
+
+    @patch('llm_integration.llm_client')
+    def test_improve_resume_bullet_uses_client(self, mock_client):
+        """Test improve_resume_bullet posts through the shared client"""
+        response = Mock(status_code=200)
+        response.json.return_value = {"choices": [{"message": {"content": "Led a team of 5"}}]}
+        mock_client.post.return_value = response
+
+        result = llm_integration.improve_resume_bullet(
+            "Managed a team", "Engineering Manager", "Technology", "Lead a team", "test-model"
+        )
+
+        assert result == "Led a team of 5"
+        assert mock_client.post.call_args.kwargs["name"] == "improve_bullet"
+
+
+class TestStreamingCompletions:
+    """Tests for consuming llama.cpp server-sent event streams"""
+
+    @staticmethod
+    def _stream_response(lines, status_code=200):
+        response = Mock(status_code=status_code, encoding=None)
+        response.iter_lines.return_value = iter(lines)
+        return response
+
+    @patch('llm_integration.llm_client')
+    def test_yields_deltas_until_done(self, mock_client):
+        """Test content deltas are yielded in order and [DONE] ends the stream"""
+        response = self._stream_response([
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+            '',
+            'data: {"choices": [{"delta": {"content": "Led"}}]}',
+            'data: {"choices": [{"delta": {"content": " a team"}}]}',
+            'data: [DONE]',
+            'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+        ])
+        mock_client.post.return_value = response
+
+        tokens = list(llm_integration.stream_improved_bullet("b", "t", "i", "jd", None))
+
+        assert tokens == ["Led", " a team"]
+        assert mock_client.post.call_args.kwargs["stream"] is True
+        assert mock_client.post.call_args.kwargs["json"]["stream"] is True
+        response.close.assert_called_once()
+
+    @patch('llm_integration.llm_client')
+    def test_error_status_raises(self, mock_client):
+        """Test a non-200 reply raises LLMAPIError and releases the connection"""
+        response = self._stream_response([], status_code=503)
+        mock_client.post.return_value = response
+
+        with pytest.raises(llm_integration.LLMAPIError):
+            list(llm_integration.stream_improved_bullet("b", "t", "i", "jd", None))
+        response.close.assert_called_once()
+
+    @patch('llm_integration.stream_chat_completion')
+    def test_analysis_yields_items_as_strings_complete(self, mock_stream):
+        """Test suggestions are yielded once their JSON string closes, without duplicates"""
+        mock_stream.return_value = iter(['["Pyt', 'hon", "Led \\"A\\" te', 'am", "Python"', ']'])
+
+        items = list(llm_integration.stream_job_description_analysis("jd", {}, None))
+
+        assert items == ["Python", 'Led "A" team']
+
+    @patch('llm_integration.stream_chat_completion')
+    def test_analysis_falls_back_to_lenient_parser(self, mock_stream):
+        """Test unquoted answers are still parsed once the stream ends"""
+        mock_stream.return_value = iter(["- Python\n", "- Docker\n"])
+
+        items = list(llm_integration.stream_job_description_analysis("jd", {}, None))
+
+        assert items == ["Python", "Docker"]
+
+
+class TestImproveResumeBullets:
+    """Tests for concurrent batch bullet improvement"""
+
+    @patch('llm_integration.improve_resume_bullet')
+    def test_results_keep_input_order(self, mock_improve):
+        """Test results come back in input order even when calls finish out of order"""
+        def improve(bullet, *args):
+            time.sleep(0.05 if bullet == "first" else 0)
+            return bullet.upper()
+        mock_improve.side_effect = improve
+
+        results = llm_integration.improve_resume_bullets(["first", "second", "third"], "t", "i", "jd", None)
+
+        assert results == ["FIRST", "SECOND", "THIRD"]
+        assert mock_improve.call_count == 3
+
+    @patch('llm_integration.improve_resume_bullet')
+    def test_calls_run_concurrently(self, mock_improve):
+        """Test bullets are improved in parallel, bounded by LLM_MAX_PARALLEL"""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def improve(*args):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return "ok"
+        mock_improve.side_effect = improve
+
+        llm_integration.improve_resume_bullets(["b"] * 8, "t", "i", "jd", None)
+
+        assert 1 < peak[0] <= llm_integration.LLM_MAX_PARALLEL
+
+
+class TestLLMGate:
+    """Tests for the concurrency limiter and single-flight coalescing"""
+
+    def test_identical_concurrent_calls_share_one_request(self):
+        """Test callers with the same key wait for the first caller's result"""
+        gate = LLMGate(max_in_flight=4, max_queue=4, queue_timeout=5)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "shared"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(gate.run("k", fetch)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(gate.run("k", fetch))) for _ in range(3)]
+        for t in followers:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in [leader] + followers:
+            t.join(5)
+
+        assert results == ["shared"] * 4
+        assert len(calls) == 1
+        assert gate.stats()["coalesced"] == 3
+
+    def test_followers_see_the_leaders_error(self):
+        """Test a failed upstream call fails every coalesced caller"""
+        gate = LLMGate(max_in_flight=1, max_queue=1, queue_timeout=5)
+        with pytest.raises(RuntimeError):
+            gate.run("k", Mock(side_effect=RuntimeError("boom")))
+        assert gate.stats()["in_flight"] == 0
+        assert gate.run("k", lambda: "retry works") == "retry works"
+
+    def test_full_queue_fails_fast(self):
+        """Test callers beyond the queue bound are rejected immediately"""
+        gate = LLMGate(max_in_flight=1, max_queue=0, queue_timeout=5)
+        gate.acquire()
+        started = time.monotonic()
+        with pytest.raises(llm_integration.LLMBusyError):
+            gate.run("other", lambda: "never")
+        assert time.monotonic() - started < 1
+        gate.release()
+        assert gate.stats()["rejected"] == 1
+
+    def test_queued_caller_times_out(self):
+        """Test a caller waiting longer than queue_timeout gets LLMBusyError"""
+        gate = LLMGate(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        gate.acquire()
+        with pytest.raises(llm_integration.LLMBusyError):
+            gate.acquire()
+        gate.release()
+        stats = gate.stats()
+        assert stats["timed_out"] == 1
+        assert stats["waiting"] == 0
+        assert stats["peak_waiting"] == 1
+
+    def test_waiting_caller_is_admitted_when_slot_frees(self):
+        """Test a queued caller runs once the in-flight call finishes"""
+        gate = LLMGate(max_in_flight=1, max_queue=1, queue_timeout=5)
+        gate.acquire()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(gate.run("k", lambda: "ran")))
+        waiter.start()
+        time.sleep(0.05)
+        assert gate.stats()["waiting"] == 1
+        gate.release()
+        waiter.join(5)
+        assert result == ["ran"]
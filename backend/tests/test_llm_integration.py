@@ -3,6 +3,8 @@ Tests for LLM integration functions in llm_integration.py
 """
 import pytest
 import os
+import numpy as np
+import requests
 from unittest.mock import Mock, patch, MagicMock
 import sys
 
@@ -123,165 +125,193 @@ class TestImproveResumeBullet:
         assert result == "Improved bullet with whitespace"
 
 
-class TestFindDuplicateEntries:
-    """Tests for find_duplicate_entries function"""
+class FakeEncoder:
+    """Embeds each known bullet as a fixed vector and records encode() calls."""
 
-    def test_find_duplicate_entries_exact_matches(self):
-        """Test find_duplicate_entries with exact duplicate strings"""
-        entries = [
-            "Developed web applications",
-            "Developed web applications",
-            "Managed team projects"
-        ]
+    VECTORS = {
+        "Built web apps in Python": [1.0, 0.0, 0.0],
+        "Developed Python web applications": [0.98, 0.2, 0.0],
+        "Created Python web services": [0.9, 0.4, 0.0],
+        "Managed a marketing budget": [0.0, 0.0, 1.0],
+    }
 
-        result = find_duplicate_entries(entries, threshold=100)
+    def __init__(self):
+        self.calls = []
 
+    def encode(self, sentences):
+        self.calls.append(list(sentences))
+        return np.array([self.VECTORS[sentence] for sentence in sentences], dtype=np.float32)
+
+
+class TestFindDuplicateEntriesByEmbedding:
+    """Tests for embedding-based duplicate grouping in find_duplicate_entries"""
+
+    BULLETS = list(FakeEncoder.VECTORS)
+
+    def test_groups_similar_bullets(self):
+        """Test near-duplicates are grouped with percentage scores from one encode call"""
+        encoder = FakeEncoder()
+
+        result = find_duplicate_entries(self.BULLETS, threshold=95, encoder=encoder)
+
+        assert len(encoder.calls) == 1
         assert len(result) == 1
+        assert result[0]['indices'] == [0, 1, 2]
+        assert result[0]['entries'] == self.BULLETS[:3]
+        assert result[0]['score'] == pytest.approx(97.98, abs=0.01)
+        assert all(pair['score'] >= 95 for pair in result[0]['pairs'])
+
+    def test_threshold_controls_grouping(self):
+        """Test a higher threshold leaves only the closest pair"""
+        result = find_duplicate_entries(self.BULLETS, threshold=97.8, encoder=FakeEncoder())
+
+        assert [group['indices'] for group in result] == [[0, 1]]
+
+    def test_identical_bullets_at_full_threshold(self):
+        """Test identical bullets still count as duplicates at threshold 100"""
+        bullets = ["Built web apps in Python", "Built web apps in Python"]
+
+        result = find_duplicate_entries(bullets, threshold=100, encoder=FakeEncoder())
+
         assert result[0]['indices'] == [0, 1]
         assert result[0]['score'] == 100.0
 
-    def test_find_duplicate_entries_similar_matches(self):
-        """Test find_duplicate_entries with similar strings"""
-        entries = [
-            "Developed web applications using Python",
-            "Built web apps with Python framework",
-            "Managed software development team",
-            "Led development team for software projects"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=80)
-
-        # Should find similarities between entries
-        assert len(result) >= 1
-        # Check that indices are different and scores are reasonable
-        for duplicate in result:
-            assert len(duplicate['indices']) == 2
-            assert duplicate['indices'][0] != duplicate['indices'][1]
-            assert duplicate['score'] >= 80
-
-    def test_find_duplicate_entries_no_matches(self):
-        """Test find_duplicate_entries when no duplicates exist"""
-        entries = [
-            "Developed web applications",
-            "Managed marketing campaigns",
-            "Analyzed financial data",
-            "Designed user interfaces"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=90)
-
-        assert len(result) == 0
-
-    def test_find_duplicate_entries_empty_list(self):
-        """Test find_duplicate_entries with empty list"""
-        result = find_duplicate_entries([], threshold=90)
-        assert len(result) == 0
-
-    def test_find_duplicate_entries_single_item(self):
-        """Test find_duplicate_entries with single item"""
-        result = find_duplicate_entries(["Single entry"], threshold=90)
-        assert len(result) == 0
-
-    def test_find_duplicate_entries_custom_threshold(self):
-        """Test find_duplicate_entries with different threshold values"""
-        entries = [
-            "Python developer with experience",
-            "Experienced Python programmer",
-            "Java enterprise developer"
-        ]
-
-        # High threshold - fewer matches
-        result_high = find_duplicate_entries(entries, threshold=95)
-
-        # Low threshold - more matches
-        result_low = find_duplicate_entries(entries, threshold=50)
-
-        assert len(result_low) >= len(result_high)
-
-    def test_find_duplicate_entries_return_format(self):
-        """Test that find_duplicate_entries returns correct format"""
-        entries = [
-            "Developed applications",
-            "Built applications",
-            "Managed teams"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=70)
-
-        for duplicate in result:
-            # Check required keys exist
-            assert 'indices' in duplicate
-            assert 'entries' in duplicate
-            assert 'score' in duplicate
-
-            # Check data types
-            assert isinstance(duplicate['indices'], list)
-            assert isinstance(duplicate['entries'], list)
-            assert isinstance(duplicate['score'], (int, float))
-
-            # Check indices point to correct entries
-            idx1, idx2 = duplicate['indices']
-            assert duplicate['entries'][0] == entries[idx1]
-            assert duplicate['entries'][1] == entries[idx2]
-
-    def test_find_duplicate_entries_with_special_characters(self):
-        """Test find_duplicate_entries with entries containing special characters"""
-        entries = [
-            "Increased revenue by 25% through optimization",
-            "Improved revenue by 25% via optimization techniques",
-            "Reduced costs by $50,000 annually"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=80)
-
-        # Should still find similarities despite special characters
-        assert len(result) >= 0  # May or may not find matches depending on fuzzy logic
-
-    def test_find_duplicate_entries_case_insensitive(self):
-        """Test find_duplicate_entries is case insensitive"""
-        entries = [
-            "Developed Web Applications",
-            "developed web applications",
-            "DEVELOPED WEB APPLICATIONS"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=95)
-
-        # Should find all as duplicates since they're essentially the same
-        assert len(result) >= 2  # Should match first with second, first with third
-
-    @pytest.mark.parametrize("threshold", [0, 25, 50, 75, 90, 100])
-    def test_find_duplicate_entries_threshold_range(self, threshold):
-        """Test find_duplicate_entries with various threshold values"""
-        entries = [
-            "Python developer experience",
-            "Experienced Python developer",
-            "Java developer background"
-        ]
-
-        result = find_duplicate_entries(entries, threshold=threshold)
-
-        # Result should always be a list
-        assert isinstance(result, list)
+    @patch('llm_integration._chat_completion')
+    def test_llm_confirms_candidate_pairs(self, mock_chat):
+        """Test only the candidate pairs the LLM confirms are kept"""
+        mock_chat.return_value = "[1]"
+
+        result = find_duplicate_entries(self.BULLETS, threshold=95, encoder=FakeEncoder(), confirm_with_llm=True)
+
+        assert [group['indices'] for group in result] == [[0, 1]]
+        assert mock_chat.call_count == 1
+
+    @patch('llm_integration._chat_completion')
+    def test_llm_failure_keeps_embedding_groups(self, mock_chat):
+        """Test a failing confirmation falls back to the embedding result"""
+        mock_chat.side_effect = requests.exceptions.ConnectionError("down")
+
+        result = find_duplicate_entries(self.BULLETS, threshold=95, encoder=FakeEncoder(), confirm_with_llm=True)
+
+        assert result[0]['indices'] == [0, 1, 2]
 
-        # All scores should meet the threshold
-        for duplicate in result:
-            assert duplicate['score'] >= threshold
+    def test_return_format(self):
+        """Test each group lists its indices, entries, best pair score and scored pairs"""
+        result = find_duplicate_entries(self.BULLETS, threshold=95, encoder=FakeEncoder())
 
-    def test_find_duplicate_entries_long_entries(self):
-        """Test find_duplicate_entries with long text entries"""
-        entries = [
-            "Developed and maintained multiple full-stack web applications using Python, Django, PostgreSQL, and React, serving over 10,000 active users daily",
-            "Built and sustained several complete web applications with Python/Django backend, PostgreSQL database, and React frontend, supporting 10K+ daily active users",
-            "Designed user interface components for mobile application using React Native framework"
-        ]
+        for group in result:
+            assert set(group) == {'indices', 'entries', 'score', 'pairs'}
+            assert group['entries'] == [self.BULLETS[i] for i in group['indices']]
+            assert group['score'] == max(pair['score'] for pair in group['pairs'])
+            for pair in group['pairs']:
+                assert set(pair['indices']) <= set(group['indices'])
 
-        result = find_duplicate_entries(entries, threshold=70)
+    @pytest.mark.parametrize("threshold", [0, 50, 90, 100])
+    def test_scores_meet_threshold(self, threshold):
+        """Test every reported pair scores at or above the threshold"""
+        result = find_duplicate_entries(self.BULLETS, threshold=threshold, encoder=FakeEncoder())
 
-        # Should handle long entries without issues
         assert isinstance(result, list)
-        if len(result) > 0:
-            # Verify structure is maintained for long entries
-            for duplicate in result:
-                assert len(duplicate['entries'][0]) > 50
-                assert len(duplicate['entries'][1]) > 50
\ No newline at end of file
+        for group in result:
+            assert all(pair['score'] >= threshold for pair in group['pairs'])
+
+    def test_no_similar_bullets(self):
+        """Test unrelated bullets give no groups"""
+        bullets = ["Built web apps in Python", "Managed a marketing budget"]
+
+        assert find_duplicate_entries(bullets, threshold=90, encoder=FakeEncoder()) == []
+
+    @pytest.mark.parametrize("bullets", [[], ["Built web apps in Python"]])
+    def test_fewer_than_two_bullets(self, bullets):
+        """Test nothing is encoded for an empty list or a single bullet"""
+        encoder = FakeEncoder()
+
+        assert find_duplicate_entries(bullets, encoder=encoder) == []
+        assert encoder.calls == []
+
+
+class TestModelListCache:
+    """Tests for the stale-while-revalidate model list cache"""
+
+    MODELS = [{"id": "qwen2.5-32b-instruct", "size_gb": "32"}]
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        from llm_integration import ModelListCache
+        return ModelListCache(path=str(tmp_path / "models.json"), ttl=60)
+
+    @patch('llm_integration._fetch_models')
+    def test_fresh_list_is_served_from_memory(self, mock_fetch, cache):
+        """Test a fresh list is fetched once and then served without calling the LLM"""
+        mock_fetch.return_value = self.MODELS
+
+        assert cache.get() == self.MODELS
+        assert cache.get() == self.MODELS
+        assert mock_fetch.call_count == 1
+
+    @patch('llm_integration._fetch_models')
+    def test_stale_list_is_served_while_refreshing(self, mock_fetch, cache):
+        """Test an expired list is returned immediately and refreshed in the background"""
+        mock_fetch.return_value = self.MODELS
+        cache.get()
+        cache._fetched_at -= 120
+        refreshed = [{"id": "llama-3-8b", "size_gb": "N/A"}]
+        mock_fetch.return_value = refreshed
+
+        assert cache.get() == self.MODELS
+        cache._refresh_thread.join(timeout=5)
+        assert cache.get() == refreshed
+
+    @patch('llm_integration._fetch_models')
+    def test_failures_are_negative_cached_with_backoff(self, mock_fetch, cache):
+        """Test a failed fetch isn't retried until the backoff has passed"""
+        mock_fetch.side_effect = ConnectionError("down")
+
+        assert cache.get() == []
+        assert cache.get() == []
+        assert mock_fetch.call_count == 1
+        status = cache.status()
+        assert status["failures"] == 1
+        assert status["retry_in_seconds"] > 0
+
+        cache._retry_at = 0
+        cache.get()
+        assert mock_fetch.call_count == 2
+        assert cache.status()["retry_in_seconds"] > status["retry_in_seconds"]
+
+    @patch('llm_integration._fetch_models')
+    def test_disk_seeds_cold_start_only(self, mock_fetch, tmp_path):
+        """Test a new process starts from the file written by an earlier refresh"""
+        from llm_integration import ModelListCache
+        mock_fetch.return_value = self.MODELS
+        path = str(tmp_path / "models.json")
+        ModelListCache(path=path, ttl=60).get()
+
+        mock_fetch.reset_mock()
+        assert ModelListCache(path=path, ttl=60).get() == self.MODELS
+        mock_fetch.assert_not_called()
+
+    @patch('llm_integration._fetch_models')
+    def test_concurrent_cold_requests_share_one_fetch(self, mock_fetch, cache):
+        """Test requests arriving during the cold-start fetch wait for it instead of fetching again"""
+        import threading
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch(**kwargs):
+            started.set()
+            release.wait(5)
+            return self.MODELS
+
+        mock_fetch.side_effect = slow_fetch
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [self.MODELS] * 4
+        assert mock_fetch.call_count == 1
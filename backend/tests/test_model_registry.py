@@ -0,0 +1,116 @@
+"""
+Tests for lazy model loading in model_registry.py
+"""
+import pytest
+import threading
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import model_registry
+from model_registry import _Resource, READY, FAILED, NOT_LOADED
+
+
+class TestResource:
+    """Tests for the load-once resource holder"""
+
+    def test_loads_once(self):
+        """Test the loader runs only on first access"""
+        loader = Mock(return_value="model")
+        resource = _Resource("encoder", loader)
+
+        assert resource.status == NOT_LOADED
+        assert resource.get() == "model"
+        assert resource.get() == "model"
+        loader.assert_called_once()
+        assert resource.status == READY
+
+    def test_concurrent_first_use_loads_once(self):
+        """Test simultaneous first calls share a single load"""
+        gate = threading.Event()
+
+        def slow_loader():
+            gate.wait(1)
+            return object()
+
+        loader = Mock(side_effect=slow_loader)
+        resource = _Resource("encoder", loader)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(resource.get())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        gate.set()
+        for t in threads:
+            t.join()
+
+        loader.assert_called_once()
+        assert len({id(r) for r in results}) == 1
+
+    def test_failure_is_reported_and_retried(self):
+        """Test a failed load records the error and the next call tries again"""
+        loader = Mock(side_effect=[OSError("offline"), "model"])
+        resource = _Resource("encoder", loader)
+
+        with pytest.raises(OSError):
+            resource.get()
+        assert resource.describe()["status"] == FAILED
+        assert "offline" in resource.describe()["error"]
+        assert resource.get() == "model"
+
+
+class TestNltkData:
+    """Tests for NLTK resource checks"""
+
+    @patch('nltk.download')
+    @patch('nltk.data.find')
+    def test_present_data_is_not_downloaded(self, mock_find, mock_download):
+        """Test no download is attempted when every corpus is already on disk"""
+        assert model_registry._load_nltk_data() == []
+        mock_download.assert_not_called()
+
+    @patch('nltk.download', return_value=True)
+    @patch('nltk.data.find')
+    def test_only_missing_data_is_downloaded(self, mock_find, mock_download):
+        """Test only missing corpora are downloaded"""
+        mock_find.side_effect = lambda path: (_ for _ in ()).throw(LookupError()) if 'stopwords' in path else None
+
+        assert model_registry._load_nltk_data() == ['stopwords']
+        mock_download.assert_called_once_with('stopwords', quiet=True)
+
+
+class TestLazyEncoder:
+    """Tests for the LazyEncoder proxy"""
+
+    def test_encode_delegates_to_loaded_model(self):
+        """Test encode() loads the model on first use and forwards the call"""
+        fake_model = Mock()
+        fake_model.encode.return_value = [0.1, 0.2]
+        with patch('model_registry.get_encoder', return_value=fake_model) as mock_get:
+            result = model_registry.LazyEncoder().encode("Python", batch_size=8)
+
+        mock_get.assert_called_once()
+        fake_model.encode.assert_called_once_with("Python", batch_size=8)
+        assert result == [0.1, 0.2]
+
+
+class TestReadinessEndpoint:
+    """Tests for /healthz/ready"""
+
+    @patch('app.model_registry.warm_up')
+    @patch('app.model_registry.is_ready', return_value=False)
+    def test_not_ready_returns_503_and_starts_warmup(self, mock_ready, mock_warm_up, client):
+        """Test a cold process reports 503 and kicks off background loading"""
+        response = client.get('/healthz/ready')
+
+        assert response.status_code == 503
+        mock_warm_up.assert_called_once_with(background=True)
+
+    @patch('app.model_registry.is_ready', return_value=True)
+    def test_ready_returns_200(self, mock_ready, client):
+        """Test a warm process reports ready"""
+        response = client.get('/healthz/ready')
+
+        assert response.status_code == 200
@@ -3,6 +3,7 @@ Tests for scoring logic functions in scoring_logic.py
 """
 import pytest
 import json
+import numpy as np
 from unittest.mock import Mock, patch
 import sys
 import os
@@ -12,16 +13,27 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from scoring_logic import (
     calculate_weighted_match_score,
+    score_match,
+    JobDescriptionProfile,
+    MatchScore,
+    CategoryScore,
+    calculate_batch_match_scores,
     _preprocess_text,
-    _extract_keywords_by_category,
-    _calculate_category_score,
+    _tokenize,
+    _build_vocabulary,
+    KeywordMatcher,
+    _count_matrix,
+    _category_similarities,
+    _category_similarities_one_to_many,
     _calculate_quantifiable_score,
+    _split_sentences,
     HARD_SKILLS,
     TOOLS,
     SOFT_SKILLS,
     ACTION_VERBS,
     CATEGORY_WEIGHTS
 )
+from text_normalization import tokenize_with_offsets
 
 
 class TestPreprocessText:
@@ -42,13 +54,18 @@ class TestPreprocessText:
         result = _preprocess_text("Python 3.9 version 2023")
         assert result == "python version"
 
-    @patch('scoring_logic.stopwords.words')
+    @patch('text_normalization.stopword_set')
     def test_preprocess_text_remove_stopwords(self, mock_stopwords):
         """Test that stopwords are removed"""
-        mock_stopwords.return_value = ['is', 'the', 'and', 'a']
+        mock_stopwords.return_value = frozenset(['is', 'the', 'and', 'a'])
         result = _preprocess_text("Python is the best programming language and a great tool")
         assert result == "python best programming language great tool"
 
+    def test_preprocess_text_keeps_inner_hyphens(self):
+        """Test hyphenated words stay whole while stray hyphens are dropped"""
+        result = _preprocess_text("Problem-solving - 5-year")
+        assert result == "problem-solving year"
+
     def test_preprocess_text_empty_string(self):
         """Test preprocessing empty string"""
         result = _preprocess_text("")
@@ -62,104 +79,395 @@ class TestPreprocessText:
         assert "world" in expected_words
 
 
-class TestExtractKeywordsByCategory:
-    """Tests for _extract_keywords_by_category function"""
+class TestCountMatrix:
+    """Tests for _count_matrix function"""
 
-    def test_extract_keywords_found(self):
-        """Test extracting keywords that exist in text"""
-        text = "I have experience with Python, JavaScript, and React development"
-        keywords = ["python", "javascript", "react", "java"]
+    def test_counts_keywords_per_document(self):
+        """Test keyword occurrences are counted per document row"""
+        vocabulary = {"python": 0, "javascript": 1, "react": 2}
+        counts = _count_matrix([["python", "python", "react", "cooking"], ["javascript"]], vocabulary)
 
-        result = _extract_keywords_by_category(text, keywords)
+        assert counts.shape == (2, 3)
+        assert counts.toarray().tolist() == [[2, 0, 1], [0, 1, 0]]
 
-        assert "python" in result
-        assert "javascript" in result
-        assert "react" in result
-        assert "java" not in result
+    def test_no_keywords_found(self):
+        """Test documents without keywords give an empty row"""
+        counts = _count_matrix([["cooking", "gardening"], []], {"python": 0})
 
-    def test_extract_keywords_none_found(self):
-        """Test when no keywords are found"""
-        text = "I like cooking and gardening"
-        keywords = ["python", "javascript", "react"]
+        assert counts.nnz == 0
 
-        result = _extract_keywords_by_category(text, keywords)
 
-        assert result == ""
+class TestKeywordMatcher:
+    """Tests for KeywordMatcher class"""
 
-    def test_extract_keywords_case_insensitive(self):
-        """Test that keyword extraction is case insensitive"""
-        text = "I work with PYTHON and JavaScript"
-        keywords = ["python", "javascript"]
+    def _matcher(self, *keywords):
+        return KeywordMatcher({keyword: column for column, keyword in enumerate(keywords)})
 
-        result = _extract_keywords_by_category(text, keywords)
+    def test_matches_multi_word_phrases(self):
+        """Test a multi-word keyword matches its consecutive tokens"""
+        matcher = self._matcher("python", "database management")
+        tokens = ["python", "database", "management", "database"]
 
-        assert "python" in result
-        assert "javascript" in result
+        assert list(matcher.find(tokens)) == [(0, 0, 1), (1, 1, 3)]
 
-    def test_extract_keywords_empty_text(self):
-        """Test with empty text"""
-        result = _extract_keywords_by_category("", ["python"])
-        assert result == ""
+    def test_longest_match_wins(self):
+        """Test a phrase takes priority over a keyword that is its prefix"""
+        matcher = self._matcher("machine", "machine learning")
 
-    def test_extract_keywords_empty_list(self):
-        """Test with empty keyword list"""
-        result = _extract_keywords_by_category("Python development", [])
-        assert result == ""
+        assert list(matcher.find(["machine", "learning", "machine"])) == [(1, 0, 2), (0, 2, 3)]
 
+    def test_partial_phrase_falls_back(self):
+        """Test an unfinished phrase does not hide a later match"""
+        matcher = self._matcher("financial modeling", "modeling")
 
-class TestCalculateCategoryScore:
-    """Tests for _calculate_category_score function"""
+        assert list(matcher.find(["financial", "modeling", "financial"])) == [(0, 0, 2)]
+        assert list(matcher.find(["financial", "planning", "modeling"])) == [(1, 2, 3)]
 
-    @patch('scoring_logic.cosine_similarity')
-    @patch('scoring_logic.TfidfVectorizer')
-    def test_calculate_category_score_with_matches(self, mock_vectorizer, mock_cosine):
-        """Test category score calculation when keywords match"""
-        # Mock TF-IDF vectorizer
-        mock_tfidf = Mock()
-        mock_vectorizer.return_value = mock_tfidf
-        mock_tfidf.fit_transform.return_value = [[0.1, 0.2], [0.3, 0.4]]
+    def test_matches_hyphenated_keywords(self):
+        """Test hyphenated keywords match the preprocessed text"""
+        matcher = self._matcher("problem-solving")
+        tokens = _preprocess_text("Strong problem-solving skills").split()
 
-        # Mock cosine similarity
-        mock_cosine.return_value = [[0.85]]
+        assert [column for column, _, _ in matcher.find(tokens)] == [0]
 
-        resume_text = "Python developer with JavaScript experience"
-        jd_text = "Looking for Python and JavaScript developer"
-        keywords = ["python", "javascript"]
+    def test_count_matrix_counts_phrases(self):
+        """Test the count matrix has one column per keyword, phrases included"""
+        matcher = self._matcher("sql", "database management")
+        counts = matcher.count_matrix([["database", "management", "sql", "sql"], ["management"]])
 
-        result = _calculate_category_score(resume_text, jd_text, keywords)
+        assert counts.toarray().tolist() == [[2, 1], [0, 0]]
 
-        assert result == 0.85
 
-    def test_calculate_category_score_no_resume_keywords(self):
-        """Test when no keywords found in resume"""
-        resume_text = "Marketing specialist"
-        jd_text = "Python developer needed"
-        keywords = ["python", "javascript"]
+class TestCategorySimilarities:
+    """Tests for _category_similarities function"""
 
-        result = _calculate_category_score(resume_text, jd_text, keywords)
+    CATEGORIES = {"languages": ["python", "javascript"], "tools": ["git", "jira"]}
 
-        assert result == 0.0
+    def _similarities(self, resume_tokens, jd_tokens):
+        vocabulary, mask = _build_vocabulary(self.CATEGORIES)
+        return _category_similarities(_count_matrix([resume_tokens, jd_tokens], vocabulary), mask)
 
-    def test_calculate_category_score_no_jd_keywords(self):
-        """Test when no keywords found in job description"""
-        resume_text = "Python developer"
-        jd_text = "Marketing manager position"
-        keywords = ["python", "javascript"]
+    def test_identical_keywords_score_one(self):
+        """Test a category with the same keywords in both documents scores 1.0"""
+        result = self._similarities(["python", "javascript"], ["javascript", "python"])
+        assert result[0] == pytest.approx(1.0)
 
-        result = _calculate_category_score(resume_text, jd_text, keywords)
+    def test_no_resume_keywords(self):
+        """Test a category scores 0.0 when the resume has none of its keywords"""
+        result = self._similarities(["marketing"], ["python", "git"])
+        assert result.tolist() == [0.0, 0.0]
 
-        assert result == 0.0
+    def test_no_jd_keywords(self):
+        """Test a category scores 0.0 when the job description has none of its keywords"""
+        result = self._similarities(["python", "git"], ["marketing"])
+        assert result.tolist() == [0.0, 0.0]
 
-    @patch('scoring_logic.TfidfVectorizer')
-    def test_calculate_category_score_vectorizer_error(self, mock_vectorizer):
-        """Test handling of vectorizer errors"""
-        mock_tfidf = Mock()
-        mock_vectorizer.return_value = mock_tfidf
-        mock_tfidf.fit_transform.side_effect = ValueError("Vectorizer error")
+    def test_categories_are_scored_independently(self):
+        """Test each category only sees its own keywords"""
+        result = self._similarities(["python", "git"], ["python", "jira"])
+        assert result[0] == pytest.approx(1.0)
+        assert result[1] == 0.0
 
-        result = _calculate_category_score("python", "python", ["python"])
+    def test_matches_per_category_tfidf(self):
+        """Test scores equal a TfidfVectorizer fitted on each category's keywords"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
 
-        assert result == 0.0
+        resume_tokens = ["python", "python", "javascript", "git"]
+        jd_tokens = ["python", "javascript", "javascript", "jira", "git"]
+        result = self._similarities(resume_tokens, jd_tokens)
+
+        for score, keywords in zip(result, self.CATEGORIES.values()):
+            corpus = [" ".join(t for t in tokens if t in keywords) for tokens in (resume_tokens, jd_tokens)]
+            tfidf = TfidfVectorizer().fit_transform(corpus)
+            assert score == pytest.approx(cosine_similarity(tfidf[0], tfidf[1])[0][0])
+
+
+
+class TestCategorySimilaritiesOneToMany:
+    """Tests for _category_similarities_one_to_many function"""
+
+    CATEGORIES = {"languages": ["python", "javascript"], "tools": ["git", "jira"]}
+
+    def test_matches_pairwise_scores(self):
+        """Test every row equals scoring that pair on its own"""
+        vocabulary, mask = _build_vocabulary(self.CATEGORIES)
+        query = ["python", "python", "javascript", "git"]
+        others = [
+            ["python", "javascript", "javascript", "jira", "git"],
+            ["javascript"],
+            ["marketing"],
+            [],
+            ["git", "git", "jira", "python"],
+        ]
+        result = _category_similarities_one_to_many(
+            _count_matrix([query], vocabulary), _count_matrix(others, vocabulary), mask
+        )
+
+        assert result.shape == (len(others), len(self.CATEGORIES))
+        for row, tokens in zip(result, others):
+            expected = _category_similarities(_count_matrix([query, tokens], vocabulary), mask)
+            np.testing.assert_allclose(row, expected, atol=1e-12)
+
+
+class TestCalculateBatchMatchScores:
+    """Tests for calculate_batch_match_scores function"""
+
+    RESUME = "Developed Python and SQL services on AWS, managed Jira boards, improved latency 30%"
+    JOB_DESCRIPTIONS = [
+        "Python developer with SQL and AWS experience",
+        "Salesforce admin with strong communication and leadership",
+        "Figma designer",
+    ]
+
+    def test_one_resume_many_job_descriptions(self):
+        """Test each result equals score_match for that pair"""
+        results = calculate_batch_match_scores([self.RESUME], self.JOB_DESCRIPTIONS)
+
+        assert results == [score_match(self.RESUME, jd) for jd in self.JOB_DESCRIPTIONS]
+
+    def test_many_resumes_one_job_description(self):
+        """Test the reverse direction scores each resume against the job description"""
+        resumes = [self.RESUME, "Figma and Tableau dashboards", "No numbers here"]
+        results = calculate_batch_match_scores(resumes, [self.JOB_DESCRIPTIONS[0]])
+
+        assert results == [score_match(r, self.JOB_DESCRIPTIONS[0]) for r in resumes]
+
+    def test_job_description_profile_is_not_retokenized(self):
+        """Test a profile as the single job description reuses its keyword hits"""
+        resumes = [self.RESUME, "Figma and Tableau dashboards"]
+        profile = JobDescriptionProfile(self.JOB_DESCRIPTIONS[0])
+        profile.tokens()
+
+        with patch('scoring_logic._tokenize', wraps=_tokenize) as mock_tokenize:
+            results = calculate_batch_match_scores(resumes, [profile])
+
+        assert mock_tokenize.call_count == len(resumes)
+        assert results == [score_match(r, self.JOB_DESCRIPTIONS[0]) for r in resumes]
+
+    def test_parallel_tokenization_gives_same_results(self):
+        """Test tokenizing in a process pool does not change the scores"""
+        job_descriptions = self.JOB_DESCRIPTIONS * 2
+        with patch('scoring_logic.BATCH_PARALLEL_MIN_DOCUMENTS', 2):
+            parallel = calculate_batch_match_scores([self.RESUME], job_descriptions, parallel=True, processes=2)
+
+        assert parallel == calculate_batch_match_scores([self.RESUME], job_descriptions)
+
+    def test_requires_one_side_to_be_single(self):
+        """Test many-to-many input is rejected"""
+        with pytest.raises(ValueError):
+            calculate_batch_match_scores(["a", "b"], ["c", "d"])
+
+
+class TestMatchScore:
+    """Tests for the MatchScore result type"""
+
+    def _result(self):
+        return score_match("Developed Python services, 20% faster", "Python developer")
+
+    def test_score_match_returns_structured_result(self):
+        """Test score_match returns MatchScore with a CategoryScore per weighted category"""
+        result = self._result()
+
+        assert isinstance(result, MatchScore)
+        assert set(result.breakdown) == set(CATEGORY_WEIGHTS)
+        assert all(isinstance(line, CategoryScore) for line in result.breakdown.values())
+
+    def test_slots_prevent_stray_attributes(self):
+        """Test the result types use __slots__ instead of a per-instance dict"""
+        result = self._result()
+
+        assert not hasattr(result, '__dict__')
+        with pytest.raises(AttributeError):
+            result.extra = 1
+
+    def test_json_wrapper_matches_to_dict(self):
+        """Test calculate_weighted_match_score is the JSON form of score_match"""
+        result = self._result()
+
+        assert json.loads(calculate_weighted_match_score("Developed Python services, 20% faster", "Python developer")) \
+            == result.to_dict()
+        assert result.to_json(indent=None) == json.dumps(result.to_dict())
+
+
+class TestKeywordEvidence:
+    """Tests for the explain option of score_match"""
+
+    RESUME = "Built Python services on Amazon Web Services (Kubernetes).\nStrong communication."
+    JOB_DESCRIPTION = "Python and Kubernetes on AWS, plus Terraform. Python again. Leadership and communication."
+
+    def test_splits_job_keywords_into_matched_and_missing(self):
+        """Test each category lists the job description's keywords found and not found in the resume"""
+        evidence = score_match(self.RESUME, self.JOB_DESCRIPTION, explain=True).evidence
+
+        assert set(evidence) == {"hard_skills", "tools", "soft_skills", "action_verbs"}
+        assert [k["keyword"] for k in evidence["hard_skills"]["matched"]] == ["python"]
+        assert {k["keyword"] for k in evidence["tools"]["matched"]} == {"aws", "kubernetes"}
+        assert [k["keyword"] for k in evidence["tools"]["missing"]] == ["terraform"]
+        assert [k["keyword"] for k in evidence["soft_skills"]["missing"]] == ["leadership"]
+
+    def test_offsets_point_into_the_resume(self):
+        """Test matched keywords carry their character spans in the original resume text"""
+        evidence = score_match(self.RESUME, self.JOB_DESCRIPTION, explain=True).evidence
+        spans = {k["keyword"]: k["offsets"] for k in evidence["tools"]["matched"]}
+
+        assert [self.RESUME[start:end] for start, end in spans["kubernetes"]] == ["Kubernetes"]
+        assert [self.RESUME[start:end] for start, end in spans["aws"]] == ["Amazon Web Services"]
+
+    def test_weights_are_normalized_per_category(self):
+        """Test the weights of a category's keywords form a unit TF-IDF vector"""
+        evidence = score_match(self.RESUME, self.JOB_DESCRIPTION, explain=True).evidence
+        tools = evidence["tools"]["matched"] + evidence["tools"]["missing"]
+
+        assert sum(k["weight"] ** 2 for k in tools) == pytest.approx(1.0, abs=1e-3)
+        # Terraform only appears in the job description, so it carries the larger idf.
+        assert evidence["tools"]["missing"][0]["weight"] > evidence["tools"]["matched"][0]["weight"]
+
+    def test_same_scores_and_single_tokenization(self):
+        """Test explain changes nothing else and tokenizes the resume once"""
+        plain = score_match(self.RESUME, self.JOB_DESCRIPTION)
+        with patch('scoring_logic._preprocess_text', wraps=_preprocess_text) as mock_preprocess, \
+             patch('scoring_logic.tokenize_with_offsets', wraps=tokenize_with_offsets) as mock_offsets:
+            explained = score_match(self.RESUME, self.JOB_DESCRIPTION, explain=True)
+
+        assert explained.breakdown == plain.breakdown
+        assert plain.evidence is None and "evidence" not in plain.to_dict()
+        mock_offsets.assert_called_once_with(self.RESUME)
+        mock_preprocess.assert_called_once_with(self.JOB_DESCRIPTION)
+
+
+class TestSplitSentences:
+    """Tests for _split_sentences function"""
+
+    def test_splits_lines_and_sentences(self):
+        """Test lines and sentence ends both start a new sentence, and bullets are stripped"""
+        text = "- Built APIs in Python. Shipped weekly!\n\u2022 Led the platform team\nSkills"
+        assert _split_sentences(text) == ["Built APIs in Python.", "Shipped weekly!", "Led the platform team"]
+
+    def test_caps_sentence_count(self):
+        """Test at most SEMANTIC_MAX_SENTENCES sentences are kept"""
+        with patch('scoring_logic.SEMANTIC_MAX_SENTENCES', 2):
+            assert len(_split_sentences("One two. Three four. Five six.")) == 2
+
+
+class FakeEncoder:
+    """Maps known sentences to fixed vectors and counts encode() calls."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = []
+
+    def encode(self, sentences, batch_size=32):
+        self.calls.append(list(sentences))
+        return np.array([self.vectors[sentence] for sentence in sentences], dtype=np.float32)
+
+
+class TestSemanticScoring:
+    """Tests for the semantic and hybrid modes of calculate_weighted_match_score"""
+
+    RESUME = "Built Python services on AWS.\nMentored junior engineers."
+    JOB_DESCRIPTION = "Strong Python background needed.\nExperience with Kubernetes clusters."
+    VECTORS = {
+        "Built Python services on AWS.": [1.0, 0.0, 0.0],
+        "Mentored junior engineers.": [0.0, 1.0, 0.0],
+        "Strong Python background needed.": [0.9, 0.1, 0.0],
+        "Experience with Kubernetes clusters.": [0.0, 0.0, 1.0],
+    }
+
+    def _score(self, mode):
+        encoder = FakeEncoder(self.VECTORS)
+        result = json.loads(calculate_weighted_match_score(self.RESUME, self.JOB_DESCRIPTION, mode=mode, encoder=encoder))
+        return result, encoder
+
+    def test_embeds_all_sentences_in_one_call(self):
+        """Test resume and job description sentences are encoded in a single batch"""
+        _, encoder = self._score("semantic")
+
+        assert len(encoder.calls) == 1
+        assert len(encoder.calls[0]) == 4
+
+    def test_reports_best_match_per_requirement(self):
+        """Test each requirement lists its closest resume sentence and coverage"""
+        result, _ = self._score("semantic")
+        python_req, kubernetes_req = result["requirements"]
+
+        assert result["mode"] == "semantic"
+        assert python_req["bestMatch"] == "Built Python services on AWS."
+        assert python_req["similarity"] == pytest.approx(0.9939, abs=1e-4)
+        assert python_req["coverage"] == 1.0
+        assert kubernetes_req["similarity"] == 0.0
+        assert kubernetes_req["coverage"] == 0.0
+
+    def test_categories_use_requirements_that_mention_them(self):
+        """Test a category is scored from the requirements naming its keywords"""
+        result, _ = self._score("semantic")
+
+        # "python" is a hard skill, "kubernetes" a tool; no requirement names a soft skill,
+        # so that category falls back to the mean coverage of all requirements.
+        assert result["breakdown"]["hard_skills"]["score"] == 100
+        assert result["breakdown"]["tools"]["score"] == 0
+        assert result["breakdown"]["soft_skills"]["score"] == 50
+
+    def test_hybrid_blends_lexical_and_semantic(self):
+        """Test hybrid category scores are the weighted mean of both modes"""
+        semantic, _ = self._score("semantic")
+        lexical = json.loads(calculate_weighted_match_score(self.RESUME, self.JOB_DESCRIPTION))
+        with patch('scoring_logic.HYBRID_SEMANTIC_WEIGHT', 0.5):
+            hybrid, _ = self._score("hybrid")
+
+        for category in ("hard_skills", "tools"):
+            expected = (semantic["breakdown"][category]["score"] + lexical["breakdown"][category]["score"]) / 2
+            assert abs(hybrid["breakdown"][category]["score"] - expected) <= 1
+
+    def test_lexical_result_unchanged(self):
+        """Test the default mode keeps the original result shape"""
+        result = json.loads(calculate_weighted_match_score(self.RESUME, self.JOB_DESCRIPTION))
+
+        assert set(result) == {"overallScore", "breakdown"}
+
+    def test_empty_resume(self):
+        """Test requirements are reported uncovered when the resume has no sentences"""
+        encoder = FakeEncoder(self.VECTORS)
+        result = json.loads(calculate_weighted_match_score("", self.JOB_DESCRIPTION, mode="semantic", encoder=encoder))
+
+        assert encoder.calls == []
+        assert [r["bestMatch"] for r in result["requirements"]] == [None, None]
+        assert result["overallScore"] == 0
+
+    @pytest.mark.parametrize("mode, encoder", [("fuzzy", None), ("semantic", None)])
+    def test_invalid_arguments(self, mode, encoder):
+        """Test unknown modes and semantic scoring without an encoder are rejected"""
+        with pytest.raises(ValueError):
+            calculate_weighted_match_score(self.RESUME, self.JOB_DESCRIPTION, mode=mode, encoder=encoder)
+
+
+class TestJobDescriptionProfile:
+    """Tests for scoring against a reusable JobDescriptionProfile"""
+
+    RESUMES = ["Built Python services on AWS.\nMentored junior engineers.", "Mentored junior engineers."]
+    JOB_DESCRIPTION = TestSemanticScoring.JOB_DESCRIPTION
+
+    @pytest.mark.parametrize("mode", ["lexical", "hybrid"])
+    def test_same_result_as_text(self, mode):
+        """Test a profile scores exactly like the job description text"""
+        profile = JobDescriptionProfile(self.JOB_DESCRIPTION)
+        encoder = FakeEncoder(TestSemanticScoring.VECTORS) if mode != "lexical" else None
+
+        for resume in self.RESUMES:
+            assert score_match(resume, profile, mode=mode, encoder=encoder) == \
+                score_match(resume, self.JOB_DESCRIPTION, mode=mode, encoder=encoder)
+
+    def test_job_description_analyzed_once(self):
+        """Test later resumes reuse the tokens and requirement embeddings"""
+        profile = JobDescriptionProfile(self.JOB_DESCRIPTION)
+        encoder = FakeEncoder(TestSemanticScoring.VECTORS)
+        with patch('scoring_logic._preprocess_text', wraps=_preprocess_text) as mock_preprocess:
+            for resume in self.RESUMES:
+                score_match(resume, profile, mode="hybrid", encoder=encoder)
+
+        jd_calls = [call for call in mock_preprocess.call_args_list if call.args[0] == self.JOB_DESCRIPTION]
+        assert len(jd_calls) == 1
+        assert encoder.calls[1] == ["Mentored junior engineers."]
 
 
 class TestCalculateQuantifiableScore:
@@ -205,12 +513,12 @@ class TestCalculateQuantifiableScore:
 class TestCalculateWeightedMatchScore:
     """Tests for calculate_weighted_match_score function"""
 
-    @patch('scoring_logic._calculate_category_score')
+    @patch('scoring_logic._category_similarities')
     @patch('scoring_logic._calculate_quantifiable_score')
     def test_calculate_weighted_match_score_perfect_match(self, mock_quant_score, mock_cat_score):
         """Test weighted score calculation with perfect matches"""
         # Mock all category scores as perfect (1.0)
-        mock_cat_score.return_value = 1.0
+        mock_cat_score.return_value = np.ones(4)
         mock_quant_score.return_value = 1.0
 
         resume_text = "Python JavaScript developer with AWS experience"
@@ -223,12 +531,12 @@ class TestCalculateWeightedMatchScore:
         assert 'breakdown' in result
         assert len(result['breakdown']) == 5  # All categories
 
-    @patch('scoring_logic._calculate_category_score')
+    @patch('scoring_logic._category_similarities')
     @patch('scoring_logic._calculate_quantifiable_score')
     def test_calculate_weighted_match_score_no_match(self, mock_quant_score, mock_cat_score):
         """Test weighted score calculation with no matches"""
         # Mock all scores as zero
-        mock_cat_score.return_value = 0.0
+        mock_cat_score.return_value = np.zeros(4)
         mock_quant_score.return_value = 0.0
 
         result_json = calculate_weighted_match_score("Marketing", "Engineering")
@@ -237,23 +545,12 @@ class TestCalculateWeightedMatchScore:
         assert result['overallScore'] == 0
         assert result['breakdown']['hard_skills']['score'] == 0
 
-    @patch('scoring_logic._calculate_category_score')
+    @patch('scoring_logic._category_similarities')
     @patch('scoring_logic._calculate_quantifiable_score')
     def test_calculate_weighted_match_score_partial_match(self, mock_quant_score, mock_cat_score):
         """Test weighted score calculation with partial matches"""
-        # Mock different scores for different categories
-        def mock_category_side_effect(resume, jd, keywords):
-            if keywords == HARD_SKILLS:
-                return 0.8
-            elif keywords == TOOLS:
-                return 0.6
-            elif keywords == SOFT_SKILLS:
-                return 0.4
-            elif keywords == ACTION_VERBS:
-                return 0.7
-            return 0.0
-
-        mock_cat_score.side_effect = mock_category_side_effect
+        # Category scores in KEYWORD_CATEGORIES order: hard skills, tools, soft skills, action verbs
+        mock_cat_score.return_value = np.array([0.8, 0.6, 0.4, 0.7])
         mock_quant_score.return_value = 0.5
 
         result_json = calculate_weighted_match_score("Resume text", "Job description")
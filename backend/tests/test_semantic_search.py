@@ -0,0 +1,132 @@
+"""
+Tests for embedding similarity ranking in semantic_search.py
+"""
+import pytest
+from unittest.mock import Mock
+import numpy as np
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import embedding_store
+from semantic_search import (
+    normalize_rows, top_k_similar, rank_items, load_table_embeddings, shortlist_texts, similar_pairs, group_pairs
+)
+
+
+class TestTopKSimilar:
+    """Tests for top_k_similar function"""
+
+    def test_results_are_ranked_best_first(self):
+        """Test the closest rows come first with their cosine scores"""
+        matrix = normalize_rows(np.array([[1, 0], [0, 1], [1, 1]], dtype=np.float32))
+
+        results = top_k_similar(np.array([1.0, 0.1]), matrix, 3)
+
+        assert [index for index, _ in results] == [0, 2, 1]
+        assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+
+    def test_k_larger_than_matrix(self):
+        """Test asking for more rows than exist returns every row"""
+        matrix = normalize_rows(np.eye(3, dtype=np.float32))
+        assert len(top_k_similar(np.ones(3), matrix, 10)) == 3
+
+    def test_empty_matrix(self):
+        """Test an empty library yields no results"""
+        assert top_k_similar(np.ones(3), np.empty((0, 3), dtype=np.float32), 5) == []
+
+    def test_zero_rows_are_safe(self):
+        """Test zero vectors do not produce NaN scores"""
+        matrix = normalize_rows(np.array([[0, 0], [1, 0]], dtype=np.float32))
+        results = top_k_similar(np.array([1.0, 0.0]), matrix, 2)
+        assert all(np.isfinite(score) for _, score in results)
+
+
+class TestRankItems:
+    """Tests for rank_items function"""
+
+    def test_rank_across_sources(self):
+        """Test items from several tables are ranked together with typed ids"""
+        sources = {
+            "skill": ([7], ["Python"], normalize_rows(np.array([[0, 1]], dtype=np.float32))),
+            "accomplishment": ([3], ["Led team"], normalize_rows(np.array([[1, 0]], dtype=np.float32))),
+        }
+
+        ranked = rank_items(np.array([1.0, 0.0]), sources, top_k=2)
+
+        assert [item["id"] for item in ranked] == ["accomplishment-3", "skill-7"]
+        assert ranked[0]["score"] == pytest.approx(1.0)
+        assert shortlist_texts(ranked, "skill") == ["Python"]
+
+    def test_rank_no_items(self):
+        """Test an empty library ranks to an empty list"""
+        empty = ([], [], np.empty((0, 2), dtype=np.float32))
+        assert rank_items(np.ones(2), {"skill": empty}, top_k=5) == []
+
+
+class TestLoadTableEmbeddings:
+    """Tests for load_table_embeddings function"""
+
+    def test_load_bytea_rows(self):
+        """Test rows are decoded into a normalized matrix aligned with ids"""
+        embedding_store.reset_backend_cache()
+        cursor = Mock()
+        cursor.fetchone.return_value = ("bytea",)
+        cursor.fetchall.return_value = [
+            (1, "Python", memoryview(np.array([3, 4], dtype='<f4').tobytes())),
+            (2, "SQL", memoryview(np.array([0, 2], dtype='<f4').tobytes())),
+        ]
+
+        ids, texts, matrix = load_table_embeddings(cursor, "skills", "skill_text")
+
+        assert ids == [1, 2]
+        assert texts == ["Python", "SQL"]
+        np.testing.assert_allclose(matrix, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+        embedding_store.reset_backend_cache()
+
+
+class TestSimilarPairs:
+    """Tests for similar_pairs function"""
+
+    MATRIX = normalize_rows(np.array([[1, 0, 0], [0.99, 0.1, 0], [0, 1, 0], [0, 0, 1], [0, 0.05, 1]], dtype=np.float32))
+
+    def test_pairs_above_threshold(self):
+        """Test only pairs at or above the threshold are returned, most similar first"""
+        pairs = similar_pairs(self.MATRIX, 0.9)
+
+        assert [(i, j) for i, j, _ in pairs] == [(3, 4), (0, 1)]
+        assert all(score >= 0.9 for _, _, score in pairs)
+
+    def test_approximate_search_matches_exact(self):
+        """Test the LSH path finds the same clear near-duplicates as the full matrix"""
+        rng = np.random.default_rng(1)
+        base = normalize_rows(rng.standard_normal((60, 16)))
+        matrix = normalize_rows(np.vstack([base, base[:10] + 0.01 * rng.standard_normal((10, 16))]))
+
+        exact = similar_pairs(matrix, 0.95)
+        approximate = similar_pairs(matrix, 0.95, exact_max=0)
+
+        assert [(i, j) for i, j, _ in approximate] == [(i, j) for i, j, _ in exact]
+        assert len(exact) == 10
+
+    def test_fewer_than_two_rows(self):
+        """Test a single row has no pairs"""
+        assert similar_pairs(self.MATRIX[:1], 0.5) == []
+
+
+class TestGroupPairs:
+    """Tests for group_pairs function"""
+
+    def test_links_are_transitive(self):
+        """Test chained pairs form one group scored by its best pair"""
+        groups = group_pairs([(0, 1, 0.95), (3, 4, 0.9), (1, 2, 0.88)])
+
+        assert [group["indices"] for group in groups] == [[0, 1, 2], [3, 4]]
+        assert groups[0]["score"] == 0.95
+        assert groups[0]["pairs"] == [(0, 1, 0.95), (1, 2, 0.88)]
+
+    def test_no_pairs(self):
+        """Test no pairs means no groups"""
+        assert group_pairs([]) == []
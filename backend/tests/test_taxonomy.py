@@ -0,0 +1,231 @@
+"""
+Tests for the keyword taxonomy compiler and loader in taxonomy.py
+"""
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import taxonomy
+from taxonomy import TaxonomyLoader, compile_taxonomy, read_taxonomy
+
+CATEGORIES = ["hard_skills", "tools"]
+TAXONOMY_CSV = """# comment lines are skipped
+category,term,aliases
+hard_skills,machine learning,ml
+hard_skills,python,py
+tools,kubernetes,k8s|kube
+tools,git,
+hard_skills,git,
+"""
+
+
+def tokenize(text):
+    return text.lower().split()
+
+
+@pytest.fixture
+def taxonomy_file(tmp_path):
+    path = tmp_path / "taxonomy.csv"
+    path.write_text(TAXONOMY_CSV)
+    return path
+
+
+def _loader(path, cache_dir):
+    return TaxonomyLoader(str(path), str(cache_dir) if cache_dir else None, CATEGORIES, tokenize)
+
+
+class TestReadTaxonomy:
+    """Tests for read_taxonomy"""
+
+    def test_reads_rows_and_aliases(self, taxonomy_file):
+        """Test rows come back as (category, term, aliases) with comments skipped"""
+        rows = read_taxonomy(str(taxonomy_file))
+
+        assert rows[0] == ("hard_skills", "machine learning", ["ml"])
+        assert rows[2] == ("tools", "kubernetes", ["k8s", "kube"])
+        assert rows[3] == ("tools", "git", [])
+
+
+class TestCompiledTaxonomy:
+    """Tests for matching against a compiled taxonomy"""
+
+    @pytest.fixture
+    def compiled(self, taxonomy_file):
+        return _loader(taxonomy_file, None).get()
+
+    def _terms(self, compiled, text):
+        return [(compiled.term(column), start, end) for column, start, end in compiled.find(tokenize(text))]
+
+    def test_aliases_map_to_canonical_term(self, compiled):
+        """Test an alias counts as its canonical term"""
+        assert self._terms(compiled, "k8s and kube") == [("kubernetes", 0, 1), ("kubernetes", 2, 3)]
+
+    def test_matches_multi_word_terms(self, compiled):
+        """Test multi-word terms match, and a lone prefix word does not"""
+        assert self._terms(compiled, "machine learning with python") == [
+            ("machine learning", 0, 2), ("python", 3, 4)
+        ]
+        assert self._terms(compiled, "machine shop") == []
+
+    def test_term_in_two_categories_shares_a_column(self, compiled):
+        """Test a term listed under two categories is one column in both mask rows"""
+        counts = compiled.count_matrix([tokenize("git")])
+        column = counts.indices[0]
+
+        assert compiled.category_mask[:, column].toarray().ravel().tolist() == [1.0, 1.0]
+
+    def test_count_matrix_shape(self, compiled):
+        """Test one row per document and one column per canonical term"""
+        counts = compiled.count_matrix([tokenize("py ml ml"), []])
+
+        assert counts.shape == (2, compiled.n_terms)
+        assert compiled.n_terms == 4
+        assert counts.sum() == 3
+
+    def test_empty_document(self, compiled):
+        """Test an empty token list has no matches"""
+        assert list(compiled.find([])) == []
+
+    def test_unknown_category_is_skipped(self):
+        """Test rows for categories the scorer doesn't use are ignored"""
+        arrays = compile_taxonomy([("languages", "french", [])], CATEGORIES, tokenize)
+
+        assert len(arrays["term_hashes"]) == 0
+
+    def test_phrases_losing_words_are_skipped(self):
+        """Test a phrase the tokenizer drops a word from is skipped rather than matched without it"""
+        def drop_stopwords(text):
+            return [token for token in tokenize(text) if token not in ("as", "after")]
+
+        arrays = compile_taxonomy(
+            [("hard_skills", "infrastructure as code", []), ("tools", "effects", ["after effects"])],
+            CATEGORIES, drop_stopwords
+        )
+        compiled = taxonomy.CompiledTaxonomy(arrays, CATEGORIES, arrays["max_phrase_tokens"])
+
+        assert compiled.n_terms == 1
+        assert [compiled.term(column) for column, _, _ in compiled.find(["infrastructure", "code"])] == []
+        assert len(arrays["term_hashes"]) == 1
+
+    def test_phrases_changed_by_tokenizer_are_skipped(self):
+        """Test a phrase whose digits or symbols the tokenizer strips can't match the stripped word"""
+        def letters_only(text):
+            return ["".join(ch for ch in token if ch.isalpha()) for token in tokenize(text)]
+
+        arrays = compile_taxonomy(
+            [("tools", "k6", []), ("tools", "kubernetes", ["k8s"]), ("hard_skills", "python", [])],
+            CATEGORIES, letters_only
+        )
+        compiled = taxonomy.CompiledTaxonomy(arrays, CATEGORIES, arrays["max_phrase_tokens"])
+
+        assert list(compiled.find(["k"])) == []
+        assert list(compiled.find(["ks"])) == []
+        assert [compiled.term(column) for column, _, _ in compiled.find(["kubernetes"])] == ["kubernetes"]
+
+    def test_shipped_taxonomy_matches_document_tokens(self):
+        """Test every phrase in the shipped taxonomy tokenizes to its own lowercase words"""
+        from text_normalization import tokenize as document_tokenize
+
+        for _, term, aliases in read_taxonomy(taxonomy.TAXONOMY_PATH):
+            for phrase in [term] + aliases:
+                assert document_tokenize(phrase) == phrase.lower().split(), phrase
+
+
+class TestTaxonomyLoader:
+    """Tests for TaxonomyLoader caching"""
+
+    def test_missing_file_returns_none(self, tmp_path):
+        """Test a missing taxonomy file gives None instead of raising"""
+        assert _loader(tmp_path / "missing.csv", tmp_path / "cache").get() is None
+
+    def test_cached_arrays_are_memory_mapped(self, taxonomy_file, tmp_path):
+        """Test a second loader maps the compiled arrays instead of compiling again"""
+        cache_dir = tmp_path / "cache"
+        first = _loader(taxonomy_file, cache_dir).get()
+
+        with patch('taxonomy.compile_taxonomy') as mock_compile:
+            second = _loader(taxonomy_file, cache_dir).get()
+
+        mock_compile.assert_not_called()
+        assert isinstance(second._term_hashes, np.memmap)
+        assert second.n_terms == first.n_terms
+
+    def test_reuses_taxonomy_until_file_changes(self, taxonomy_file, tmp_path):
+        """Test the file is recompiled only when its mtime or size changes"""
+        loader = _loader(taxonomy_file, tmp_path / "cache")
+        first = loader.get()
+        assert loader.get() is first
+
+        taxonomy_file.write_text(TAXONOMY_CSV + "tools,docker,\n")
+        stat = taxonomy_file.stat()
+        os.utime(taxonomy_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        second = loader.get()
+        assert second is not first
+        assert second.n_terms == first.n_terms + 1
+
+    def test_unwritable_cache_falls_back_to_memory(self, taxonomy_file, tmp_path):
+        """Test compilation still works when the cache directory can't be written"""
+        with patch.object(TaxonomyLoader, '_write_cache', side_effect=OSError("read-only")):
+            compiled = _loader(taxonomy_file, tmp_path / "cache").get()
+
+        assert compiled.n_terms == 4
+        assert not isinstance(compiled._term_hashes, np.memmap)
+
+    def test_shipped_taxonomy_compiles(self):
+        """Test the taxonomy file shipped with the app loads with the scorer's categories"""
+        compiled = TaxonomyLoader(
+            taxonomy.TAXONOMY_PATH, None, ["hard_skills", "tools", "soft_skills", "action_verbs"], tokenize
+        ).get()
+
+        assert compiled is not None
+        assert compiled.n_terms > 1000
+        assert [compiled.term(c) for c, _, _ in compiled.find(["node"])] == ["nodejs"]
+
+    def test_shipped_taxonomy_names_match_csv(self):
+        """Test every compiled canonical name is spelled as in the CSV and stray digits match nothing"""
+        from text_normalization import tokenize as document_tokenize, tokenizer_fingerprint
+
+        categories = ["hard_skills", "tools", "soft_skills", "action_verbs"]
+        compiled = TaxonomyLoader(
+            taxonomy.TAXONOMY_PATH, None, categories, document_tokenize, tokenizer_fingerprint
+        ).get()
+        csv_terms = {term.lower() for category, term, _ in read_taxonomy(taxonomy.TAXONOMY_PATH)
+                     if category in categories}
+
+        assert {compiled.term(column) for column in range(compiled.n_terms)} == csv_terms
+        assert list(compiled.find(document_tokenize("401k"))) == []
+        assert list(compiled.find(document_tokenize("Wichita, KS"))) == []
+
+    def test_tokenizer_change_recompiles(self, taxonomy_file, tmp_path):
+        """Test a cache compiled under another tokenizer fingerprint isn't reused"""
+        cache_dir = str(tmp_path / "cache")
+        first = TaxonomyLoader(str(taxonomy_file), cache_dir, CATEGORIES, tokenize, lambda: "regex:aaaa")
+        second = TaxonomyLoader(str(taxonomy_file), cache_dir, CATEGORIES, tokenize, lambda: "nltk:aaaa")
+        first.get()
+
+        with patch('taxonomy.compile_taxonomy', wraps=compile_taxonomy) as mock_compile:
+            second.get()
+
+        mock_compile.assert_called_once()
+
+    def test_missing_tokenizer_data_is_retried(self, taxonomy_file):
+        """Test a tokenizer without its NLTK data gives None now and compiles on a later call"""
+        calls = []
+
+        def flaky_tokenize(text):
+            calls.append(text)
+            if len(calls) == 1:
+                raise LookupError("stopwords not found")
+            return tokenize(text)
+
+        loader = TaxonomyLoader(str(taxonomy_file), None, CATEGORIES, flaky_tokenize)
+
+        assert loader.get() is None
+        assert loader.get().n_terms == 4
@@ -0,0 +1,136 @@
+"""
+Tests for text cleanup and tokenization in text_normalization.py
+"""
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import text_normalization
+from text_normalization import (
+    normalize_characters, preprocess, stopword_set, tokenize, tokenize_with_offsets,
+    tokenizer_fingerprint
+)
+
+STOPWORDS = frozenset(["a", "an", "and", "the", "with", "of", "in", "is"])
+
+
+@pytest.fixture(autouse=True)
+def fake_stopwords():
+    """Serve a fixed stopword set so tests don't need the NLTK corpus."""
+    with patch('text_normalization.stopword_set', return_value=STOPWORDS):
+        yield
+
+
+class TestNormalizeCharacters:
+    """Tests for normalize_characters"""
+
+    def test_lowercases_and_drops_symbols(self):
+        """Test digits and punctuation are removed and letters lowercased"""
+        assert normalize_characters("Node.js, 5 YEARS!").split() == ["nodejs", "years"]
+
+    @pytest.mark.parametrize("text, expected", [
+        ("problem-solving", ["problem-solving"]),
+        ("- bullet", ["bullet"]),
+        ("5-year", ["year"]),
+        ("end-", ["end"]),
+        ("a--b", ["a", "b"]),
+    ])
+    def test_keeps_only_inner_hyphens(self, text, expected):
+        """Test hyphens survive only between letters"""
+        assert normalize_characters(text).split() == expected
+
+
+class TestTokenize:
+    """Tests for tokenize and preprocess"""
+
+    TEXT = "Led a cross-functional team of 5 in the design of Node.js APIs -- improving latency by 30%."
+
+    @pytest.mark.parametrize("mode", ["regex", "nltk"])
+    def test_removes_stopwords(self, mode):
+        """Test both modes drop stopwords and keep content words"""
+        assert tokenize(self.TEXT, mode) == [
+            "led", "cross-functional", "team", "design", "nodejs", "apis", "improving", "latency", "by"
+        ]
+
+    def test_modes_agree(self):
+        """Test the regex tokenizer matches NLTK's on varied text"""
+        text = "Don't stop: e-mail/IM (24x7); C++ & Java... well-known -- 'quoted' end-to-end\nnew\tline"
+        assert tokenize(text, "regex") == tokenize(text, "nltk")
+
+    def test_unknown_mode(self):
+        """Test an unknown tokenizer mode is rejected"""
+        with pytest.raises(ValueError):
+            tokenize("text", "spacy")
+
+    def test_default_mode_from_config(self):
+        """Test the configured mode is used when none is passed"""
+        with patch('text_normalization.SCORING_TOKENIZER', 'nltk'), \
+             patch.object(text_normalization._nltk_tokenizer, 'tokenize', return_value=["python"]) as mock_nltk:
+            assert tokenize("Python") == ["python"]
+        mock_nltk.assert_called_once()
+
+    def test_preprocess_joins_tokens(self):
+        """Test preprocess returns the tokens as one space-separated string"""
+        assert preprocess("  The Python   and SQL ") == "python sql"
+
+    def test_fingerprint_follows_mode_and_stopwords(self):
+        """Test the tokenizer fingerprint changes with the mode and with the stopword list"""
+        with patch('text_normalization.stopword_set', return_value=frozenset(["the"])):
+            regex, nltk_mode = tokenizer_fingerprint("regex"), tokenizer_fingerprint("nltk")
+        with patch('text_normalization.stopword_set', return_value=frozenset(["the", "and"])):
+            more_stopwords = tokenizer_fingerprint("regex")
+
+        assert len({regex, nltk_mode, more_stopwords}) == 3
+
+
+class TestStopwordSet:
+    """Tests for stopword_set (imported before the fixture patches the module attribute)"""
+
+    def test_corpus_read_once(self):
+        """Test the NLTK corpus is read on first use and then reused"""
+        with patch('text_normalization._stopwords', None), \
+             patch('text_normalization.stopwords', new=Mock()) as mock_corpus:
+            mock_corpus.words.return_value = ["the", "and"]
+            first = stopword_set()
+            second = stopword_set()
+
+        assert first == frozenset(["the", "and"])
+        assert second is first
+        mock_corpus.words.assert_called_once_with('english')
+
+    def test_missing_corpus_is_retried(self):
+        """Test a LookupError is not cached, so the corpus can be fetched later"""
+        with patch('text_normalization._stopwords', None), \
+             patch('text_normalization.stopwords', new=Mock()) as mock_corpus:
+            mock_corpus.words.side_effect = [LookupError("no corpus"), ["the"]]
+            with pytest.raises(LookupError):
+                stopword_set()
+            assert stopword_set() == frozenset(["the"])
+
+
+class TestTokenizeWithOffsets:
+    """Tests for tokenize_with_offsets"""
+
+    @pytest.mark.parametrize("text", [
+        "Led a cross-functional team; Node.js -- 5-year 'problem-solving'",
+        "e-mail/IM (24x7) end-to-end DON'T stop",
+        "",
+    ])
+    def test_same_tokens_as_tokenize(self, text):
+        """Test the tokens equal tokenize() for the same text"""
+        tokens, offsets = tokenize_with_offsets(text)
+
+        assert tokens == tokenize(text)
+        assert len(offsets) == len(tokens)
+
+    def test_offsets_cover_original_text(self):
+        """Test each span covers the token's characters in the original text"""
+        text = "Led the Node.js team (5-year project)"
+        tokens, offsets = tokenize_with_offsets(text)
+
+        assert [text[start:end] for start, end in offsets] == ["Led", "Node.js", "team", "year", "project"]
@@ -0,0 +1,103 @@
+# resume-builder/backend/text_normalization.py
+# Text cleanup and tokenization for ATS scoring, with NLTK resources loaded once per process.
+
+import hashlib
+import os
+import re
+import threading
+from typing import FrozenSet, List, Optional, Tuple
+
+from nltk.corpus import stopwords
+from nltk.tokenize import NLTKWordTokenizer
+
+# --- Configuration ---
+# "regex" (default) splits cleaned text with one compiled pattern; "nltk" runs NLTK's word tokenizer.
+# Both give the same tokens for cleaned text, which has no punctuation left for NLTK to handle.
+SCORING_TOKENIZER = os.environ.get("SCORING_TOKENIZER", "regex").lower()
+TOKENIZER_MODES = ("regex", "nltk")
+
+_DROP_CHARACTERS = re.compile(r'[^a-z\s-]')
+_LOOSE_HYPHENS = re.compile(r'(?<![a-z])-+|-+(?![a-z])')
+_WORD = re.compile(r'[a-z]+(?:-[a-z]+)*')
+_CHUNK = re.compile(r'\S+')
+_KEPT_CHARACTER = re.compile(r'[a-z-]')
+
+# The Treebank-style tokenizer word_tokenize uses, minus its per-call Punkt
+# sentence split (cleaned text has no sentence punctuation to split on).
+_nltk_tokenizer = NLTKWordTokenizer()
+
+_stopwords_lock = threading.Lock()
+_stopwords: Optional[FrozenSet[str]] = None
+
+
+def normalize_characters(text: str) -> str:
+    """Lowercase letters and whitespace only, keeping hyphens inside words ("problem-solving")."""
+    text = _DROP_CHARACTERS.sub('', text.lower())
+    return _LOOSE_HYPHENS.sub(' ', text)
+
+
+def stopword_set() -> FrozenSet[str]:
+    """NLTK's English stopwords, read from the corpus on first use only."""
+    global _stopwords
+    if _stopwords is None:
+        with _stopwords_lock:
+            if _stopwords is None:
+                # Raises LookupError until model_registry.ensure_nltk_data() has fetched the corpus.
+                _stopwords = frozenset(stopwords.words('english'))
+    return _stopwords
+
+
+def tokenize(text: str, mode: Optional[str] = None) -> List[str]:
+    """Cleaned, lowercase tokens of `text` without stopwords."""
+    mode = mode or SCORING_TOKENIZER
+    text = normalize_characters(text)
+    if mode == "nltk":
+        tokens = _nltk_tokenizer.tokenize(text)
+    elif mode == "regex":
+        tokens = _WORD.findall(text)
+    else:
+        raise ValueError(f"Unknown tokenizer mode '{mode}', expected one of {TOKENIZER_MODES}")
+    stop_words = stopword_set()
+    return [token for token in tokens if token not in stop_words]
+
+
+def tokenizer_fingerprint(mode: Optional[str] = None) -> str:
+    """Identifies what tokenize() produces: the tokenizer mode and a hash of the stopword list."""
+    stopword_hash = hashlib.sha256("\n".join(sorted(stopword_set())).encode("utf-8")).hexdigest()[:16]
+    return f"{mode or SCORING_TOKENIZER}:{stopword_hash}"
+
+
+def preprocess(text: str, mode: Optional[str] = None) -> str:
+    """tokenize() joined with single spaces."""
+    return " ".join(tokenize(text, mode))
+
+
+def tokenize_with_offsets(text: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    The same tokens as tokenize(), with the (start, end) character span of
+    each token in the original `text`. Spans cover any characters that
+    cleanup dropped from inside a token ("node.js" spans all seven).
+    """
+    stop_words = stopword_set()
+    tokens: List[str] = []
+    offsets: List[Tuple[int, int]] = []
+    for chunk in _CHUNK.finditer(text):
+        lowered = chunk.group().lower()
+        if len(lowered) == len(chunk.group()) and _WORD.fullmatch(lowered):
+            # Common case: the chunk is already one clean word.
+            if lowered not in stop_words:
+                tokens.append(lowered)
+                offsets.append(chunk.span())
+            continue
+        # Keep each surviving character's position in the original text, mirroring normalize_characters.
+        kept, positions = [], []
+        for index, character in enumerate(chunk.group(), start=chunk.start()):
+            for lowered_character in character.lower():
+                if _KEPT_CHARACTER.match(lowered_character):
+                    kept.append(lowered_character)
+                    positions.append(index)
+        for word in _WORD.finditer("".join(kept)):
+            if word.group() not in stop_words:
+                tokens.append(word.group())
+                offsets.append((positions[word.start()], positions[word.end() - 1] + 1))
+    return tokens, offsets